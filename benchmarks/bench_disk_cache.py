@@ -0,0 +1,105 @@
+# bench_disk_cache.py
+#
+# What the on-disk response cache saves a freshly spawned server: several
+# server processes are started one after another against the local API stub,
+# all sharing one cache file, and each makes the same catalog reads. Reports
+# the latency of each process's first call and the upstream requests it
+# made, with the disk cache on and off. A last process is started after the
+# entries have expired to show ETag revalidation (304 Not Modified).
+#
+#   python benchmarks/bench_disk_cache.py --spawns 5 --latency 0.1
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import httpx
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from stub_api import start_stub  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVER = os.path.join(ROOT, "src", "mcp_lemonsqueezy", "server.py")
+
+CALLS = [
+    ("list_stores", {}),
+    ("list_products", {}),
+    ("get_product", {"product_id": "1"}),
+    ("get_product_variants", {"product_id": "1"}),
+    ("get_store", {"store_id": "1"}),
+]
+
+
+async def upstream(api_base: str) -> dict:
+    async with httpx.AsyncClient() as client:
+        return (await client.get(api_base.replace("/v1", "/_stats"))).json()
+
+
+async def spawn(env: dict, cwd: str) -> tuple[float, float]:
+    """
+    Seconds for the first call and for all calls of one fresh server process.
+    """
+    params = StdioServerParameters(command=sys.executable, args=[SERVER], env=env, cwd=cwd)
+    with open(os.devnull, "w") as devnull:
+        async with stdio_client(params, errlog=devnull) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                start = time.perf_counter()
+                first = None
+                for name, arguments in CALLS:
+                    result = await session.call_tool(name, arguments)
+                    if result.isError:
+                        raise RuntimeError(f"{name} failed: {result.content[0].text}")
+                    first = first or time.perf_counter() - start
+                total = time.perf_counter() - start
+    return first, total
+
+
+async def run(label: str, args: argparse.Namespace, disk_cache: bool) -> None:
+    runner, api_base = await start_stub(latency=args.latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "LEMONSQUEEZY_API_KEY": "benchmark",
+            "LEMONSQUEEZY_API_BASE": api_base,
+            "LEMONSQUEEZY_AUDIT_LOG_PATH": os.path.join(tmp, "audit.jsonl"),
+            "LEMONSQUEEZY_MIRROR_PATH": os.path.join(tmp, "mirror.sqlite3"),
+            "LEMONSQUEEZY_DISK_CACHE_PATH": os.path.join(tmp, "responses.sqlite3") if disk_cache else "",
+            "LEMONSQUEEZY_DISK_CACHE_TTLS": f"stores={args.ttl},products={args.ttl},variants={args.ttl}",
+        }
+        print(f"{label}")
+        print(f"{'process':<10}{'first call ms':>15}{'all calls ms':>14}{'upstream':>10}{'304s':>6}")
+        spawns = [str(i + 1) for i in range(args.spawns)]
+        if disk_cache:
+            spawns.append("expired")
+        for name in spawns:
+            if name == "expired":
+                await asyncio.sleep(args.ttl + 0.5)
+            before = await upstream(api_base)
+            first, total = await spawn(env, tmp)
+            after = await upstream(api_base)
+            print(
+                f"{name:<10}{first * 1000:>15.1f}{total * 1000:>14.1f}"
+                f"{after['requests'] - before['requests']:>10}{after['not_modified'] - before['not_modified']:>6}"
+            )
+        print()
+    await runner.cleanup()
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"{len(CALLS)} catalog reads per process, {args.latency * 1000:.0f} ms stub latency\n")
+    await run("disk cache off", args, disk_cache=False)
+    await run("disk cache on", args, disk_cache=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure first-call latency of fresh server processes sharing the disk cache")
+    parser.add_argument("--spawns", type=int, default=3, help="Server processes started one after another")
+    parser.add_argument("--latency", type=float, default=0.1, help="Artificial stub latency in seconds")
+    parser.add_argument("--ttl", type=float, default=3.0, help="Disk cache TTL for catalog resources, in seconds")
+    asyncio.run(main(parser.parse_args()))
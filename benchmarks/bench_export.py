@@ -0,0 +1,85 @@
+# bench_export.py
+#
+# Full dumps through the server: export_resource streams every order page
+# to a file in each format, then list_orders returns the same records as
+# one MCP response for comparison. Reports duration, rows per second, file
+# size and the server's peak RSS after each step (peak RSS only grows, so
+# the exports run first).
+#
+#   python benchmarks/bench_export.py --orders 50000 --latency 0.02
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from stub_api import start_stub  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVER = os.path.join(ROOT, "src", "mcp_lemonsqueezy", "server.py")
+
+
+async def peak_rss_kb(session: ClientSession) -> int | None:
+    metrics = await session.read_resource("metrics://lemonsqueezy")
+    return json.loads(metrics.contents[0].text).get("max_rss_kb")
+
+
+async def main(args: argparse.Namespace) -> None:
+    runner, api_base = await start_stub(latency=args.latency, counts={"orders": args.orders})
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "LEMONSQUEEZY_API_KEY": "benchmark",
+            "LEMONSQUEEZY_API_BASE": api_base,
+            "LEMONSQUEEZY_AUDIT_LOG_PATH": os.path.join(tmp, "audit.jsonl"),
+            "LEMONSQUEEZY_MIRROR_PATH": os.path.join(tmp, "mirror.sqlite3"),
+            "LEMONSQUEEZY_DISK_CACHE_PATH": os.path.join(tmp, "responses.sqlite3"),
+            "LEMONSQUEEZY_EXPORT_DIR": os.path.join(tmp, "exports"),
+            "LEMONSQUEEZY_RATE_LIMIT": "1000000",
+            "LEMONSQUEEZY_RATE_BURST": "1000",
+        }
+        params = StdioServerParameters(command=sys.executable, args=[SERVER], env=env, cwd=tmp)
+        print(f"{args.orders} orders, {args.latency * 1000:.0f} ms stub latency\n")
+        print(f"{'step':<26}{'rows':>8}{'seconds':>10}{'rows/s':>10}{'MB':>9}{'peak RSS kB':>13}")
+        with open(os.devnull, "w") as devnull:
+            async with stdio_client(params, errlog=devnull) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    steps = [(f"export_resource {fmt}", "export_resource", {"resource": "orders", "format": fmt}) for fmt in args.format]
+                    steps.append(("list_orders all_pages", "list_orders", {"all_pages": True, "max_items": args.orders}))
+                    for label, name, arguments in steps:
+                        start = time.perf_counter()
+                        result = await session.call_tool(name, arguments)
+                        duration = time.perf_counter() - start
+                        if result.isError:
+                            print(f"{label:<26}failed: {result.content[0].text}")
+                            continue
+                        text = result.content[0].text
+                        data = json.loads(text)
+                        if name == "export_resource":
+                            rows, size = data["rows"], data["bytes"]
+                        else:
+                            # The whole result travels back as one message
+                            rows, size = data["meta"]["count"], len(text)
+                        print(
+                            f"{label:<26}{rows:>8}{duration:>10.2f}{rows / duration:>10.0f}"
+                            f"{size / 1e6:>9.1f}{str(await peak_rss_kb(session)):>13}"
+                        )
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure streaming exports against one large list response")
+    parser.add_argument("--orders", type=int, default=20000, help="Orders served by the stub")
+    parser.add_argument("--latency", type=float, default=0.02, help="Artificial stub latency in seconds")
+    parser.add_argument("--format", action="append", choices=["ndjson", "csv", "parquet"], help="Formats to export (repeatable; default all)")
+    args = parser.parse_args()
+    args.format = args.format or ["ndjson", "csv", "parquet"]
+    asyncio.run(main(args))
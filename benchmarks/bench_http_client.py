@@ -0,0 +1,81 @@
+# bench_http_client.py
+#
+# Compare the shared HttpClientPool with the old "new AsyncClient per call"
+# pattern against the local API stub.
+#
+#   python benchmarks/bench_http_client.py --requests 2000 --concurrency 50
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from mcp_lemonsqueezy.client import HttpClientPool  # noqa: E402
+from stub_api import start_stub  # noqa: E402
+
+
+async def per_call_request(api_base: str, i: int) -> None:
+    async with httpx.AsyncClient() as client:
+        resp = await client.get(f"{api_base}/products/{i % 20 + 1}")
+        resp.json()
+
+
+def make_pooled_request(pool: HttpClientPool):
+    async def pooled_request(api_base: str, i: int) -> None:
+        resp = await pool.client.get(f"{api_base}/products/{i % 20 + 1}")
+        resp.json()
+    return pooled_request
+
+
+async def run_scenario(name: str, request_fn, api_base: str, total: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await request_fn(api_base, i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "scenario": name,
+        "requests": total,
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    runner, api_base = await start_stub(latency=args.latency)
+    pool = HttpClientPool(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        results = [
+            await run_scenario("per-call client", per_call_request, api_base, args.requests, args.concurrency),
+            await run_scenario("pooled client", make_pooled_request(pool), api_base, args.requests, args.concurrency),
+        ]
+    finally:
+        await pool.aclose()
+        await runner.cleanup()
+
+    print(f"{'scenario':<18}{'requests':>10}{'req/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['scenario']:<18}{r['requests']:>10}{r['rps']:>12.1f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs per-call httpx clients")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub latency per request in seconds")
+    asyncio.run(main(parser.parse_args()))
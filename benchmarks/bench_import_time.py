@@ -0,0 +1,150 @@
+# bench_import_time.py
+#
+# Track cold start: how long `import mcp_lemonsqueezy.server` takes under
+# `python -X importtime` (and which imports dominate), how long a fresh
+# `mcp-lemonsqueezy` process takes to answer initialize and tools/list, and
+# whether the precomputed tool schemas in tools.py still match the tools.
+#
+#   python benchmarks/bench_import_time.py --runs 5
+#   python benchmarks/bench_import_time.py --budget-ms 600   # exit 1 if the median import is slower
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+import tempfile
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+
+# Modules that should only be imported once the feature using them is enabled
+LAZY_MODULES = ["aiohttp", "sqlite3"]
+
+
+def child_env(tmp: str) -> dict:
+    env = {
+        **os.environ,
+        "PYTHONPATH": SRC,
+        "LEMONSQUEEZY_API_KEY": "benchmark",
+        "LEMONSQUEEZY_AUDIT_LOG_PATH": os.path.join(tmp, "audit.jsonl"),
+        "LEMONSQUEEZY_MIRROR_PATH": os.path.join(tmp, "mirror.sqlite3"),
+        "LEMONSQUEEZY_DISK_CACHE_PATH": os.path.join(tmp, "responses.sqlite3"),
+        "FASTMCP_LOG_LEVEL": "WARNING",
+    }
+    # Measure with bytecode caches in place, as an installed package would be
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def server_imports(rows: list[tuple[int, int, int, str]]) -> list[tuple[str, int]]:
+    """
+    (module, cumulative us) for each module imported directly by the server module.
+    """
+    children = []
+    for _, cumulative, depth, name in rows:
+        # A module's imports are listed before the module itself
+        if depth == 1:
+            children.append((name, cumulative))
+        elif depth == 0:
+            if name == "mcp_lemonsqueezy.server":
+                return children
+            children = []
+    return []
+
+
+def import_times(env: dict) -> list[tuple[int, int, int, str]]:
+    """
+    (self us, cumulative us, depth, module) for every import of one fresh
+    interpreter importing the server module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import mcp_lemonsqueezy.server"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Names are indented by two spaces per nesting level
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+async def cold_start(env: dict) -> tuple[float, float]:
+    """
+    Seconds from spawning the console-script entry point to the initialize
+    response, and to the tools/list response.
+    """
+    params = StdioServerParameters(command=sys.executable, args=["-c", "from mcp_lemonsqueezy import main; main()"], env=env, cwd=env["PYTHONPATH"])
+    start = time.perf_counter()
+    async with stdio_client(params, errlog=open(os.devnull, "w")) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            initialized = time.perf_counter() - start
+            await session.list_tools()
+            listed = time.perf_counter() - start
+    return initialized, listed
+
+
+def main(args: argparse.Namespace) -> int:
+    status = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        env = child_env(tmp)
+        import_times(env)  # warm-up: write the bytecode caches
+        totals, server_self, heaviest = [], [], {}
+        for _ in range(args.runs):
+            rows = import_times(env)
+            totals.append(sum(cumulative for _, cumulative, depth, _ in rows if depth == 0) / 1000)
+            server_self.append(next(s for s, _, _, name in rows if name == "mcp_lemonsqueezy.server") / 1000)
+            for name, cumulative in server_imports(rows):
+                heaviest.setdefault(name, []).append(cumulative / 1000)
+        loaded = {name for *_, name in rows}
+
+        starts = [asyncio.run(cold_start(env)) for _ in range(args.runs)]
+
+    print(f"import mcp_lemonsqueezy.server  median {statistics.median(totals):8.1f} ms  (min {min(totals):.1f}, max {max(totals):.1f}, {args.runs} runs)")
+    print(f"  server module body            median {statistics.median(server_self):8.1f} ms")
+    print(f"cold start to initialize        median {statistics.median(s[0] for s in starts) * 1000:8.1f} ms")
+    print(f"cold start to tools/list        median {statistics.median(s[1] for s in starts) * 1000:8.1f} ms")
+    print()
+    print(f"{'heaviest imports of the server module':<44}{'cumulative ms':>14}")
+    ranked = sorted(heaviest.items(), key=lambda item: -statistics.median(item[1]))
+    for name, times in ranked[: args.top]:
+        print(f"{name:<44}{statistics.median(times):>14.1f}")
+    print()
+
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    if eager:
+        print(f"imported at startup but should be lazy: {', '.join(eager)}")
+        status = 1
+
+    sys.path.insert(0, SRC)
+    from mcp_lemonsqueezy.server import tool_registry
+    drift = tool_registry.drift()
+    if drift:
+        print("tools.py schemas out of date:")
+        for name, issues in drift.items():
+            print(f"  {name}: {issues}")
+        status = 1
+    else:
+        print(f"tools.py schemas match all {len(tool_registry.functions)} tools")
+
+    if args.budget_ms is not None and statistics.median(totals) > args.budget_ms:
+        print(f"median import time exceeds the {args.budget_ms:.0f} ms budget")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import time and cold start of the MCP server")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=15, help="Heaviest imports to list")
+    parser.add_argument("--budget-ms", type=float, help="Exit 1 if the median import time is above this")
+    sys.exit(main(parser.parse_args()))
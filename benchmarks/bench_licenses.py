@@ -0,0 +1,123 @@
+# bench_licenses.py
+#
+# Launch-time license checks through the server: many validate_license_key
+# calls over a small set of distinct keys (as when every app launch checks
+# its key), then the same checks as validate_license_keys batches. Reports
+# throughput, latency and how many License API requests reached the stub.
+#
+#   python benchmarks/bench_licenses.py --checks 2000 --keys 50 --concurrency 50
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+import tempfile
+import httpx
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from stub_api import start_stub  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVER = os.path.join(ROOT, "src", "mcp_lemonsqueezy", "server.py")
+
+
+def license_key(i: int) -> str:
+    return f"STUB-{i:08d}-LICENSE"
+
+
+async def upstream(api_base: str) -> int:
+    async with httpx.AsyncClient() as client:
+        return (await client.get(api_base.replace("/v1", "/_stats"))).json()["requests"]
+
+
+async def single_checks(session: ClientSession, keys: list[str], concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def check(key: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            result = await session.call_tool("validate_license_key", {"license_key": key})
+            latencies.append(time.perf_counter() - start)
+            if result.isError:
+                raise RuntimeError(result.content[0].text)
+
+    await asyncio.gather(*(check(key) for key in keys))
+    return latencies
+
+
+async def batch_checks(session: ClientSession, keys: list[str], batch_size: int) -> list[float]:
+    latencies = []
+    for offset in range(0, len(keys), batch_size):
+        licenses = [{"license_key": key} for key in keys[offset:offset + batch_size]]
+        start = time.perf_counter()
+        result = await session.call_tool("validate_license_keys", {"licenses": licenses})
+        latencies.append(time.perf_counter() - start)
+        if result.isError:
+            raise RuntimeError(result.content[0].text)
+    return latencies
+
+
+def report(label: str, checks: int, duration: float, latencies: list[float], requests: int) -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{label:<26}{checks:>8}{checks / duration:>12.0f}{statistics.median(latencies) * 1000:>10.2f}"
+        f"{p99 * 1000:>10.2f}{requests:>10}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    runner, api_base = await start_stub(latency=args.latency)
+    rng = random.Random(1)
+    # Stub keys cycle through active, inactive, expired and disabled: about half the checks are valid
+    keys = [license_key(rng.randint(1, args.keys)) for _ in range(args.checks)]
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "LEMONSQUEEZY_API_KEY": "benchmark",
+            "LEMONSQUEEZY_API_BASE": api_base,
+            "LEMONSQUEEZY_AUDIT_LOG_PATH": os.path.join(tmp, "audit.jsonl"),
+            "LEMONSQUEEZY_MIRROR_PATH": os.path.join(tmp, "mirror.sqlite3"),
+            "LEMONSQUEEZY_DISK_CACHE_PATH": os.path.join(tmp, "responses.sqlite3"),
+            "LEMONSQUEEZY_LICENSE_RATE_LIMIT": str(args.rate_limit),
+            "LEMONSQUEEZY_LICENSE_RATE_BURST": str(args.keys),
+        }
+        params = StdioServerParameters(command=sys.executable, args=[SERVER], env=env, cwd=tmp)
+        print(f"{args.checks} checks over {args.keys} distinct keys, {args.latency * 1000:.0f} ms stub latency\n")
+        print(f"{'mode':<26}{'checks':>8}{'checks/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'upstream':>10}")
+        with open(os.devnull, "w") as devnull:
+            async with stdio_client(params, errlog=devnull) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    for label, run in (
+                        ("validate_license_key", lambda: single_checks(session, keys, args.concurrency)),
+                        ("validate_license_keys", lambda: batch_checks(session, keys, args.batch_size)),
+                    ):
+                        before = await upstream(api_base)
+                        start = time.perf_counter()
+                        latencies = await run()
+                        duration = time.perf_counter() - start
+                        report(label, args.checks, duration, latencies, await upstream(api_base) - before)
+                    stats = await session.read_resource("licenses://lemonsqueezy-stats")
+    await runner.cleanup()
+    cache = json.loads(stats.contents[0].text)["cache"]
+    print(f"\nverification cache: {cache['entries']} entries, hit ratio {cache['hit_ratio']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure license validation throughput and upstream calls")
+    parser.add_argument("--checks", type=int, default=2000, help="License checks per mode")
+    parser.add_argument("--keys", type=int, default=50, help="Distinct license keys checked")
+    parser.add_argument("--concurrency", type=int, default=50, help="validate_license_key calls at once")
+    parser.add_argument("--batch-size", type=int, default=200, help="Keys per validate_license_keys call")
+    parser.add_argument("--latency", type=float, default=0.05, help="Artificial stub latency in seconds")
+    parser.add_argument("--rate-limit", type=int, default=60, help="License API requests per minute")
+    asyncio.run(main(parser.parse_args()))
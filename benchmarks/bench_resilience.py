@@ -0,0 +1,156 @@
+# bench_resilience.py
+#
+# Upstream trouble through the server. First a slow tail: a share of stub
+# requests take much longer, and get_order latency is compared with hedged
+# GETs off and on. Then an outage: the stub answers 503 until it recovers,
+# and each call reports whether it was answered fresh, from a stale cache
+# entry or failed, with the circuit breaker state after it.
+#
+#   python benchmarks/bench_resilience.py --calls 400 --slow-rate 0.05 --slow-latency 0.5
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import tempfile
+import httpx
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from stub_api import start_stub  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVER = os.path.join(ROOT, "src", "mcp_lemonsqueezy", "server.py")
+
+
+async def set_faults(api_base: str, **faults) -> None:
+    async with httpx.AsyncClient() as client:
+        (await client.post(api_base.replace("/v1", "/_faults"), json=faults)).raise_for_status()
+
+
+async def upstream(api_base: str) -> int:
+    async with httpx.AsyncClient() as client:
+        return (await client.get(api_base.replace("/v1", "/_stats"))).json()["requests"]
+
+
+async def resilience_stats(session: ClientSession) -> dict:
+    return json.loads((await session.read_resource("resilience://lemonsqueezy-stats")).contents[0].text)
+
+
+def server_params(tmp: str, api_base: str, **extra: str) -> StdioServerParameters:
+    env = {
+        **os.environ,
+        "LEMONSQUEEZY_API_KEY": "benchmark",
+        "LEMONSQUEEZY_API_BASE": api_base,
+        "LEMONSQUEEZY_AUDIT_LOG_PATH": os.path.join(tmp, "audit.jsonl"),
+        "LEMONSQUEEZY_MIRROR_PATH": os.path.join(tmp, "mirror.sqlite3"),
+        "LEMONSQUEEZY_DISK_CACHE_PATH": os.path.join(tmp, "responses.sqlite3"),
+        "LEMONSQUEEZY_RATE_LIMIT": "1000000",
+        "LEMONSQUEEZY_RATE_BURST": "1000",
+        **extra,
+    }
+    return StdioServerParameters(command=sys.executable, args=[SERVER], env=env, cwd=tmp)
+
+
+async def slow_tail(args: argparse.Namespace, api_base: str, tmp: str) -> None:
+    await set_faults(api_base, slow_rate=args.slow_rate, slow_latency=args.slow_latency)
+    print(f"slow tail: {args.slow_rate:.0%} of requests take {args.slow_latency * 1000:.0f} ms longer\n")
+    print(f"{'hedging':<10}{'calls':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'hedged':>8}{'won':>6}{'upstream':>10}")
+    for hedge in (False, True):
+        params = server_params(tmp, api_base, LEMONSQUEEZY_HEDGE=str(hedge).lower(), LEMONSQUEEZY_CACHE_ENABLED="false")
+        with open(os.devnull, "w") as devnull:
+            async with stdio_client(params, errlog=devnull) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    before = await upstream(api_base)
+                    semaphore = asyncio.Semaphore(args.concurrency)
+                    latencies = []
+
+                    async def call(i: int) -> None:
+                        async with semaphore:
+                            start = time.perf_counter()
+                            result = await session.call_tool("get_order", {"order_id": str(i % 1000 + 1)})
+                            latencies.append(time.perf_counter() - start)
+                            if result.isError:
+                                raise RuntimeError(result.content[0].text)
+
+                    await asyncio.gather(*(call(i) for i in range(args.calls)))
+                    hedging = (await resilience_stats(session))["hedging"]
+        latencies.sort()
+        p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000  # noqa: E731
+        print(
+            f"{'on' if hedge else 'off':<10}{len(latencies):>7}{statistics.median(latencies) * 1000:>9.1f}{p(0.95):>9.1f}"
+            f"{p(0.99):>9.1f}{latencies[-1] * 1000:>9.1f}{hedging['hedged']:>8}{hedging['hedge_wins']:>6}"
+            f"{await upstream(api_base) - before:>10}"
+        )
+    await set_faults(api_base, slow_rate=0.0)
+
+
+async def outage(args: argparse.Namespace, api_base: str, tmp: str) -> None:
+    params = server_params(
+        tmp,
+        api_base,
+        LEMONSQUEEZY_CACHE_TTLS="orders=0.5",
+        LEMONSQUEEZY_BREAKER_RESET=str(args.reset),
+        LEMONSQUEEZY_BACKOFF_BASE="0.05",
+    )
+    orders = [str(i) for i in range(1, 6)]
+    print(f"\noutage: every request answers 503 for {args.outage:.0f}s; breaker resets after {args.reset:.0f}s\n")
+    print(f"{'second':>7}  {'order':<7}{'answer':<8}{'ms':>8}  breaker")
+    with open(os.devnull, "w") as devnull:
+        async with stdio_client(params, errlog=devnull) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                for order_id in orders:
+                    await session.call_tool("get_order", {"order_id": order_id})
+                # Let the cached copies expire, so only stale ones are left
+                await asyncio.sleep(0.6)
+                await set_faults(api_base, outage=True)
+                began = time.perf_counter()
+                recovered = False
+                i = 0
+                while time.perf_counter() - began < args.outage + args.reset + 2:
+                    if not recovered and time.perf_counter() - began >= args.outage:
+                        await set_faults(api_base, outage=False)
+                        recovered = True
+                    order_id = orders[i % len(orders)]
+                    i += 1
+                    start = time.perf_counter()
+                    result = await session.call_tool("get_order", {"order_id": order_id})
+                    elapsed = (time.perf_counter() - start) * 1000
+                    if result.isError:
+                        answer = "error"
+                    else:
+                        answer = "stale" if "stale" in (json.loads(result.content[0].text).get("meta") or {}) else "fresh"
+                    state = (await resilience_stats(session))["breakers"]["endpoints"].get("GET /orders/{id}", {}).get("state")
+                    print(f"{time.perf_counter() - began:>7.1f}  {order_id:<7}{answer:<8}{elapsed:>8.1f}  {state}")
+                    await asyncio.sleep(args.interval)
+                stats = await resilience_stats(session)
+    breaker = stats["breakers"]["endpoints"]["GET /orders/{id}"]
+    print(f"\nopened {breaker['opened']}x, {breaker['rejected']} calls rejected without a request, {stats['breakers']['stale_served']} stale answers")
+
+
+async def main(args: argparse.Namespace) -> None:
+    runner, api_base = await start_stub(latency=args.latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        await slow_tail(args, api_base, tmp)
+        await outage(args, api_base, tmp)
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure hedged GETs under a slow tail and circuit breaking during an outage")
+    parser.add_argument("--calls", type=int, default=400, help="get_order calls per hedging mode")
+    parser.add_argument("--concurrency", type=int, default=10, help="get_order calls at once")
+    parser.add_argument("--latency", type=float, default=0.02, help="Artificial stub latency in seconds")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="Share of requests that are slow")
+    parser.add_argument("--slow-latency", type=float, default=0.5, help="Extra seconds a slow request takes")
+    parser.add_argument("--outage", type=float, default=3.0, help="Seconds the stub answers 503")
+    parser.add_argument("--reset", type=float, default=2.0, help="Seconds a circuit stays open (LEMONSQUEEZY_BREAKER_RESET)")
+    parser.add_argument("--interval", type=float, default=0.25, help="Seconds between outage calls")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,121 @@
+# bench_sse_clients.py
+#
+# Load-test the SSE transport: one server process, N simulated MCP clients
+# each making a series of tool calls, for several values of N. Shows how
+# throughput scales and how few upstream requests the shared cache and
+# single-flight layer let through.
+#
+#   python benchmarks/bench_sse_clients.py --clients 1 --clients 10 --clients 50 --calls 40
+
+import os
+import sys
+import time
+import random
+import socket
+import asyncio
+import argparse
+import statistics
+import subprocess
+import tempfile
+import httpx
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from stub_api import DEFAULT_COUNTS, start_stub  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVER = os.path.join(ROOT, "src", "mcp_lemonsqueezy", "server.py")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_healthy(url: str, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server did not become healthy at {url}")
+
+
+async def run_client(url: str, calls: int, seed: int, latencies: list[float], errors: list[int]) -> None:
+    rng = random.Random(seed)
+    async with sse_client(url) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            for _ in range(calls):
+                name, key, count = rng.choice([
+                    ("get_product", "product_id", DEFAULT_COUNTS["products"]),
+                    ("get_order", "order_id", DEFAULT_COUNTS["orders"]),
+                    ("get_customer", "customer_id", DEFAULT_COUNTS["customers"]),
+                ])
+                start = time.perf_counter()
+                result = await session.call_tool(name, {key: str(rng.randint(1, count))})
+                latencies.append(time.perf_counter() - start)
+                if result.isError:
+                    errors.append(1)
+
+
+async def main(args: argparse.Namespace) -> None:
+    runner, api_base = await start_stub(latency=args.latency)
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "LEMONSQUEEZY_API_KEY": "benchmark",
+            "LEMONSQUEEZY_API_BASE": api_base,
+            "LEMONSQUEEZY_AUDIT_LOG_PATH": os.path.join(tmp, "audit.jsonl"),
+            "LEMONSQUEEZY_MIRROR_PATH": os.path.join(tmp, "mirror.sqlite3"),
+            "LEMONSQUEEZY_DISK_CACHE_PATH": os.path.join(tmp, "responses.sqlite3"),
+            "LEMONSQUEEZY_RATE_LIMIT": "1000000",
+            "LEMONSQUEEZY_RATE_BURST": "1000",
+            "LEMONSQUEEZY_WORKERS": str(args.workers),
+            "FASTMCP_LOG_LEVEL": "WARNING",
+        }
+        server = subprocess.Popen(
+            [sys.executable, SERVER, "--transport", "sse", "--host", "127.0.0.1", "--port", str(port)],
+            env=env, cwd=tmp, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            await wait_healthy(f"{base}/healthz")
+            print(f"{'clients':>8}{'calls':>8}{'errors':>8}{'calls/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'upstream':>10}")
+            async with httpx.AsyncClient() as client:
+                for clients in args.clients or [1, 5, 10, 25, 50]:
+                    before = (await client.get(api_base.replace("/v1", "/_stats"))).json()["requests"]
+                    latencies: list[float] = []
+                    errors: list[int] = []
+                    start = time.perf_counter()
+                    await asyncio.gather(*(
+                        run_client(f"{base}/sse", args.calls, seed, latencies, errors) for seed in range(clients)
+                    ))
+                    elapsed = time.perf_counter() - start
+                    upstream = (await client.get(api_base.replace("/v1", "/_stats"))).json()["requests"] - before
+                    ordered = sorted(latencies)
+                    print(
+                        f"{clients:>8}{len(latencies):>8}{len(errors):>8}{len(latencies) / elapsed:>10.1f}"
+                        f"{statistics.median(ordered) * 1000:>10.2f}{ordered[int(len(ordered) * 0.99) - 1] * 1000:>10.2f}{upstream:>10}"
+                    )
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the SSE transport with many simulated clients")
+    parser.add_argument("--clients", type=int, action="append", help="Simulated clients per round (repeatable)")
+    parser.add_argument("--calls", type=int, default=40, help="Tool calls per client")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub latency per request in seconds")
+    parser.add_argument("--workers", type=int, default=32, help="LEMONSQUEEZY_WORKERS for the server")
+    asyncio.run(main(parser.parse_args()))
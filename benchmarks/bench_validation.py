@@ -0,0 +1,80 @@
+# bench_validation.py
+#
+# Cost of pre-flight input validation: compiling the tools.py schemas, and
+# validating valid and invalid payloads per write tool. When the jsonschema
+# package is installed, the same payloads are also run through it for
+# comparison.
+#
+#   python benchmarks/bench_validation.py --number 20000
+
+import os
+import sys
+import copy
+import time
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from mcp_lemonsqueezy.checkouts import load_template  # noqa: E402
+from mcp_lemonsqueezy.tools import get_lemonsqueezy_tools  # noqa: E402
+from mcp_lemonsqueezy.validation import compile_schema, tool_schema  # noqa: E402
+from run_benchmarks import CHECKOUT, WEBHOOK  # noqa: E402
+
+try:
+    import jsonschema
+except ImportError:
+    jsonschema = None
+
+INVALID_CHECKOUT = copy.deepcopy(CHECKOUT)
+INVALID_CHECKOUT["attributes"]["custom_price"] = "9900"
+del INVALID_CHECKOUT["attributes"]["checkout_data"]["name"]
+INVALID_WEBHOOK = copy.deepcopy(WEBHOOK)
+INVALID_WEBHOOK["data"]["attributes"]["events"] = ["order_created", 3]
+
+OVERRIDES = [{"attributes": {"checkout_data": {"email": f"bench{i}@example.com", "name": f"Bench {i}"}}} for i in range(100)]
+
+CASES = [
+    ("create_checkout", "valid", {"data": CHECKOUT}),
+    ("create_checkout", "invalid", {"data": INVALID_CHECKOUT}),
+    ("create_webhook", "valid", {"webhook_data": WEBHOOK}),
+    ("create_webhook", "invalid", {"webhook_data": INVALID_WEBHOOK}),
+    ("create_checkouts_bulk", "100 overrides", {"template": CHECKOUT, "overrides": OVERRIDES}),
+]
+
+
+def per_call_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main(args: argparse.Namespace) -> None:
+    tools = get_lemonsqueezy_tools()
+    start = time.perf_counter()
+    for tool in tools:
+        compile_schema(tool.inputSchema)
+    print(f"compile all {len(tools)} tool schemas: {(time.perf_counter() - start) * 1000:.2f} ms\n")
+
+    header = f"{'tool':<24}{'payload':<16}{'errors':>7}{'compiled us':>13}"
+    print(header + (f"{'jsonschema us':>15}" if jsonschema else ""))
+    for name, label, arguments in CASES:
+        validate = compile_schema(tool_schema(name))
+        errors = validate(arguments)
+        line = f"{name:<24}{label:<16}{len(errors):>7}{per_call_us(lambda: validate(arguments), args.number):>13.2f}"
+        if jsonschema:
+            reference = jsonschema.Draft7Validator(tool_schema(name))
+            line += f"{per_call_us(lambda: list(reference.iter_errors(arguments)), args.number // 10 or 1):>15.2f}"
+        print(line)
+
+    template = load_template({**CHECKOUT, "attributes": {"product_options": CHECKOUT["attributes"]["product_options"]}})
+    number = max(1, args.number // 10)
+    cost = per_call_us(lambda: [template.build(o) for o in OVERRIDES], number) / len(OVERRIDES)
+    print(f"\nbulk checkout: per override (merge, check, idempotency key): {cost:.2f} us")
+    if not jsonschema:
+        print("(install jsonschema to compare with a generic validator)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the cost of pre-flight input validation")
+    parser.add_argument("--number", type=int, default=20000, help="Validations per timing")
+    main(parser.parse_args())
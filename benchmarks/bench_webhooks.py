@@ -0,0 +1,123 @@
+# bench_webhooks.py
+#
+# Load-test the webhook receiver with a local generator of signed events.
+# Events are handled by the server's own handle_webhook_event: cache and
+# disk cache updates, the mirror upsert and resources/updated notifications
+# to a subscribed session. Before the run the response cache is warmed with
+# list pages and records, and afterwards it reports how many are still hot.
+#
+#   python benchmarks/bench_webhooks.py --events 5000 --concurrency 50
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+SECRET = "bench-secret"
+EVENTS = ["order_created", "subscription_updated", "license_key_created", "subscription_payment_success"]
+TYPES = {"order_created": "orders", "subscription_updated": "subscriptions",
+         "license_key_created": "license-keys", "subscription_payment_success": "subscription-invoices"}
+
+
+class Subscriber:
+    """
+    Stands in for a client session subscribed to record resources.
+    """
+
+    def __init__(self):
+        self.notified = 0
+
+    async def send_resource_updated(self, uri) -> None:
+        self.notified += 1
+
+
+def make_event(i: int) -> bytes:
+    name = EVENTS[i % len(EVENTS)]
+    return json.dumps({
+        "meta": {"event_name": name},
+        "data": {"type": TYPES[name], "id": str(i), "attributes": {"status": "paid", "updated_at": "2024-01-01T00:00:00.000000Z"}},
+    }).encode()
+
+
+async def main(args: argparse.Namespace, tmp: str) -> None:
+    os.environ.update({
+        "LEMONSQUEEZY_API_KEY": "benchmark",
+        "LEMONSQUEEZY_AUDIT_LOG_PATH": os.path.join(tmp, "audit.jsonl"),
+        "LEMONSQUEEZY_MIRROR_PATH": os.path.join(tmp, "mirror.sqlite3"),
+        "LEMONSQUEEZY_DISK_CACHE_PATH": os.path.join(tmp, "responses.sqlite3"),
+        # Room for every warmed and every updated record, so LRU eviction does not blur the picture
+        "LEMONSQUEEZY_CACHE_MAX_ENTRIES": str(args.events + args.cached_records * len(TYPES) + 100),
+    })
+    from mcp_lemonsqueezy import server
+    from mcp_lemonsqueezy.cache import make_key
+    from mcp_lemonsqueezy.mirror import MIRRORED, table_name
+    from mcp_lemonsqueezy.webhooks import WebhookReceiver, sign
+
+    cache = server.response_cache
+    # Records not touched by any event, plus the first list pages, of each resource
+    warm = [
+        make_key("GET", f"/{resource}/{args.events + i}")
+        for resource in TYPES.values() for i in range(args.cached_records)
+    ]
+    for resource in TYPES.values():
+        for page in range(1, 11):
+            cache.set(make_key("GET", f"/{resource}", {"page[number]": page}), resource, {"data": []})
+    for key in warm:
+        cache.set(key, key[1].split("/")[1], {"data": {}})
+    # The mirror is only updated once it exists
+    await asyncio.to_thread(lambda: server.store_mirror.conn)
+    subscriber = Subscriber()
+    for i in range(args.events):
+        server.resource_subscriptions.subscribe(f"lemonsqueezy://{TYPES[EVENTS[i % len(EVENTS)]]}/{i}", subscriber)
+
+    receiver = WebhookReceiver(server.handle_webhook_event, secret=SECRET, host="127.0.0.1", port=0, workers=args.workers, queue_size=args.queue_size)
+    await receiver.start()
+    url = f"http://127.0.0.1:{receiver.bound_port}{receiver.path}"
+    bodies = [make_event(i) for i in range(args.events)]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(limits=limits) as client:
+        async def send(body: bytes) -> None:
+            async with semaphore:
+                await client.post(url, content=body, headers={"X-Signature": sign(SECRET, body)})
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send(b) for b in bodies))
+        accepted_at = time.perf_counter()
+        await receiver.queue.join()
+        processed_at = time.perf_counter()
+    await receiver.stop()
+
+    stats = receiver.stats()
+    conn = server.store_mirror.conn
+    mirrored = sum(
+        conn.execute(f"SELECT COUNT(*) FROM {table_name(resource)}").fetchone()[0]
+        for resource in set(TYPES.values()) if resource in MIRRORED
+    )
+    still_cached = sum(1 for key in warm if key in cache._entries)
+    print(f"events sent:        {args.events}")
+    print(f"accepted:           {stats['received']} (dropped {stats['dropped']}, rejected {stats['rejected']})")
+    print(f"ingest events/sec:  {stats['received'] / (accepted_at - start):.1f}")
+    print(f"processed/sec:      {stats['processed'] / (processed_at - start):.1f}")
+    print(f"notifications:      {subscriber.notified}")
+    print(f"mirrored records:   {mirrored}")
+    print(f"untouched records still cached: {still_cached}/{len(warm)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the webhook receiver")
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--cached-records", type=int, default=250, help="Records per resource cached before the run")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(main(args, tmp))
@@ -0,0 +1,300 @@
+# run_benchmarks.py
+#
+# End-to-end benchmarks: every scenario starts the local API stub and a fresh
+# server process, then drives the server's tools through a real MCP client
+# session over stdio.
+#
+#   python benchmarks/run_benchmarks.py                  # run and compare with the baseline
+#   python benchmarks/run_benchmarks.py --save-baseline  # record a new baseline
+#   python benchmarks/run_benchmarks.py --scenario burst --fail-on-regression
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import statistics
+import tempfile
+from dataclasses import dataclass, field
+import httpx
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from stub_api import DEFAULT_COUNTS, start_stub  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVER = os.path.join(ROOT, "src", "mcp_lemonsqueezy", "server.py")
+BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "baseline.json")
+
+CHECKOUT = {
+    "type": "checkouts",
+    "attributes": {
+        "product_options": {"enabled_variants": [1]},
+        "checkout_data": {"email": "bench@example.com", "name": "Bench"},
+    },
+    "relationships": {
+        "store": {"data": {"type": "stores", "id": "1"}},
+        "variant": {"data": {"type": "variants", "id": "1"}},
+    },
+}
+WEBHOOK = {
+    "data": {
+        "type": "webhooks",
+        "attributes": {"url": "https://example.com/hook", "events": ["order_created"], "secret": "bench"},
+        "relationships": {"store": {"data": {"type": "stores", "id": "1"}}},
+    }
+}
+
+# Arguments used when calling each tool in the "single" scenario
+TOOL_ARGS = {
+    "get_store": {"store_id": "1"},
+    "get_product": {"product_id": "1"},
+    "get_product_variants": {"product_id": "1"},
+    "get_order": {"order_id": "1"},
+    "get_orders": {"order_ids": [str(i) for i in range(1, 21)]},
+    "get_customer": {"customer_id": "1"},
+    "get_customers": {"customer_ids": [str(i) for i in range(1, 21)]},
+    "get_subscription": {"subscription_id": "1"},
+    "get_subscriptions": {"subscription_ids": [str(i) for i in range(1, 21)]},
+    "get_license_key": {"license_key_id": "1"},
+    "get_license_keys": {"license_key_ids": [str(i) for i in range(1, 21)]},
+    "validate_license_key": {"license_key": "STUB-00000001-LICENSE"},
+    "validate_license_keys": {"licenses": [{"license_key": f"STUB-{i % 10 + 1:08d}-LICENSE"} for i in range(100)]},
+    "activate_license_key": {"license_key": "STUB-00000002-LICENSE", "instance_name": "bench"},
+    "deactivate_license_key": {"license_key": "STUB-00000002-LICENSE", "instance_id": "2-1"},
+    "create_checkout": {"data": CHECKOUT},
+    "create_checkouts_bulk": {
+        "template": {**CHECKOUT, "attributes": {"product_options": {"enabled_variants": [1]}}},
+        "overrides": [{"attributes": {"checkout_data": {"email": f"bench{i}@example.com", "name": f"Bench {i}"}}} for i in range(20)],
+    },
+    "create_webhook": {"webhook_data": WEBHOOK},
+    "export_resource": {"resource": "orders", "format": "csv"},
+    "mirror_sync": {"resources": ["orders", "subscriptions"]},
+    "mirror_query": {"resource": "orders", "filters": {"status": "paid"}},
+    "mirror_orders_for_customer": {"customer_id": "1", "days": 3650},
+}
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    duration: float = 0.0
+    max_rss_kb: int | None = None
+    upstream_requests: int = 0
+    throttled: int = 0
+    skipped: list[str] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies) or [0.0]
+
+        def pct(q: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 2)
+
+        return {
+            "calls": len(self.latencies),
+            "errors": self.errors,
+            "duration_s": round(self.duration, 3),
+            "throughput_per_s": round(len(self.latencies) / self.duration, 1) if self.duration else 0.0,
+            "p50_ms": round(statistics.median(ordered) * 1000, 2),
+            "p90_ms": pct(0.90),
+            "p99_ms": pct(0.99),
+            "server_max_rss_kb": self.max_rss_kb,
+            "upstream_requests": self.upstream_requests,
+            "upstream_throttled": self.throttled,
+            **({"skipped_tools": self.skipped} if self.skipped else {}),
+        }
+
+
+async def timed_call(session: ClientSession, result: ScenarioResult, name: str, args: dict) -> None:
+    start = time.perf_counter()
+    response = await session.call_tool(name, args)
+    result.latencies.append(time.perf_counter() - start)
+    if response.isError:
+        result.errors += 1
+
+
+async def scenario_single(session: ClientSession, result: ScenarioResult, args: argparse.Namespace) -> None:
+    """
+    Every tool, called one after another `repeat` times.
+    """
+    tools = (await session.list_tools()).tools
+    for _ in range(args.repeat):
+        for tool in tools:
+            required = tool.inputSchema.get("required") or []
+            if tool.name not in TOOL_ARGS and required:
+                if tool.name not in result.skipped:
+                    result.skipped.append(tool.name)
+                continue
+            await timed_call(session, result, tool.name, TOOL_ARGS.get(tool.name, {}))
+
+
+async def scenario_burst(session: ClientSession, result: ScenarioResult, args: argparse.Namespace) -> None:
+    """
+    Many concurrent get_* calls on random records.
+    """
+    rng = random.Random(42)
+    calls = [
+        rng.choice([
+            ("get_order", "order_id", DEFAULT_COUNTS["orders"]),
+            ("get_customer", "customer_id", DEFAULT_COUNTS["customers"]),
+            ("get_subscription", "subscription_id", DEFAULT_COUNTS["subscriptions"]),
+            ("get_product", "product_id", DEFAULT_COUNTS["products"]),
+        ])
+        for _ in range(args.burst)
+    ]
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(name: str, key: str, count: int) -> None:
+        async with semaphore:
+            await timed_call(session, result, name, {key: str(rng.randint(1, count))})
+
+    await asyncio.gather(*(one(*call) for call in calls))
+
+
+async def scenario_crawl(session: ClientSession, result: ScenarioResult, args: argparse.Namespace) -> None:
+    """
+    Full pagination crawls of the large list endpoints.
+    """
+    for name in ("list_orders", "list_customers", "list_subscriptions", "list_license_keys"):
+        await timed_call(session, result, name, {"all_pages": True, "max_items": 100000})
+
+
+SCENARIOS = {
+    "single": (scenario_single, {}),
+    "burst": (scenario_burst, {}),
+    "crawl": (scenario_crawl, {}),
+    # Burst against a stub that answers 429 above 50 requests/second
+    "throttled": (scenario_burst, {"rate_limit": 50}),
+}
+
+
+async def run_scenario(name: str, args: argparse.Namespace) -> ScenarioResult:
+    scenario, stub_options = SCENARIOS[name]
+    runner, api_base = await start_stub(latency=args.latency, jitter=args.jitter, **stub_options)
+    result = ScenarioResult(name)
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "LEMONSQUEEZY_API_KEY": "benchmark",
+            "LEMONSQUEEZY_API_BASE": api_base,
+            "LEMONSQUEEZY_AUDIT_LOG_PATH": os.path.join(tmp, "audit.jsonl"),
+            "LEMONSQUEEZY_MIRROR_PATH": os.path.join(tmp, "mirror.sqlite3"),
+            "LEMONSQUEEZY_DISK_CACHE_PATH": os.path.join(tmp, "responses.sqlite3"),
+            "LEMONSQUEEZY_EXPORT_DIR": os.path.join(tmp, "exports"),
+            # The stub decides when to throttle; keep the client-side bucket out of the way
+            "LEMONSQUEEZY_RATE_LIMIT": "1000000",
+            "LEMONSQUEEZY_RATE_BURST": "1000",
+            "LEMONSQUEEZY_LICENSE_RATE_LIMIT": "1000000",
+            "LEMONSQUEEZY_LICENSE_RATE_BURST": "1000",
+        }
+        params = StdioServerParameters(command=sys.executable, args=[SERVER], env=env, cwd=tmp)
+        with open(os.devnull, "w") as devnull:
+            async with stdio_client(params, errlog=devnull) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    start = time.perf_counter()
+                    await scenario(session, result, args)
+                    result.duration = time.perf_counter() - start
+                    metrics = await session.read_resource("metrics://lemonsqueezy")
+                    result.max_rss_kb = json.loads(metrics.contents[0].text).get("max_rss_kb")
+    async with httpx.AsyncClient() as client:
+        stats = (await client.get(api_base.replace("/v1", "/_stats"))).json()
+    result.upstream_requests, result.throttled = stats["requests"], stats["throttled"]
+    await runner.cleanup()
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = (baseline.get("scenarios") or {}).get(name)
+        if not previous:
+            continue
+        if previous["calls"] != current["calls"]:
+            # Tools were added or removed since the baseline: the timings are not comparable
+            regressions.append(f"{name}: {current['calls']} calls vs {previous['calls']} in the baseline; record a new baseline")
+            continue
+        if previous["throughput_per_s"] and current["throughput_per_s"] < previous["throughput_per_s"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput_per_s']}/s vs baseline {previous['throughput_per_s']}/s")
+        if previous["p99_ms"] and current["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {current['p99_ms']} ms vs baseline {previous['p99_ms']} ms")
+        if previous.get("server_max_rss_kb") and current.get("server_max_rss_kb") and \
+                current["server_max_rss_kb"] > previous["server_max_rss_kb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {current['server_max_rss_kb']} kB vs baseline {previous['server_max_rss_kb']} kB")
+    return regressions
+
+
+def print_table(results: dict) -> None:
+    header = f"{'scenario':<11}{'calls':>7}{'errors':>8}{'calls/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'RSS kB':>10}{'upstream':>10}{'429s':>7}"
+    print(header)
+    for name, r in results.items():
+        print(
+            f"{name:<11}{r['calls']:>7}{r['errors']:>8}{r['throughput_per_s']:>10}{r['p50_ms']:>10}"
+            f"{r['p90_ms']:>10}{r['p99_ms']:>10}{str(r['server_max_rss_kb']):>10}{r['upstream_requests']:>10}{r['upstream_throttled']:>7}"
+        )
+        if r.get("skipped_tools"):
+            print(f"  skipped (no sample arguments): {', '.join(r['skipped_tools'])}")
+
+
+def run_options(args: argparse.Namespace) -> dict:
+    return {"latency": args.latency, "jitter": args.jitter, "burst": args.burst, "concurrency": args.concurrency, "repeat": args.repeat}
+
+
+async def main(args: argparse.Namespace) -> int:
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("options") != run_options(args):
+            print(f"The baseline was recorded with {baseline.get('options')}; run with the same options to compare with it")
+            return 1 if args.fail_on_regression else 0
+    names = args.scenario or list(SCENARIOS)
+    results = {}
+    for name in names:
+        results[name] = (await run_scenario(name, args)).summary()
+    print_table(results)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "options": run_options(args),
+                "scenarios": results,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1 if args.fail_on_regression else 0
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run end-to-end benchmarks against the local API stub")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Run only these scenarios")
+    parser.add_argument("--latency", type=float, default=0.005, help="Stub latency per request in seconds")
+    parser.add_argument("--jitter", type=float, default=0.005, help="Extra random stub latency in seconds")
+    parser.add_argument("--burst", type=int, default=300, help="Calls in the burst scenarios")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent calls in the burst scenarios")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over every tool in the single scenario")
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline file to compare with or write")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before flagging a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on regressions")
+    sys.exit(asyncio.run(main(parser.parse_args())))
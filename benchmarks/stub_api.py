@@ -0,0 +1,379 @@
+# stub_api.py
+#
+# Local stand-in for api.lemonsqueezy.com used by the benchmarks. It serves
+# JSON:API documents for the resources the server uses, with page[number] /
+# page[size] pagination, simple filter[...] support, ETags (answering
+# If-None-Match with 304), the License API (validate, activate, deactivate),
+# optional artificial latency, optional 429 rate limiting and injectable
+# faults (POST /_faults: a 503 outage, or a slow tail of requests).
+#
+# Point the server at it with LEMONSQUEEZY_API_BASE=http://127.0.0.1:<port>/v1
+
+import json
+import time
+import random
+import hashlib
+import asyncio
+import argparse
+from datetime import datetime, timedelta, timezone
+from aiohttp import web
+
+MAX_PAGE_SIZE = 100
+DEFAULT_COUNTS = {
+    "stores": 3,
+    "products": 20,
+    "variants": 60,
+    "customers": 500,
+    "orders": 1000,
+    "subscriptions": 300,
+    "license-keys": 400,
+    "webhooks": 5,
+}
+
+
+def timestamp(index: int) -> str:
+    # Newest records first, like the real API
+    moment = datetime(2025, 1, 1, tzinfo=timezone.utc) - timedelta(hours=index)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.000000Z")
+
+
+def make_attributes(resource: str, i: int, counts: dict) -> dict:
+    store_id = i % counts["stores"] + 1
+    customer_id = i % counts["customers"] + 1
+    product_id = i % counts["products"] + 1
+    variant_id = i % counts["variants"] + 1
+    common = {"store_id": store_id, "created_at": timestamp(i), "updated_at": timestamp(i)}
+    if resource == "stores":
+        return {**common, "name": f"Store {i}", "currency": "USD", "total_revenue": 100000 * i}
+    if resource == "products":
+        return {**common, "name": f"Product {i}", "status": "published", "price": 1000 + i * 100}
+    if resource == "variants":
+        return {**common, "product_id": product_id, "name": f"Variant {i}", "status": "published", "price": 1000 + i * 10}
+    if resource == "customers":
+        return {**common, "name": f"Customer {i}", "email": f"customer{i}@example.com", "status": "subscribed"}
+    if resource == "orders":
+        return {
+            **common,
+            "customer_id": customer_id,
+            "identifier": f"order-{i}",
+            "order_number": i,
+            "user_email": f"customer{customer_id}@example.com",
+            "currency": "USD",
+            "status": "refunded" if i % 25 == 0 else "paid",
+            "subtotal": 900 + i % 50 * 100,
+            "total": 1000 + i % 50 * 100,
+            "total_usd": 1000 + i % 50 * 100,
+            "refunded": i % 25 == 0,
+            "first_order_item": {"product_id": product_id, "variant_id": variant_id, "price": 1000 + i % 50 * 100},
+        }
+    if resource == "subscriptions":
+        return {
+            **common,
+            "customer_id": customer_id,
+            "order_id": i,
+            "product_id": product_id,
+            "variant_id": variant_id,
+            "user_email": f"customer{customer_id}@example.com",
+            "status": ["active", "active", "active", "on_trial", "cancelled", "expired", "past_due"][i % 7],
+            "renews_at": timestamp(-24 * 30),
+            "ends_at": None,
+        }
+    if resource == "license-keys":
+        return {
+            **common,
+            "customer_id": customer_id,
+            "order_id": i,
+            "product_id": product_id,
+            "status": ["active", "inactive", "expired", "disabled"][i % 4],
+            "key": f"STUB-{i:08d}-LICENSE",
+            "key_short": f"XXXX-{i:08d}",
+            "activation_limit": 5,
+            "instances_count": i % 6,
+        }
+    if resource == "webhooks":
+        return {**common, "url": f"https://example.com/hooks/{i}", "events": ["order_created"], "test_mode": False}
+    return common
+
+
+def build_dataset(counts: dict) -> dict[str, list[dict]]:
+    return {
+        resource: [
+            {
+                "type": resource,
+                "id": str(i),
+                "attributes": make_attributes(resource, i, counts),
+                "links": {"self": f"/v1/{resource}/{i}"},
+            }
+            for i in range(1, count + 1)
+        ]
+        for resource, count in counts.items()
+    }
+
+
+class StubState:
+    def __init__(self, counts: dict, latency: float, jitter: float, rate_limit: float):
+        self.counts = {**DEFAULT_COUNTS, **(counts or {})}
+        self.data = build_dataset(self.counts)
+        self.index = {resource: {r["id"]: r for r in records} for resource, records in self.data.items()}
+        self.latency = latency
+        self.jitter = jitter
+        # Requests per second allowed before answering 429 (0 disables)
+        self.rate_limit = rate_limit
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self.requests = 0
+        self.throttled = 0
+        self.not_modified = 0
+        # Injected faults, changed at runtime through POST /_faults
+        self.outage = False
+        self.slow_rate = 0.0
+        self.slow_latency = 1.0
+        self.failed = 0
+        self.slowed = 0
+        # License API activations: instance id -> (license key id, instance name)
+        self.instances: dict[str, tuple[str, str]] = {}
+
+    async def delay(self) -> None:
+        extra = 0.0
+        if self.slow_rate and random.random() < self.slow_rate:
+            self.slowed += 1
+            extra = self.slow_latency
+        if self.latency or self.jitter or extra:
+            await asyncio.sleep(self.latency + random.uniform(0, self.jitter) + extra)
+
+    def check_rate(self) -> web.Response | None:
+        self.requests += 1
+        if self.outage:
+            self.failed += 1
+            return web.json_response({"errors": [{"status": "503", "title": "Service Unavailable"}]}, status=503)
+        if not self.rate_limit:
+            return None
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self._window_start, self._window_count = now, 0
+        self._window_count += 1
+        limit = int(self.rate_limit)
+        headers = {"X-RateLimit-Limit": str(limit * 60), "X-RateLimit-Remaining": str(max(0, limit - self._window_count))}
+        if self._window_count > limit:
+            self.throttled += 1
+            retry_after = max(0.0, 1.0 - (now - self._window_start))
+            return web.json_response(
+                {"errors": [{"status": "429", "title": "Too Many Requests"}]},
+                status=429,
+                headers={**headers, "Retry-After": f"{retry_after:.3f}"},
+            )
+        return None
+
+
+def create_app(latency: float = 0.0, jitter: float = 0.0, rate_limit: float = 0.0, counts: dict = None) -> web.Application:
+    state = StubState(counts, latency, jitter, rate_limit)
+
+    def page_of(request: web.Request, resource: str, records: list[dict]) -> dict:
+        number = max(1, int(request.query.get("page[number]", 1)))
+        size = min(MAX_PAGE_SIZE, max(1, int(request.query.get("page[size]", 10))))
+        last = max(1, -(-len(records) // size))
+        page = records[(number - 1) * size: number * size]
+        base = f"{request.url.origin()}/v1/{resource}"
+
+        def link(n: int) -> str:
+            return f"{base}?page%5Bnumber%5D={n}&page%5Bsize%5D={size}"
+
+        return {
+            "meta": {"page": {
+                "currentPage": number,
+                "from": (number - 1) * size + 1 if page else None,
+                "lastPage": last,
+                "perPage": size,
+                "to": (number - 1) * size + len(page) if page else None,
+                "total": len(records),
+            }},
+            "jsonapi": {"version": "1.0"},
+            "links": {
+                "first": link(1),
+                "last": link(last),
+                **({"next": link(number + 1)} if number < last else {}),
+                **({"prev": link(number - 1)} if number > 1 else {}),
+            },
+            "data": page,
+        }
+
+    def respond(request: web.Request, document: dict) -> web.Response:
+        body = json.dumps(document)
+        etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            state.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=body, content_type="application/json", headers={"ETag": etag})
+
+    def filtered(request: web.Request, records: list[dict]) -> list[dict]:
+        for key, value in request.query.items():
+            if key.startswith("filter[") and key.endswith("]"):
+                field = key[7:-1]
+                records = [r for r in records if str(r["attributes"].get(field)) == value]
+        return records
+
+    async def get_list(request: web.Request) -> web.Response:
+        if (throttled := state.check_rate()) is not None:
+            return throttled
+        await state.delay()
+        resource = request.match_info["resource"]
+        if resource not in state.data:
+            return web.json_response({"errors": [{"status": "404", "title": "Not Found"}]}, status=404)
+        return respond(request, page_of(request, resource, filtered(request, state.data[resource])))
+
+    async def get_one(request: web.Request) -> web.Response:
+        if (throttled := state.check_rate()) is not None:
+            return throttled
+        await state.delay()
+        resource, record_id = request.match_info["resource"], request.match_info["id"]
+        if resource == "users" and record_id == "me":
+            return web.json_response({"data": {"type": "users", "id": "1", "attributes": {"name": "Stub User", "email": "stub@example.com"}}})
+        record = state.index.get(resource, {}).get(record_id)
+        if record is None:
+            return web.json_response({"errors": [{"status": "404", "title": "Not Found"}]}, status=404)
+        return respond(request, {"jsonapi": {"version": "1.0"}, "links": record["links"], "data": record})
+
+    async def get_children(request: web.Request) -> web.Response:
+        if (throttled := state.check_rate()) is not None:
+            return throttled
+        await state.delay()
+        parent, resource = request.match_info["parent"], request.match_info["resource"]
+        foreign_key = parent.rstrip("s").replace("-", "_") + "_id"
+        records = [
+            r for r in state.data.get(resource, [])
+            if str(r["attributes"].get(foreign_key)) == request.match_info["parent_id"]
+        ]
+        return respond(request, page_of(request, resource, filtered(request, records)))
+
+    async def create(request: web.Request) -> web.Response:
+        if (throttled := state.check_rate()) is not None:
+            return throttled
+        await state.delay()
+        resource = request.match_info["resource"]
+        body = await request.json()
+        records = state.data.setdefault(resource, [])
+        record_id = str(len(records) + 1)
+        attributes = ((body.get("data") or {}).get("attributes") or {})
+        record = {
+            "type": resource,
+            "id": record_id,
+            "attributes": {**attributes, "created_at": timestamp(0), "updated_at": timestamp(0),
+                           "url": f"https://stub.lemonsqueezy.test/{resource}/{record_id}"},
+            "links": {"self": f"/v1/{resource}/{record_id}"},
+        }
+        records.append(record)
+        state.index.setdefault(resource, {})[record_id] = record
+        return web.json_response({"jsonapi": {"version": "1.0"}, "data": record}, status=201)
+
+    def license_answer(record: dict, instance_id: str | None) -> dict:
+        attributes = record["attributes"]
+        instance = state.instances.get(instance_id) if instance_id else None
+        return {
+            "license_key": {
+                "id": int(record["id"]),
+                "status": attributes["status"],
+                "key": attributes["key"],
+                "activation_limit": attributes["activation_limit"],
+                "activation_usage": sum(1 for key_id, _ in state.instances.values() if key_id == record["id"]),
+                "created_at": attributes["created_at"],
+                "expires_at": None,
+            },
+            "instance": {"id": instance_id, "name": instance[1], "created_at": attributes["created_at"]} if instance else None,
+            "meta": {"store_id": attributes["store_id"], "order_id": attributes["order_id"], "product_id": attributes["product_id"],
+                     "customer_id": attributes["customer_id"]},
+        }
+
+    async def license_api(request: web.Request) -> web.Response:
+        """
+        License API: validate, activate and deactivate with form-encoded
+        license_key / instance_id / instance_name, answering like the real one.
+        """
+        if (throttled := state.check_rate()) is not None:
+            return throttled
+        await state.delay()
+        action = request.match_info["action"]
+        form = await request.post()
+        flag = {"validate": "valid", "activate": "activated", "deactivate": "deactivated"}.get(action)
+        if flag is None:
+            return web.json_response({"error": "Not Found"}, status=404)
+        key = form.get("license_key", "")
+        record = next((r for r in state.data["license-keys"] if r["attributes"]["key"] == key), None)
+        if record is None:
+            return web.json_response({flag: False, "error": "license_key not found.", "license_key": None, "instance": None, "meta": None}, status=404)
+        instance_id = form.get("instance_id")
+        if instance_id and state.instances.get(instance_id, ("",))[0] != record["id"]:
+            return web.json_response({flag: False, "error": "license_key instance not found.", **license_answer(record, None)}, status=404)
+        usable = record["attributes"]["status"] in ("active", "inactive")
+        if action == "activate" and usable:
+            if license_answer(record, None)["license_key"]["activation_usage"] >= record["attributes"]["activation_limit"]:
+                return web.json_response({flag: False, "error": "This license key has reached the activation limit.", **license_answer(record, None)}, status=400)
+            instance_id = f"{record['id']}-{len(state.instances) + 1}"
+            state.instances[instance_id] = (record["id"], form.get("instance_name", ""))
+        elif action == "deactivate" and instance_id:
+            answer = license_answer(record, instance_id)
+            del state.instances[instance_id]
+            return web.json_response({flag: True, "error": None, **answer})
+        error = None if usable else f"This license key is {record['attributes']['status']}."
+        return web.json_response({flag: usable, "error": error, **license_answer(record, instance_id)})
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response({
+            "requests": state.requests,
+            "throttled": state.throttled,
+            "not_modified": state.not_modified,
+            "failed": state.failed,
+            "slowed": state.slowed,
+        })
+
+    async def faults(request: web.Request) -> web.Response:
+        """
+        {"outage": bool, "slow_rate": 0..1, "slow_latency": seconds}; omitted fields keep their value.
+        """
+        body = await request.json()
+        state.outage = bool(body.get("outage", state.outage))
+        state.slow_rate = float(body.get("slow_rate", state.slow_rate))
+        state.slow_latency = float(body.get("slow_latency", state.slow_latency))
+        return web.json_response({"outage": state.outage, "slow_rate": state.slow_rate, "slow_latency": state.slow_latency})
+
+    app = web.Application()
+    app["state"] = state
+    app.router.add_get("/_stats", stats)
+    app.router.add_post("/_faults", faults)
+    app.router.add_get("/v1/{resource}", get_list)
+    app.router.add_get("/v1/{resource}/{id}", get_one)
+    app.router.add_get("/v1/{parent}/{parent_id}/{resource}", get_children)
+    app.router.add_post("/v1/licenses/{action}", license_api)
+    app.router.add_post("/v1/{resource}", create)
+    return app
+
+
+async def start_stub(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    rate_limit: float = 0.0,
+    counts: dict = None,
+) -> tuple[web.AppRunner, str]:
+    """
+    Start the stub in the running event loop and return (runner, api_base).
+    """
+    runner = web.AppRunner(create_app(latency, jitter, rate_limit, counts), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the local Lemon Squeezy API stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0.0, help="Artificial latency per request in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency of up to this many seconds")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second before answering 429 (0 disables)")
+    parser.add_argument("--orders", type=int, default=DEFAULT_COUNTS["orders"], help="Number of orders to generate")
+    args = parser.parse_args()
+    app = create_app(args.latency, args.jitter, args.rate_limit, {"orders": args.orders})
+    web.run_app(app, host=args.host, port=args.port, access_log=None)
@@ -1,4 +1,4 @@
-from test import mcp
-
 def main():
-    mcp.run()
+    # Import the server only when it is started, so importing the package stays cheap
+    from .server import main as run_server
+    run_server()
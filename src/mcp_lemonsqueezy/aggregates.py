@@ -0,0 +1,235 @@
+# aggregates.py
+
+from collections import Counter, defaultdict
+from typing import AsyncIterator
+from .client import env_int
+
+# Upper bound on records scanned by one aggregation
+AGGREGATE_MAX_ITEMS = env_int("LEMONSQUEEZY_AGGREGATE_MAX_ITEMS", 100000)
+
+# Where aggregations read records from: the response cache (falling back to the
+# API), the API only, or the local mirror
+SOURCES = ("cache", "api", "mirror")
+
+# Filters the list endpoints accept as filter[...]; anything else is only applied locally
+API_FILTERS = {
+    "orders": {"store_id", "user_email"},
+    "customers": {"store_id", "email"},
+    "subscriptions": {"store_id", "order_id", "product_id", "variant_id", "status", "user_email"},
+    "license-keys": {"store_id", "order_id", "product_id", "status"},
+    "products": {"store_id"},
+    "variants": {"product_id", "status"},
+}
+
+# group_by values that bucket records by created_at instead of an attribute
+PERIODS = {"day": 10, "month": 7, "year": 4}
+
+GROUP_BY = {
+    "orders": {"store_id", "customer_id", "product_id", "variant_id", "status", "currency", *PERIODS},
+    "subscriptions": {"store_id", "product_id", "variant_id", "status", *PERIODS},
+    "license-keys": {"store_id", "product_id", "status", *PERIODS},
+}
+
+# Subscription statuses that count towards MRR, and those that count as churned
+MRR_STATUSES = {"active", "past_due"}
+CHURNED_STATUSES = {"cancelled", "expired"}
+
+# Billing interval -> months per interval
+INTERVAL_MONTHS = {"day": 12 / 365, "week": 12 / 52, "month": 1, "year": 12}
+
+
+def attribute(record: dict, name: str):
+    attributes = record.get("attributes") or {}
+    if name in attributes:
+        return attributes[name]
+    # Orders keep their product/variant under first_order_item
+    return (attributes.get("first_order_item") or {}).get(name)
+
+
+def matches(record: dict, filters: dict) -> bool:
+    for name, value in filters.items():
+        actual = attribute(record, name)
+        if isinstance(value, (list, tuple, set)):
+            if str(actual) not in {str(v) for v in value}:
+                return False
+        elif str(actual) != str(value):
+            return False
+    return True
+
+
+def check_group_by(resource: str, group_by: str | None) -> None:
+    if group_by is not None and group_by not in GROUP_BY[resource]:
+        raise ValueError(f"Cannot group {resource} by '{group_by}'. Expected one of: {', '.join(sorted(GROUP_BY[resource]))}")
+
+
+def group_key(record: dict, group_by: str | None) -> str:
+    if group_by is None:
+        return "all"
+    if group_by in PERIODS:
+        return (attribute(record, "created_at") or "")[: PERIODS[group_by]] or "unknown"
+    value = attribute(record, group_by)
+    return "unknown" if value is None else str(value)
+
+
+def api_params(resource: str, filters: dict) -> dict:
+    """
+    filter[...] query params for the filters the endpoint supports.
+    """
+    return {
+        f"filter[{name}]": value
+        for name, value in filters.items()
+        if name in API_FILTERS.get(resource, ()) and not isinstance(value, (list, tuple, set))
+    }
+
+
+class Scan:
+    """
+    Feeds records to an aggregation: applies filters and the created_at
+    window locally and, when records arrive newest first, stops at the
+    first one older than the window instead of reading the rest.
+    """
+
+    def __init__(self, filters: dict = None, since: str = None, until: str = None, newest_first: bool = False, max_items: int = None):
+        self.filters = {k: v for k, v in (filters or {}).items() if v is not None}
+        self.since = since
+        self.until = until
+        self.newest_first = newest_first
+        self.max_items = max_items or AGGREGATE_MAX_ITEMS
+        self.scanned = 0
+        self.matched = 0
+        self.stopped_early = False
+        self.truncated = False
+
+    async def __call__(self, records: AsyncIterator[dict]) -> AsyncIterator[dict]:
+        async for record in records:
+            if self.scanned >= self.max_items:
+                self.truncated = True
+                return
+            self.scanned += 1
+            created_at = attribute(record, "created_at") or ""
+            if self.since and created_at < self.since:
+                if self.newest_first:
+                    self.stopped_early = True
+                    return
+                continue
+            if self.until and created_at >= self.until:
+                continue
+            if self.filters and not matches(record, self.filters):
+                continue
+            self.matched += 1
+            yield record
+
+    def meta(self, source: str) -> dict:
+        return {
+            "source": source,
+            "scanned": self.scanned,
+            "matched": self.matched,
+            "since": self.since,
+            "until": self.until,
+            "stopped_early": self.stopped_early,
+            "truncated": self.truncated,
+        }
+
+
+async def summarize_orders(records: AsyncIterator[dict], group_by: str = None) -> dict:
+    """
+    Order count, totals and refunds per group. Amounts are in cents; `total`
+    is in each store's currency, `total_usd` is comparable across stores.
+    """
+    groups: dict[str, Counter] = defaultdict(Counter)
+    async for record in records:
+        refunded = attribute(record, "status") == "refunded" or bool(attribute(record, "refunded"))
+        total = attribute(record, "total") or 0
+        groups[group_key(record, group_by)].update({
+            "orders": 1,
+            "total": total,
+            "total_usd": attribute(record, "total_usd") or 0,
+            "refunds": int(refunded),
+            "refunded_amount": attribute(record, "refunded_amount") or (total if refunded else 0),
+        })
+    summary = {}
+    for key, sums in sorted(groups.items()):
+        summary[key] = {
+            "orders": sums["orders"],
+            "total": sums["total"],
+            "total_usd": sums["total_usd"],
+            "refunds": sums["refunds"],
+            "refunded_amount": sums["refunded_amount"],
+            "net": sums["total"] - sums["refunded_amount"],
+        }
+    return summary
+
+
+def monthly_price(variant: dict) -> float:
+    price = attribute(variant, "price") or 0
+    interval = attribute(variant, "interval") or "month"
+    count = attribute(variant, "interval_count") or 1
+    return price / count / INTERVAL_MONTHS.get(interval, 1)
+
+
+async def variant_prices(records: AsyncIterator[dict]) -> dict[str, float]:
+    """
+    Monthly price in cents for every variant ID.
+    """
+    return {str(record.get("id")): monthly_price(record) async for record in records}
+
+
+async def summarize_subscriptions(records: AsyncIterator[dict], prices: dict[str, float], group_by: str = None, churned_since: str = None) -> dict:
+    """
+    Monthly recurring revenue, status counts and churn per group. MRR counts
+    active and past-due subscriptions at their variant's monthly price.
+    """
+    groups: dict[str, Counter] = defaultdict(Counter)
+    async for record in records:
+        status = attribute(record, "status") or "unknown"
+        sums = groups[group_key(record, group_by)]
+        sums["subscriptions"] += 1
+        sums[f"status:{status}"] += 1
+        if status in MRR_STATUSES:
+            sums["mrr"] += prices.get(str(attribute(record, "variant_id")), 0)
+        elif status in CHURNED_STATUSES and (churned_since is None or (attribute(record, "updated_at") or "") >= churned_since):
+            sums["churned"] += 1
+    summary = {}
+    for key, sums in sorted(groups.items()):
+        paying = sum(sums[f"status:{s}"] for s in MRR_STATUSES)
+        summary[key] = {
+            "subscriptions": sums["subscriptions"],
+            "by_status": {k[7:]: v for k, v in sorted(sums.items()) if k.startswith("status:")},
+            "mrr": round(sums["mrr"]),
+            "churned": sums["churned"],
+            "churn_rate": round(sums["churned"] / (paying + sums["churned"]), 4) if paying + sums["churned"] else 0.0,
+        }
+    return summary
+
+
+async def summarize_license_keys(records: AsyncIterator[dict], group_by: str = None) -> dict:
+    """
+    Key counts by status and activation usage per group.
+    """
+    groups: dict[str, Counter] = defaultdict(Counter)
+    async for record in records:
+        status = attribute(record, "status") or "unknown"
+        limit = attribute(record, "activation_limit")
+        used = attribute(record, "instances_count") or 0
+        sums = groups[group_key(record, group_by)]
+        sums["keys"] += 1
+        sums[f"status:{status}"] += 1
+        sums["activations"] += used
+        if limit is None:
+            sums["unlimited"] += 1
+        else:
+            sums["activation_limit"] += limit
+            sums["limited_activations"] += used
+            sums["at_limit"] += int(used >= limit)
+    summary = {}
+    for key, sums in sorted(groups.items()):
+        summary[key] = {
+            "keys": sums["keys"],
+            "by_status": {k[7:]: v for k, v in sorted(sums.items()) if k.startswith("status:")},
+            "activations": sums["activations"],
+            "activation_limit": sums["activation_limit"],
+            "at_limit": sums["at_limit"],
+            "unlimited": sums["unlimited"],
+            "utilization": round(sums["limited_activations"] / sums["activation_limit"], 4) if sums["activation_limit"] else 0.0,
+        }
+    return summary
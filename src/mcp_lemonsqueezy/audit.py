@@ -0,0 +1,237 @@
+# audit.py
+
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterator
+from .client import env_float, env_int
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+DEFAULT_AUDIT_LOG_PATH = os.path.join(os.path.expanduser("~"), ".cache", "mcp-lemonsqueezy", "audit.jsonl")
+
+# Parameter fields never logged: credentials (e.g. a webhook signing secret)
+# and customer details (e.g. checkout_data of a checkout)
+REDACTED_FIELDS = frozenset({
+    "secret", "api_key", "password", "token", "authorization", "license_key",
+    "email", "name", "billing_address", "tax_number", "phone",
+})
+REDACTED = "[redacted]"
+
+
+def redact(value):
+    """
+    Copy of logged parameters with REDACTED_FIELDS replaced at any depth.
+    """
+    if isinstance(value, dict):
+        return {k: REDACTED if isinstance(k, str) and k.lower() in REDACTED_FIELDS else redact(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    return value
+
+
+def parse_time(value: str | None) -> float | None:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class AuditEntry:
+    __slots__ = ("timestamp", "operation", "parameters")
+
+    def __init__(self, timestamp: float, operation: str, parameters: dict):
+        self.timestamp = timestamp
+        self.operation = operation
+        self.parameters = parameters
+
+    @property
+    def isotime(self) -> str:
+        return datetime.fromtimestamp(self.timestamp, timezone.utc).replace(tzinfo=None).isoformat()
+
+    def to_dict(self) -> dict:
+        return {"timestamp": self.isotime, "operation": self.operation, "parameters": self.parameters}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(",", ":"), default=str)
+
+    def matches(self, operation: str = None, since: float = None, until: float = None) -> bool:
+        return (
+            (operation is None or self.operation == operation)
+            and (since is None or self.timestamp >= since)
+            and (until is None or self.timestamp < until)
+        )
+
+
+class AuditLog:
+    """
+    Bounded ring of recent operations, mirrored to an append-only JSONL file
+    with size-based rotation. log() never touches the disk: a background
+    flusher writes pending entries in batches. Secrets and customer details
+    in the parameters are redacted before they are kept anywhere.
+    """
+
+    def __init__(self, capacity: int = None, path: str = None, max_bytes: int = None, backups: int = None, flush_interval: float = None):
+        self.capacity = capacity or env_int("LEMONSQUEEZY_AUDIT_LOG_CAPACITY", 1000)
+        if path is None:
+            path = os.getenv("LEMONSQUEEZY_AUDIT_LOG_PATH", DEFAULT_AUDIT_LOG_PATH)
+        self.path = os.path.expanduser(path) if path else None
+        self.max_bytes = max_bytes or env_int("LEMONSQUEEZY_AUDIT_LOG_MAX_BYTES", 10 * 1024 * 1024)
+        self.backups = backups if backups is not None else env_int("LEMONSQUEEZY_AUDIT_LOG_BACKUPS", 5)
+        self.flush_interval = flush_interval or env_float("LEMONSQUEEZY_AUDIT_LOG_FLUSH_INTERVAL", 1.0)
+        self.entries: deque[AuditEntry] = deque(maxlen=self.capacity)
+        # Waiting for the flusher; bounded so a missing flusher cannot grow memory
+        self._pending: deque[AuditEntry] = deque(maxlen=self.capacity * 10)
+        self._flusher: asyncio.Task | None = None
+        # One write at a time: query_audit_log and the flusher both flush
+        self._flush_lock = asyncio.Lock()
+        self._users = 0
+        self.total = 0
+        self.written = 0
+
+    def log(self, operation: str, params: dict):
+        entry = AuditEntry(time.time(), operation, redact(params))
+        self.entries.append(entry)
+        self.total += 1
+        if self.path:
+            self._pending.append(entry)
+
+    # Reads
+
+    def tail(self, count: int = 50, operation: str = None, since: str = None, until: str = None, offset: int = 0) -> list[AuditEntry]:
+        """
+        The most recent matching entries in the ring, oldest first, skipping
+        `offset` newer matches (for paging backwards).
+        """
+        since_ts, until_ts = parse_time(since), parse_time(until)
+        selected = []
+        skipped = 0
+        for entry in reversed(self.entries):
+            if not entry.matches(operation, since_ts, until_ts):
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            selected.append(entry)
+            if len(selected) >= count:
+                break
+        selected.reverse()
+        return selected
+
+    def read_file(self, count: int = 50, operation: str = None, since: str = None, until: str = None, offset: int = 0) -> list[dict]:
+        """
+        Page through the on-disk history (including rotated files), newest
+        entries last, without loading whole files into memory.
+        """
+        since_ts, until_ts = parse_time(since), parse_time(until)
+        window: deque[dict] = deque(maxlen=count + offset)
+        for line in self._iter_file_lines():
+            try:
+                record = json.loads(line)
+                timestamp = parse_time(record["timestamp"])
+            except (ValueError, KeyError, TypeError):
+                # A line cut short by a crash or a full disk
+                continue
+            if operation is not None and record.get("operation") != operation:
+                continue
+            if (since_ts is not None and timestamp < since_ts) or (until_ts is not None and timestamp >= until_ts):
+                continue
+            window.append(record)
+        records = list(window)
+        return records[: max(0, len(records) - offset)]
+
+    def _iter_file_lines(self) -> Iterator[str]:
+        if not self.path:
+            return
+        for index in range(self.backups, -1, -1):
+            name = f"{self.path}.{index}" if index else self.path
+            if not os.path.exists(name):
+                continue
+            with open(name, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield line
+
+    def synthesize(self, count: int = 50) -> str:
+        entries = self.tail(count)
+        if not entries:
+            return "No Lemon Squeezy operations logged."
+        text = "\n\n".join([
+            f"[{entry.isotime}]\nOperation: {entry.operation}\nParams: {json.dumps(entry.parameters, default=str)}"
+            for entry in entries
+        ])
+        if self.total > len(entries):
+            text = f"Showing the last {len(entries)} of {self.total} operations.\n\n{text}"
+        return text
+
+    # Background flushing
+
+    def _write(self, entries: list[AuditEntry]) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        data = "".join(entry.to_json() + "\n" for entry in entries)
+        if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+        self.written += len(entries)
+
+    def _rotate(self) -> None:
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch = list(self._pending)
+            self._pending.clear()
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except OSError:
+                logger.exception("Failed to write audit log to %s", self.path)
+
+    async def _run_flusher(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    @asynccontextmanager
+    async def lifespan(self) -> AsyncIterator[None]:
+        """
+        Run the background flusher while at least one server session is
+        active; flush what is left when the last one exits.
+        """
+        self._users += 1
+        if self.path and (self._flusher is None or self._flusher.done()):
+            self._flusher = asyncio.create_task(self._run_flusher())
+        try:
+            yield
+        finally:
+            self._users -= 1
+            if self._users == 0 and self._flusher is not None:
+                self._flusher.cancel()
+                await asyncio.gather(self._flusher, return_exceptions=True)
+                self._flusher = None
+                await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "in_memory": len(self.entries),
+            "total": self.total,
+            "pending": len(self._pending),
+            "written": self.written,
+            "path": self.path,
+        }
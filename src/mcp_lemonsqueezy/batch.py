@@ -0,0 +1,95 @@
+# batch.py
+
+import asyncio
+import logging
+from contextlib import aclosing
+from .client import LemonSqueezyAPIError, env_int
+from .pagination import MAX_PAGE_SIZE, Fetch, paginate
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+# Parallel single-record requests per batch
+BATCH_CONCURRENCY = env_int("LEMONSQUEEZY_BATCH_CONCURRENCY", 10)
+# Batches at least this large first check whether crawling the list endpoint is cheaper
+LIST_THRESHOLD = env_int("LEMONSQUEEZY_BATCH_LIST_THRESHOLD", 10)
+
+
+def error_detail(exc: Exception) -> dict:
+    if isinstance(exc, LemonSqueezyAPIError):
+        return {"status": exc.status_code, "detail": exc.body}
+    return {"status": None, "detail": str(exc)}
+
+
+async def collect_from_list(fetch: Fetch, endpoint: str, wanted: set[str], found: dict[str, dict]) -> None:
+    """
+    Read the first list page; keep crawling only while the remaining pages
+    are fewer than the IDs still missing.
+    """
+    params = {"page[size]": MAX_PAGE_SIZE, "page[number]": 1}
+    first = await fetch("GET", endpoint, params=params)
+    for record in first.get("data") or []:
+        if record.get("id") in wanted:
+            found[record["id"]] = record
+    last_page = ((first.get("meta") or {}).get("page") or {}).get("lastPage") or 1
+    remaining = wanted - found.keys()
+    if not remaining or last_page <= 1 or last_page - 1 >= len(remaining):
+        return
+    async with aclosing(paginate(fetch, endpoint, params={**params, "page[number]": 2})) as stream:
+        async for record in stream:
+            if record.get("id") in remaining:
+                found[record["id"]] = record
+                remaining.discard(record["id"])
+                if not remaining:
+                    break
+
+
+async def batch_get(
+    fetch: Fetch,
+    endpoint: str,
+    ids: list[str],
+    concurrency: int = None,
+    list_threshold: int = None,
+    bulk_fetch: Fetch = None,
+) -> dict:
+    """
+    Fetch many records of one resource type. Duplicate IDs are dropped; for
+    large batches the list endpoint is crawled when it needs fewer requests
+    than one GET per ID; whatever is left is fetched concurrently. Failures
+    are reported per ID instead of failing the whole batch.
+    """
+    concurrency = concurrency or BATCH_CONCURRENCY
+    list_threshold = list_threshold or LIST_THRESHOLD
+    bulk_fetch = bulk_fetch or fetch
+    unique = list(dict.fromkeys(str(i) for i in ids))
+    found: dict[str, dict] = {}
+    errors: dict[str, dict] = {}
+
+    if len(unique) >= list_threshold:
+        try:
+            await collect_from_list(bulk_fetch, endpoint, set(unique), found)
+        except Exception as e:
+            # Transport errors and open circuits too: the per-ID requests report their own failures
+            logger.info("List lookup for %s failed (%s); fetching records one by one", endpoint, getattr(e, "status_code", None) or type(e).__name__)
+    from_list = len(found)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_one(record_id: str) -> None:
+        async with semaphore:
+            try:
+                found[record_id] = (await fetch("GET", f"{endpoint}/{record_id}"))["data"]
+            except Exception as e:
+                errors[record_id] = error_detail(e)
+
+    await asyncio.gather(*(fetch_one(i) for i in unique if i not in found))
+    return {
+        "data": [found[i] for i in unique if i in found],
+        "errors": errors,
+        "meta": {
+            "requested": len(ids),
+            "unique": len(unique),
+            "found": len(found),
+            "failed": len(errors),
+            "from_list": from_list,
+        },
+    }
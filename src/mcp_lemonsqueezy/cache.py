@@ -0,0 +1,172 @@
+# cache.py
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+from .client import env_bool, env_float, env_int
+
+# Seconds a cached GET response stays fresh, per resource type. Catalog data
+# rarely changes; orders and subscriptions move quickly.
+DEFAULT_TTLS = {
+    "users": 300.0,
+    "stores": 600.0,
+    "products": 600.0,
+    "variants": 600.0,
+    "customers": 60.0,
+    "license-keys": 60.0,
+    "webhooks": 60.0,
+    "orders": 30.0,
+    "subscriptions": 30.0,
+}
+
+MISSING = object()
+
+
+def parse_ttls(value: str) -> dict[str, float]:
+    """
+    Parse LEMONSQUEEZY_CACHE_TTLS, e.g. "products=3600,orders=10".
+    """
+    ttls = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        resource, _, seconds = item.partition("=")
+        ttls[resource.strip()] = float(seconds)
+    return ttls
+
+
+def resource_of(endpoint: str) -> str:
+    """
+    Map an endpoint to the resource type it returns:
+    /orders -> orders, /orders/1 -> orders, /products/1/variants -> variants.
+    """
+    segments = endpoint.strip("/").split("/")
+    return segments[2] if len(segments) > 2 else segments[0]
+
+
+def other_record(key: tuple, resource: str, record_id: str) -> bool:
+    """
+    Whether a cache key is a GET of one record of `resource` other than
+    `record_id`: /orders/7 for record 8, but not /orders or /orders/8.
+    """
+    segments = key[1].strip("/").split("/")
+    return len(segments) == 2 and segments[0] == resource and segments[1] != str(record_id)
+
+
+def make_key(method: str, endpoint: str, params: dict = None) -> tuple:
+    items = tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+    return (method.upper(), endpoint, items)
+
+
+class ResponseCache:
+    """
+    Bounded in-process cache for GET responses with a TTL per resource type
+    and least-recently-used eviction once max_entries is reached. Expired
+    entries are kept for another `stale_ttl` seconds so get_stale() can
+    still answer while the API is down.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = None,
+        default_ttl: float = None,
+        ttls: dict[str, float] = None,
+        enabled: bool = None,
+        stale_ttl: float = None,
+    ):
+        self.max_entries = max_entries or env_int("LEMONSQUEEZY_CACHE_MAX_ENTRIES", 1024)
+        self.default_ttl = default_ttl if default_ttl is not None else env_float("LEMONSQUEEZY_CACHE_DEFAULT_TTL", 60.0)
+        self.ttls = {**DEFAULT_TTLS, **parse_ttls(os.getenv("LEMONSQUEEZY_CACHE_TTLS", "")), **(ttls or {})}
+        self.enabled = enabled if enabled is not None else env_bool("LEMONSQUEEZY_CACHE_ENABLED", True)
+        self.stale_ttl = stale_ttl if stale_ttl is not None else env_float("LEMONSQUEEZY_CACHE_STALE_TTL", 3600.0)
+        # key -> (expires_at, resource, value)
+        self._entries: OrderedDict[Hashable, tuple[float, str, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def ttl_for(self, resource: str) -> float:
+        return self.ttls.get(resource, self.default_ttl)
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        expires_at, _, value = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            if expires_at + self.stale_ttl <= now:
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get_stale(self, key: Hashable) -> tuple[Any, float] | Any:
+        """
+        (value, seconds since it expired) for an entry still inside the
+        stale window, or MISSING. Only for serving while the API is failing.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, _, value = entry
+        expired_for = time.monotonic() - expires_at
+        if expired_for >= self.stale_ttl:
+            return MISSING
+        return value, max(0.0, expired_for)
+
+    def set(self, key: Hashable, resource: str, value: Any, ttl: float = None) -> None:
+        ttl = self.ttl_for(resource) if ttl is None else min(ttl, self.ttl_for(resource))
+        if not self.enabled or ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, resource, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *resources: str) -> int:
+        """
+        Drop every cached response for the given resource types.
+        """
+        stale = [key for key, (_, resource, _) in self._entries.items() if resource in resources]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def invalidate_record(self, resource: str, record_id: str) -> int:
+        """
+        Drop what a change to one record can affect: the resource's list and
+        filtered responses and that record's own entries. Other records of
+        the resource stay cached.
+        """
+        stale = [key for key, (_, r, _) in self._entries.items() if r == resource and not other_record(key, resource, record_id)]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_ttl": self.stale_ttl,
+            "ttls": self.ttls,
+        }
@@ -0,0 +1,250 @@
+# checkouts.py
+
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from contextlib import aclosing
+from functools import cache, lru_cache
+from typing import AsyncIterator
+import httpx
+from .batch import error_detail
+from .client import LemonSqueezyAPIError, env_float, env_int
+from .pagination import Fetch, paginate
+from .singleflight import SingleFlight
+from .validation import SchemaError, Validator, compile_schema, tool_schema
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+# Checkouts created at once by one bulk call
+CHECKOUT_CONCURRENCY = env_int("LEMONSQUEEZY_CHECKOUT_CONCURRENCY", 8)
+# Attempts per checkout when a POST fails without a definite answer
+CHECKOUT_ATTEMPTS = env_int("LEMONSQUEEZY_CHECKOUT_ATTEMPTS", 3)
+# Recent checkouts searched for one created by an interrupted attempt
+RECONCILE_MAX_ITEMS = env_int("LEMONSQUEEZY_CHECKOUT_RECONCILE_ITEMS", 200)
+
+# Where the idempotency key is stored on the checkout (echoed back by the API)
+KEY_PATH = ("attributes", "checkout_data", "custom", "idempotency_key")
+
+
+def canonical(value) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def deep_merge(base: dict, override: dict) -> dict:
+    """
+    Copy of `base` with `override` merged in: nested objects are merged,
+    anything else replaces the template value.
+    """
+    merged = dict(base)
+    for name, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(name), dict):
+            merged[name] = deep_merge(merged[name], value)
+        else:
+            merged[name] = value
+    return merged
+
+
+def dig(value: dict, path: tuple) -> object:
+    for name in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(name)
+    return value
+
+
+@cache
+def checkout_validator(types: bool = True, required: bool = True) -> Validator:
+    """
+    Compiled validator for the create_checkout `data` argument, which templates and overrides follow.
+    """
+    return compile_schema(tool_schema("create_checkout")["properties"]["data"], types, required)
+
+
+class CheckoutTemplate:
+    """
+    A checkout `data` object validated once against the create_checkout
+    schema; per-customer overrides are merged onto it and only the override
+    and the required fields of the result are checked again.
+    """
+
+    def __init__(self, data: dict):
+        errors = checkout_validator(required=False)(data, "template")
+        if errors:
+            raise SchemaError(errors)
+        self.data = data
+
+    def build(self, override: dict, path: str = "override") -> tuple[dict, str]:
+        """
+        The merged checkout and its idempotency key: the one given in the
+        override (or at custom.idempotency_key), else a hash of the checkout.
+        """
+        override = dict(override)
+        key = override.pop("idempotency_key", None)
+        errors = checkout_validator(required=False)(override, path)
+        payload = deep_merge(self.data, override)
+        errors += checkout_validator(types=False)(payload, path)
+        if errors:
+            raise SchemaError(errors)
+        key = str(key or dig(payload, KEY_PATH) or "ck_" + hashlib.sha256(canonical(payload).encode()).hexdigest()[:32])
+        return deep_merge(payload, {"attributes": {"checkout_data": {"custom": {"idempotency_key": key}}}}), key
+
+
+@lru_cache(maxsize=32)
+def _compiled_template(text: str) -> CheckoutTemplate:
+    return CheckoutTemplate(json.loads(text))
+
+
+def load_template(data: dict) -> CheckoutTemplate:
+    """
+    Validated template for `data`, reused while the same template is sent again.
+    """
+    return _compiled_template(canonical(data))
+
+
+class IdempotencyLedger:
+    """
+    Checkouts already created, by idempotency key, so a retried call returns
+    them instead of creating duplicates; plus the keys whose last POST ended
+    without a definite answer, which are looked up before trying again.
+    In memory, bounded by size and age.
+    """
+
+    def __init__(self, capacity: int = None, ttl: float = None):
+        self.capacity = capacity or env_int("LEMONSQUEEZY_IDEMPOTENCY_CAPACITY", 10000)
+        self.ttl = ttl or env_float("LEMONSQUEEZY_IDEMPOTENCY_TTL", 86400.0)
+        self._created: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.unknown: set[str] = set()
+
+    def get(self, key: str) -> dict | None:
+        entry = self._created.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl:
+            del self._created[key]
+            return None
+        return entry[1]
+
+    def set(self, key: str, checkout: dict) -> None:
+        self._created[key] = (time.monotonic(), checkout)
+        self._created.move_to_end(key)
+        self.unknown.discard(key)
+        while len(self._created) > self.capacity:
+            self._created.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"created": len(self._created), "unknown": len(self.unknown), "capacity": self.capacity, "ttl": self.ttl}
+
+
+def ambiguous(exc: Exception) -> bool:
+    """
+    Whether a failed POST may still have created the checkout.
+    """
+    if isinstance(exc, LemonSqueezyAPIError):
+        return exc.status_code >= 500
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError))
+
+
+class CheckoutPipeline:
+    """
+    Creates many checkouts from one template concurrently. Each checkout
+    carries an idempotency key: keys already created are replayed from the
+    ledger, concurrent requests for one key share a single POST, and after a
+    POST with an unknown outcome the store's recent checkouts are searched
+    for the key before it is sent again.
+    """
+
+    def __init__(self, fetch: Fetch, ledger: IdempotencyLedger = None, concurrency: int = None, attempts: int = None):
+        self.fetch = fetch
+        self.ledger = ledger or IdempotencyLedger()
+        self.concurrency = concurrency or CHECKOUT_CONCURRENCY
+        self.attempts = attempts or CHECKOUT_ATTEMPTS
+        self._flights = SingleFlight(enabled=True)
+        self.created = 0
+        self.replayed = 0
+        self.reconciled = 0
+
+    async def find(self, payload: dict, key: str) -> dict | None:
+        """
+        A checkout already carrying `key`, among the store's recent checkouts for the variant.
+        """
+        params = {
+            "filter[store_id]": dig(payload, ("relationships", "store", "data", "id")),
+            "filter[variant_id]": dig(payload, ("relationships", "variant", "data", "id")),
+        }
+        params = {name: value for name, value in params.items() if value is not None}
+        async with aclosing(paginate(self.fetch, "/checkouts", params=params, max_items=RECONCILE_MAX_ITEMS)) as records:
+            async for record in records:
+                if dig(record, KEY_PATH) == key:
+                    return record
+        return None
+
+    async def _create(self, payload: dict, key: str) -> tuple[str, dict]:
+        last_error = None
+        for attempt in range(self.attempts):
+            if key in self.ledger.unknown:
+                found = await self.find(payload, key)
+                if found is not None:
+                    self.ledger.set(key, found)
+                    self.reconciled += 1
+                    return "reconciled", found
+            try:
+                checkout = (await self.fetch("POST", "/checkouts", json_data={"data": payload}))["data"]
+            except Exception as e:
+                if not ambiguous(e):
+                    raise
+                self.ledger.unknown.add(key)
+                last_error = e
+                logger.info("Checkout %s failed without a definite answer (attempt %d): %s", key, attempt + 1, e)
+                continue
+            self.ledger.set(key, checkout)
+            self.created += 1
+            return "created", checkout
+        raise last_error
+
+    async def create(self, payload: dict, key: str) -> tuple[str, dict]:
+        """
+        (status, checkout) for one checkout; status is created, replayed or reconciled.
+        """
+        checkout = self.ledger.get(key)
+        if checkout is not None:
+            self.replayed += 1
+            return "replayed", checkout
+        return await self._flights.do(key, lambda: self._create(payload, key))
+
+    async def run(self, template: CheckoutTemplate, overrides: list[dict], concurrency: int = None) -> AsyncIterator[dict]:
+        """
+        Yield one result per override as each completes: index, idempotency
+        key, status and the checkout (or the error).
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def one(index: int, override: dict) -> dict:
+            try:
+                payload, key = template.build(override, f"overrides[{index}]")
+            except SchemaError as e:
+                return {"index": index, "status": "invalid", "errors": e.errors}
+            async with semaphore:
+                try:
+                    status, checkout = await self.create(payload, key)
+                except Exception as e:
+                    return {"index": index, "idempotency_key": key, "status": "failed", "error": error_detail(e)}
+            return {"index": index, "idempotency_key": key, "status": status, "data": checkout}
+
+        tasks = [asyncio.ensure_future(one(i, override)) for i, override in enumerate(overrides)]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield await done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "created": self.created,
+            "replayed": self.replayed,
+            "reconciled": self.reconciled,
+            "ledger": self.ledger.stats(),
+        }
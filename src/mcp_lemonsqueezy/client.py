@@ -0,0 +1,109 @@
+# client.py
+
+import os
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+import httpx
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class LemonSqueezyAPIError(Exception):
+    """
+    Raised when the Lemon Squeezy API answers with a 4xx/5xx status.
+    """
+
+    def __init__(self, status_code: int, body: str, headers: dict = None):
+        super().__init__(f"{status_code}: {body}")
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+
+class HttpClientPool:
+    """
+    One long-lived httpx.AsyncClient shared by every Lemon Squeezy API call,
+    so connections (and their TLS sessions) are reused across tool calls.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = None,
+        max_keepalive_connections: int = None,
+        keepalive_expiry: float = None,
+        http2: bool = None,
+        timeout: float = None,
+        connect_timeout: float = None,
+        read_timeout: float = None,
+    ):
+        self.max_connections = max_connections or env_int("LEMONSQUEEZY_HTTP_MAX_CONNECTIONS", 100)
+        self.max_keepalive_connections = max_keepalive_connections or env_int(
+            "LEMONSQUEEZY_HTTP_MAX_KEEPALIVE", 20
+        )
+        self.keepalive_expiry = keepalive_expiry or env_float("LEMONSQUEEZY_HTTP_KEEPALIVE_EXPIRY", 30.0)
+        self.http2 = http2 if http2 is not None else env_bool("LEMONSQUEEZY_HTTP2", False)
+        # Overall default (write and pool waits); connecting and reading get their own budgets
+        self.timeout = timeout or env_float("LEMONSQUEEZY_HTTP_TIMEOUT", 30.0)
+        self.connect_timeout = connect_timeout or env_float("LEMONSQUEEZY_HTTP_CONNECT_TIMEOUT", 5.0)
+        self.read_timeout = read_timeout or env_float("LEMONSQUEEZY_HTTP_READ_TIMEOUT", 15.0)
+        self._client: httpx.AsyncClient | None = None
+        self._users = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build()
+        return self._client
+
+    def _build(self) -> httpx.AsyncClient:
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+                http2 = False
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        timeout = httpx.Timeout(self.timeout, connect=self.connect_timeout, read=self.read_timeout)
+        return httpx.AsyncClient(limits=limits, http2=http2, timeout=timeout)
+
+    @asynccontextmanager
+    async def lifespan(self) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        Keep the client open while at least one server session is running and
+        close it once the last one exits.
+        """
+        self._users += 1
+        try:
+            yield self.client
+        finally:
+            self._users -= 1
+            if self._users == 0:
+                await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
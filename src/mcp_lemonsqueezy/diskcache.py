@@ -0,0 +1,316 @@
+# diskcache.py
+
+import os
+import json
+import time
+import hashlib
+import asyncio
+import threading
+import logging
+from typing import TYPE_CHECKING, Any, Hashable
+from .cache import DEFAULT_TTLS, other_record, parse_ttls
+from .client import env_int
+
+if TYPE_CHECKING:
+    import sqlite3
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+DEFAULT_DISK_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "mcp-lemonsqueezy", "responses.sqlite3")
+
+# Catalog data: the same for every client and rarely changed
+DEFAULT_RESOURCES = "stores,products,variants"
+
+# Seconds between last-access updates of one entry; keeps reads from taking the write lock
+TOUCH_INTERVAL = 60.0
+
+
+def cache_namespace(api_key: str | None, api_base: str) -> str:
+    """
+    Short hash of the API key and base URL: responses of one account (and
+    one API, test or live) are never served to a server using another.
+    """
+    return hashlib.sha256(f"{api_key or ''}\n{api_base}".encode()).hexdigest()[:16]
+
+
+class DiskEntry:
+    __slots__ = ("value", "etag", "last_modified", "expires_at")
+
+    def __init__(self, value: Any, etag: str | None, last_modified: str | None, expires_at: float):
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+    @property
+    def expires_in(self) -> float:
+        return self.expires_at - time.time()
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class DiskCache:
+    """
+    GET responses kept in a SQLite file shared by every server process on
+    the host, so a freshly spawned stdio server answers catalog reads
+    without going to the network. Entries expire by wall-clock TTL; stale
+    entries that came with an ETag or Last-Modified are kept for a
+    conditional request, and the least recently used ones are evicted once
+    the file holds more than max_bytes of responses. Errors are logged and
+    treated as misses, never failing the request. With a `namespace` (see
+    cache_namespace) each account gets its own file next to `path`.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        resources: set[str] = None,
+        max_bytes: int = None,
+        ttls: dict[str, float] = None,
+        namespace: str = None,
+    ):
+        path = path if path is not None else os.getenv("LEMONSQUEEZY_DISK_CACHE_PATH", DEFAULT_DISK_CACHE_PATH)
+        if path and namespace:
+            root, ext = os.path.splitext(path)
+            path = f"{root}-{namespace}{ext}"
+        self.path = os.path.expanduser(path) if path else None
+        self.resources = resources or set(filter(None, (r.strip() for r in os.getenv("LEMONSQUEEZY_DISK_CACHE_RESOURCES", DEFAULT_RESOURCES).split(","))))
+        self.max_bytes = max_bytes or env_int("LEMONSQUEEZY_DISK_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+        self.ttls = {**DEFAULT_TTLS, **parse_ttls(os.getenv("LEMONSQUEEZY_DISK_CACHE_TTLS", "")), **(ttls or {})}
+        self._conn: "sqlite3.Connection | None" = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidated = 0
+        self.stores = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def caches(self, resource: str) -> bool:
+        return self.enabled and resource in self.resources and self.ttls.get(resource, 0) > 0
+
+    @property
+    def conn(self) -> "sqlite3.Connection":
+        if self._conn is None:
+            import sqlite3
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            # Wait for other processes' writes instead of failing with "database is locked"
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, resource TEXT NOT NULL, body TEXT NOT NULL, etag TEXT, last_modified TEXT, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            # Covers both the LRU scan and the size total, without reading response bodies
+            conn.execute("DROP INDEX IF EXISTS idx_responses_accessed_at")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_lru ON responses (accessed_at, size)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_resource ON responses (resource)")
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def key_text(key: Hashable) -> str:
+        return json.dumps(key, separators=(",", ":"))
+
+    # Blocking operations, run in a worker thread by the async methods below
+
+    def _get(self, key: str) -> DiskEntry | None:
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, expires_at, accessed_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            body, etag, last_modified, expires_at, accessed_at = row
+            if expires_at <= now and not (etag or last_modified):
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            if now - accessed_at > TOUCH_INTERVAL:
+                self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return DiskEntry(json.loads(body), etag, last_modified, expires_at)
+
+    def _set(self, key: str, resource: str, value: Any, etag: str | None, last_modified: str | None) -> None:
+        body = json.dumps(value, separators=(",", ":"))
+        now = time.time()
+        with self._lock:
+            conn = self.conn
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, resource, body, etag, last_modified, expires_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, resource, body, etag, last_modified, now + self.ttls[resource], now, len(body)),
+            )
+            used = self._used_bytes(conn)
+            if used > self.max_bytes:
+                self.evictions += self._evict(conn, used - self.max_bytes)
+
+    @staticmethod
+    def _used_bytes(conn: "sqlite3.Connection") -> int:
+        """
+        Bytes of stored responses, the measure _evict frees: SQLite pages are
+        not returned by a DELETE, so the file size would never come down.
+        """
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def _evict(conn: "sqlite3.Connection", excess: int) -> int:
+        """
+        Drop least recently used entries until `excess` bytes are freed.
+        """
+        keys, freed = [], 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            keys.append(key)
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k in keys])
+        return len(keys)
+
+    def _touch(self, key: str, resource: str) -> None:
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?",
+                (now + self.ttls[resource], now, key),
+            )
+
+    def _invalidate(self, resources: tuple[str, ...]) -> int:
+        with self._lock:
+            cursor = self.conn.execute(
+                f"DELETE FROM responses WHERE resource IN ({', '.join('?' for _ in resources)})", resources
+            )
+            return cursor.rowcount
+
+    def _invalidate_record(self, resource: str, record_id: str) -> int:
+        with self._lock:
+            keys = [
+                key for (key,) in self.conn.execute("SELECT key FROM responses WHERE resource = ?", (resource,))
+                if not other_record(json.loads(key), resource, record_id)
+            ]
+            self.conn.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k in keys])
+            return len(keys)
+
+    def _size(self) -> tuple[int, int]:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+    # Async API used by lemonsqueezy_request
+
+    async def get(self, key: Hashable) -> DiskEntry | None:
+        """
+        The stored response for `key`: fresh, or stale but revalidatable.
+        """
+        try:
+            entry = await asyncio.to_thread(self._get, self.key_text(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Disk cache read failed: %s", e)
+            return None
+        if entry is None:
+            self.misses += 1
+        elif entry.fresh:
+            self.hits += 1
+        else:
+            self.stale += 1
+        return entry
+
+    async def set(self, key: Hashable, resource: str, value: Any, headers: dict) -> None:
+        try:
+            await asyncio.to_thread(self._set, self.key_text(key), resource, value, headers.get("etag"), headers.get("last-modified"))
+            self.stores += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Disk cache write failed: %s", e)
+
+    async def revalidate(self, key: Hashable, resource: str) -> None:
+        """
+        Mark a stale entry fresh again after a 304 Not Modified.
+        """
+        self.revalidated += 1
+        try:
+            await asyncio.to_thread(self._touch, self.key_text(key), resource)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Disk cache write failed: %s", e)
+
+    async def invalidate(self, *resources: str) -> int:
+        """
+        Drop every stored response for the given resource types, for all processes.
+        """
+        resources = tuple(r for r in resources if r in self.resources)
+        if not self.enabled or not resources or not (self._conn is not None or os.path.exists(self.path)):
+            return 0
+        try:
+            dropped = await asyncio.to_thread(self._invalidate, resources)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Disk cache invalidation failed: %s", e)
+            return 0
+        self.invalidations += dropped
+        return dropped
+
+    async def invalidate_record(self, resource: str, record_id: str) -> int:
+        """
+        Drop the stored list responses of `resource` and the entries of one
+        changed record, for all processes; other records stay cached.
+        """
+        if resource not in self.resources or not self.enabled or not (self._conn is not None or os.path.exists(self.path)):
+            return 0
+        try:
+            dropped = await asyncio.to_thread(self._invalidate_record, resource, record_id)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Disk cache invalidation failed: %s", e)
+            return 0
+        self.invalidations += dropped
+        return dropped
+
+    def stats(self) -> dict:
+        data = {
+            "enabled": self.enabled,
+            "path": self.path,
+            "resources": sorted(self.resources),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "revalidated": self.revalidated,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+        if self._conn is not None:
+            try:
+                data["entries"], data["bytes"] = self._size()
+            except Exception:
+                pass
+        return data
@@ -0,0 +1,287 @@
+# export.py
+
+import os
+import csv
+import json
+import asyncio
+import logging
+from contextlib import aclosing
+from importlib.util import find_spec
+from typing import Awaitable, Callable, TextIO
+from .client import env_int
+from .pagination import Fetch, iter_pages
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+DEFAULT_EXPORT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mcp-lemonsqueezy", "exports")
+
+FORMATS = {"ndjson": ".ndjson", "csv": ".csv", "parquet": ".parquet"}
+
+PARQUET_MISSING = 'Parquet export needs pyarrow: pip install -e ".[parquet]"'
+
+# Rows per Parquet row group when the finished spool is converted
+PARQUET_BATCH_ROWS = env_int("LEMONSQUEEZY_EXPORT_PARQUET_BATCH_ROWS", 10000)
+
+# Bumped when the checkpoint layout changes; older checkpoints are ignored
+CHECKPOINT_VERSION = 1
+
+# (rows written, total rows reported by the API or None)
+Progress = Callable[[int, int | None], Awaitable[None]]
+
+# Paths with an export running in this process
+_running: set[str] = set()
+
+
+def export_path(directory: str, file_name: str | None, resource: str, fmt: str) -> str:
+    """
+    Absolute path of an export inside `directory`; names that would land
+    outside it are rejected, and so is Parquet without pyarrow installed,
+    before any page is fetched.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Expected one of: {', '.join(FORMATS)}")
+    if fmt == "parquet" and find_spec("pyarrow") is None:
+        raise ValueError(PARQUET_MISSING)
+    directory = os.path.abspath(os.path.expanduser(directory))
+    path = os.path.abspath(os.path.join(directory, file_name or resource + FORMATS[fmt]))
+    if not path.startswith(directory + os.sep):
+        raise ValueError(f"file_name must stay inside the export directory {directory}")
+    return path
+
+
+def flat_row(record: dict) -> dict:
+    """
+    {"id", **attributes} with nested values as JSON text, for CSV and Parquet.
+    """
+    row = {"id": record.get("id")}
+    for name, value in (record.get("attributes") or {}).items():
+        row[name] = json.dumps(value, separators=(",", ":")) if isinstance(value, (dict, list)) else value
+    return row
+
+
+def arrow_type(values: list):
+    """
+    Parquet column type for the non-null values seen in the first batch.
+    """
+    import pyarrow as pa
+
+    kinds = {type(v) for v in values if v is not None}
+    if kinds == {bool}:
+        return pa.bool_()
+    if kinds == {int}:
+        return pa.int64()
+    if kinds and kinds <= {int, float}:
+        return pa.float64()
+    return pa.string()
+
+
+def write_parquet(spool: str, path: str, columns: list[str], batch_rows: int) -> list[str]:
+    """
+    Convert an NDJSON spool into a Parquet file, `batch_rows` rows at a
+    time. The schema comes from the first batch; returns the fields seen
+    later that are not in it (and so were dropped).
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError(PARQUET_MISSING) from None
+
+    writer = None
+    schema = None
+    dropped: set[str] = set()
+
+    def flush(rows: list[dict]) -> None:
+        nonlocal writer, schema
+        if schema is None:
+            names = columns + [c for c in dict.fromkeys(k for row in rows for k in row) if c not in columns]
+            schema = pa.schema([(name, arrow_type([row.get(name) for row in rows])) for name in names])
+            writer = pq.ParquetWriter(path, schema)
+        for row in rows:
+            for name in row:
+                if schema.get_field_index(name) < 0:
+                    dropped.add(name)
+            for field in schema:
+                # Columns inferred as text keep whatever later rows hold, as text
+                value = row.get(field.name)
+                if field.type == pa.string() and value is not None and not isinstance(value, str):
+                    row[field.name] = json.dumps(value)
+        try:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"A column changed type part way through the export ({e}); export as csv or ndjson instead") from None
+
+    try:
+        rows = []
+        with open(spool, encoding="utf-8") as f:
+            for line in f:
+                rows.append(flat_row(json.loads(line)))
+                if len(rows) >= batch_rows:
+                    flush(rows)
+                    rows = []
+        if rows or writer is None:
+            flush(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return sorted(dropped)
+
+
+class ResourceExport:
+    """
+    Streams every record of a list endpoint into a file, one page in memory
+    at a time while the next page is fetched. NDJSON and CSV are written
+    straight to `<path>.partial`; Parquet is spooled there as NDJSON and
+    converted once the crawl is done. After each page a checkpoint with the
+    next page and the file offset is saved, so an interrupted export resumes
+    where it stopped. Records repeated across a page boundary (new records
+    shifting pages during the crawl) are written once.
+    """
+
+    def __init__(self, fetch: Fetch, endpoint: str, path: str, fmt: str, params: dict = None):
+        self.fetch = fetch
+        self.endpoint = endpoint
+        self.path = path
+        self.format = fmt
+        self.params = params or {}
+        self.partial = f"{path}.partial"
+        self.checkpoint_path = f"{path}.checkpoint.json"
+        self._file: TextIO | None = None
+        self._csv: csv.DictWriter | None = None
+        self.state = self._fresh_state()
+
+    def _fresh_state(self) -> dict:
+        return {
+            "version": CHECKPOINT_VERSION,
+            "endpoint": self.endpoint,
+            "params": self.params,
+            "format": self.format,
+            "next": {**self.params, "page[number]": 1},
+            "rows": 0,
+            "pages": 0,
+            "offset": 0,
+            "columns": None,
+            "ignored_columns": [],
+            "last_ids": [],
+            "duplicates": 0,
+        }
+
+    def _load_checkpoint(self) -> dict | None:
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        same = all(state.get(k) == v for k, v in self._fresh_state().items() if k in ("version", "endpoint", "params", "format"))
+        if not same or not os.path.exists(self.partial) or os.path.getsize(self.partial) < state.get("offset", 0):
+            return None
+        return state
+
+    def _save_checkpoint(self) -> None:
+        tmp = f"{self.checkpoint_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    def _open(self, resume: bool) -> bool:
+        """
+        Open the partial file, continuing from the checkpoint when there is
+        a matching one; returns whether the export resumed.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        state = self._load_checkpoint() if resume else None
+        if state is not None:
+            self.state = state
+            # Drop anything written after the last checkpoint
+            os.truncate(self.partial, state["offset"])
+        else:
+            with open(self.partial, "w", encoding="utf-8"):
+                pass
+        self._file = open(self.partial, "a", encoding="utf-8", newline="")
+        return state is not None
+
+    def _write_page(self, records: list[dict], next_params: dict | None) -> None:
+        state = self.state
+        previous = set(state["last_ids"])
+        fresh = [r for r in records if r.get("id") not in previous]
+        state["duplicates"] += len(records) - len(fresh)
+        if self.format == "csv":
+            rows = [flat_row(r) for r in fresh]
+            if state["columns"] is None:
+                state["columns"] = list(dict.fromkeys(k for row in rows for k in row)) or ["id"]
+            if self._csv is None:
+                self._csv = csv.DictWriter(self._file, fieldnames=state["columns"], extrasaction="ignore")
+                if state["offset"] == 0:
+                    self._csv.writeheader()
+            ignored = {k for row in rows for k in row} - set(state["columns"]) - set(state["ignored_columns"])
+            state["ignored_columns"] += sorted(ignored)
+            self._csv.writerows(rows)
+        else:
+            if state["columns"] is None and fresh:
+                state["columns"] = list(flat_row(fresh[0]))
+            self._file.writelines(json.dumps(r, separators=(",", ":")) + "\n" for r in fresh)
+        self._file.flush()
+        state["offset"] = self._file.tell()
+        state["rows"] += len(fresh)
+        state["pages"] += 1
+        state["last_ids"] = [r.get("id") for r in records]
+        state["next"] = next_params
+        self._save_checkpoint()
+
+    def _finish(self) -> None:
+        self._file.close()
+        self._file = None
+        if self.format == "parquet":
+            tmp = f"{self.path}.tmp"
+            dropped = write_parquet(self.partial, tmp, self.state["columns"] or ["id"], PARQUET_BATCH_ROWS)
+            self.state["ignored_columns"] = dropped
+            os.replace(tmp, self.path)
+            os.remove(self.partial)
+        else:
+            os.replace(self.partial, self.path)
+        os.remove(self.checkpoint_path)
+
+    async def run(self, resume: bool = True, progress: Progress = None) -> dict:
+        """
+        Export every page; returns the path and row counts.
+        """
+        if self.path in _running:
+            raise ValueError(f"An export to {self.path} is already running")
+        _running.add(self.path)
+        writing: asyncio.Future | None = None
+        try:
+            resumed = await asyncio.to_thread(self._open, resume)
+            resumed_rows = self.state["rows"]
+            if resumed:
+                logger.info("Resuming export to %s at row %d", self.path, resumed_rows)
+            if self.state["next"] is not None:
+                pages = iter_pages(self.fetch, self.endpoint, self.state["next"])
+                async with aclosing(pages) as stream:
+                    async for _, page, next_params in stream:
+                        # Written in a worker thread while the next page is already on its way
+                        writing = asyncio.ensure_future(asyncio.to_thread(self._write_page, page.get("data") or [], next_params))
+                        await asyncio.shield(writing)
+                        writing = None
+                        if progress is not None:
+                            total = ((page.get("meta") or {}).get("page") or {}).get("total")
+                            await progress(self.state["rows"], total)
+            await asyncio.to_thread(self._finish)
+        finally:
+            if writing is not None:
+                # Cancelled mid-page: let the write and its checkpoint land before closing the file
+                await asyncio.wait([writing])
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            _running.discard(self.path)
+        result = {
+            "path": self.path,
+            "format": self.format,
+            "rows": self.state["rows"],
+            "resumed_from_row": resumed_rows if resumed else None,
+            "duplicates_skipped": self.state["duplicates"],
+            "bytes": os.path.getsize(self.path),
+        }
+        if self.state["ignored_columns"]:
+            result["ignored_columns"] = self.state["ignored_columns"]
+        return result
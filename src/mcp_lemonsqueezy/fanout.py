@@ -0,0 +1,125 @@
+# fanout.py
+
+import time
+import heapq
+import asyncio
+from contextlib import aclosing
+from datetime import datetime
+from typing import AsyncIterator
+from .batch import error_detail
+from .client import env_int
+from .pagination import Fetch, paginate
+
+# Requests in flight across all stores of one fan-out
+FANOUT_CONCURRENCY = env_int("LEMONSQUEEZY_FANOUT_CONCURRENCY", 4)
+
+END = object()
+
+
+def newest_first_key(record: dict) -> float:
+    """
+    Heap key ordering records newest first; records without created_at sort last.
+    """
+    created_at = (record.get("attributes") or {}).get("created_at")
+    if not created_at:
+        return float("inf")
+    return -datetime.fromisoformat(created_at.replace("Z", "+00:00")).timestamp()
+
+
+class StoreTiming:
+    __slots__ = ("records", "requests", "request_seconds", "seconds", "error")
+
+    def __init__(self):
+        self.records = 0
+        self.requests = 0
+        self.request_seconds = 0.0
+        self.seconds = 0.0
+        self.error: dict | None = None
+
+    def to_dict(self) -> dict:
+        data = {
+            "records": self.records,
+            "requests": self.requests,
+            "request_ms": round(self.request_seconds * 1000, 2),
+            "total_ms": round(self.seconds * 1000, 2),
+        }
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class StoreFanOut:
+    """
+    Run one list query per store (filter[store_id]) concurrently and merge
+    the per-store streams as they arrive: newest first, ties broken by the
+    order of store_ids and then by API order, so the result is stable. At
+    most `concurrency` requests are in flight; a failing store is reported
+    in its timing instead of failing the whole call.
+    """
+
+    def __init__(self, fetch: Fetch, endpoint: str, store_ids: list[str], params: dict = None, all_pages: bool = False, concurrency: int = None):
+        self.fetch = fetch
+        self.endpoint = endpoint
+        self.store_ids = list(dict.fromkeys(str(s) for s in store_ids))
+        self.params = params or {}
+        self.all_pages = all_pages
+        self.timings = {store_id: StoreTiming() for store_id in self.store_ids}
+        self._semaphore = asyncio.Semaphore(concurrency or FANOUT_CONCURRENCY)
+
+    def _fetch_for(self, timing: StoreTiming) -> Fetch:
+        async def fetch(method: str, endpoint: str, **kwargs):
+            async with self._semaphore:
+                sent = time.perf_counter()
+                try:
+                    return await self.fetch(method, endpoint, **kwargs)
+                finally:
+                    timing.requests += 1
+                    timing.request_seconds += time.perf_counter() - sent
+        return fetch
+
+    async def _store_records(self, store_id: str, max_items: int | None) -> AsyncIterator[dict]:
+        timing = self.timings[store_id]
+        fetch = self._fetch_for(timing)
+        params = {**self.params, "filter[store_id]": store_id}
+        started = time.perf_counter()
+        try:
+            if self.all_pages:
+                async with aclosing(paginate(fetch, self.endpoint, params=params, max_items=max_items)) as stream:
+                    async for record in stream:
+                        yield record
+            else:
+                page = await fetch("GET", self.endpoint, params=params)
+                for record in page.get("data") or []:
+                    yield record
+        except Exception as e:
+            timing.error = error_detail(e)
+        finally:
+            timing.seconds = time.perf_counter() - started
+
+    async def stream(self, max_items: int = None) -> AsyncIterator[dict]:
+        """
+        Yield the merged records, at most max_items of them.
+        """
+        streams = [self._store_records(store_id, max_items) for store_id in self.store_ids]
+        try:
+            heads = await asyncio.gather(*(anext(s, END) for s in streams))
+            heap = [(newest_first_key(r), i, 0, r) for i, r in enumerate(heads) if r is not END]
+            heapq.heapify(heap)
+            yielded = 0
+            while heap and (max_items is None or yielded < max_items):
+                _, i, seq, record = heapq.heappop(heap)
+                self.timings[self.store_ids[i]].records += 1
+                yield record
+                yielded += 1
+                following = await anext(streams[i], END)
+                if following is not END:
+                    heapq.heappush(heap, (newest_first_key(following), i, seq + 1, following))
+        finally:
+            for s in streams:
+                await s.aclose()
+
+    def meta(self) -> dict:
+        return {
+            "stores": {store_id: timing.to_dict() for store_id, timing in self.timings.items()},
+            "failed_stores": [store_id for store_id, timing in self.timings.items() if timing.error],
+        }
@@ -0,0 +1,217 @@
+# licenses.py
+
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable
+from .batch import error_detail
+from .client import env_float, env_int
+from .singleflight import SingleFlight
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+# Licenses validated at once by one batch call
+LICENSE_CONCURRENCY = env_int("LEMONSQUEEZY_LICENSE_CONCURRENCY", 10)
+
+# (action, form fields) -> JSON answer of the License API, also for 4xx answers
+Send = Callable[[str, dict], Awaitable[dict]]
+
+
+def key_hash(license_key: str) -> str:
+    """
+    SHA-256 of a license key; the key itself is never used as a cache key or logged.
+    Callers strip the key first, so the hashed key is the one sent to the API.
+    """
+    return hashlib.sha256(license_key.encode()).hexdigest()
+
+
+class LicenseCache:
+    """
+    Recent validation answers by (key hash, instance ID): valid answers are
+    kept for `ttl` seconds, invalid ones for the shorter `negative_ttl`, so
+    repeated launch-time checks of one key cost a single upstream call.
+    Entries of a key are dropped when it is activated, deactivated or
+    changed by a webhook event. Least recently used entries are evicted
+    beyond `capacity`.
+    """
+
+    def __init__(self, ttl: float = None, negative_ttl: float = None, capacity: int = None):
+        self.ttl = ttl if ttl is not None else env_float("LEMONSQUEEZY_LICENSE_CACHE_TTL", 60.0)
+        self.negative_ttl = negative_ttl if negative_ttl is not None else env_float("LEMONSQUEEZY_LICENSE_NEGATIVE_TTL", 10.0)
+        self.capacity = capacity or env_int("LEMONSQUEEZY_LICENSE_CACHE_CAPACITY", 10000)
+        # (hash, instance_id) -> (expires_at, answer)
+        self._entries: OrderedDict[tuple[str, str], tuple[float, dict]] = OrderedDict()
+        self._by_hash: dict[str, set[tuple[str, str]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple[str, str]) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            self._drop(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: tuple[str, str], answer: dict) -> None:
+        ttl = self.ttl if answer.get("valid") else self.negative_ttl
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, answer)
+        self._entries.move_to_end(key)
+        self._by_hash.setdefault(key[0], set()).add(key)
+        while len(self._entries) > self.capacity:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: tuple[str, str]) -> None:
+        del self._entries[key]
+        keys = self._by_hash.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_hash[key[0]]
+
+    def invalidate(self, digest: str) -> int:
+        """
+        Forget every answer for the key with this hash, whatever the instance.
+        """
+        keys = self._by_hash.pop(digest, ())
+        for key in keys:
+            del self._entries[key]
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "capacity": self.capacity,
+            "ttl": self.ttl,
+            "negative_ttl": self.negative_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+class LicenseService:
+    """
+    Validate, activate and deactivate license keys through the License API.
+    Validations are answered from the LicenseCache when possible, and
+    concurrent validations of one key and instance share a single request.
+    Activation and deactivation always go upstream and reset the key's
+    cached answers; a successful activation seeds the answer for its new
+    instance, which is usually validated next.
+    """
+
+    def __init__(self, send: Send, cache: LicenseCache = None, concurrency: int = None):
+        self.send = send
+        self.cache = cache or LicenseCache()
+        self.concurrency = concurrency or LICENSE_CONCURRENCY
+        self._flights = SingleFlight(enabled=True)
+        self.validations = 0
+        self.upstream = 0
+        self.activations = 0
+        self.deactivations = 0
+
+    async def _validate(self, key: tuple[str, str], form: dict) -> dict:
+        self.upstream += 1
+        answer = await self.send("validate", form)
+        answer.setdefault("valid", False)
+        self.cache.set(key, answer)
+        return answer
+
+    async def validate(self, license_key: str, instance_id: str = None) -> tuple[dict, bool]:
+        """
+        (answer, cached) for one key: the License API response, and whether it came from the cache.
+        """
+        self.validations += 1
+        key = (key_hash(license_key), instance_id or "")
+        answer = self.cache.get(key)
+        if answer is not None:
+            return answer, True
+        form = {"license_key": license_key}
+        if instance_id:
+            form["instance_id"] = instance_id
+        return await self._flights.do(key, lambda: self._validate(key, form)), False
+
+    async def validate_many(self, licenses: list[dict], concurrency: int = None) -> dict:
+        """
+        Validate many keys, each {"license_key", "instance_id"?}. Results are
+        in input order; repeated keys are validated once, and failures are
+        reported per item instead of failing the batch.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+        unique = list(dict.fromkeys((item["license_key"], item.get("instance_id") or "") for item in licenses))
+        answers: dict[tuple[str, str], dict] = {}
+
+        async def one(license_key: str, instance_id: str) -> None:
+            async with semaphore:
+                try:
+                    answer, cached = await self.validate(license_key, instance_id)
+                except Exception as e:
+                    answers[license_key, instance_id] = {"valid": None, "error": error_detail(e), "cached": False}
+                    return
+            answers[license_key, instance_id] = {**answer, "cached": cached}
+
+        await asyncio.gather(*(one(*key) for key in unique))
+        results = [{"index": i, **answers[item["license_key"], item.get("instance_id") or ""]} for i, item in enumerate(licenses)]
+        distinct = answers.values()
+        return {
+            "data": results,
+            "meta": {
+                "requested": len(licenses),
+                "unique": len(unique),
+                "valid": sum(1 for r in results if r["valid"] is True),
+                "invalid": sum(1 for r in results if r["valid"] is False),
+                "failed": sum(1 for r in results if r["valid"] is None),
+                "cached": sum(1 for a in distinct if a["cached"]),
+                "upstream": sum(1 for a in distinct if not a["cached"]),
+            },
+        }
+
+    async def activate(self, license_key: str, instance_name: str) -> dict:
+        self.activations += 1
+        digest = key_hash(license_key)
+        answer = await self.send("activate", {"license_key": license_key, "instance_name": instance_name})
+        self.cache.invalidate(digest)
+        instance_id = (answer.get("instance") or {}).get("id")
+        if answer.get("activated") and instance_id:
+            self.cache.set((digest, str(instance_id)), {
+                "valid": True,
+                "error": None,
+                "license_key": answer.get("license_key"),
+                "instance": answer.get("instance"),
+                "meta": answer.get("meta"),
+            })
+        return answer
+
+    async def deactivate(self, license_key: str, instance_id: str) -> dict:
+        self.deactivations += 1
+        answer = await self.send("deactivate", {"license_key": license_key, "instance_id": instance_id})
+        self.cache.invalidate(key_hash(license_key))
+        return answer
+
+    def forget(self, license_key: str) -> int:
+        """
+        Drop the cached answers for a key changed elsewhere (e.g. by a webhook event).
+        """
+        return self.cache.invalidate(key_hash(license_key))
+
+    def stats(self) -> dict:
+        return {
+            "validations": self.validations,
+            "upstream": self.upstream,
+            "activations": self.activations,
+            "deactivations": self.deactivations,
+            "single_flight": self._flights.stats(),
+            "cache": self.cache.stats(),
+        }
@@ -0,0 +1,284 @@
+# metrics.py
+
+import os
+import sys
+import time
+import logging
+import functools
+from bisect import bisect_left
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable
+from .client import LemonSqueezyAPIError, env_int
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def endpoint_label(endpoint: str) -> str:
+    """
+    Collapse record IDs so metrics are per endpoint, not per record:
+    /orders/123 -> /orders/{id}, /products/1/variants -> /products/{id}/variants.
+    """
+    segments = endpoint.strip("/").split("/")
+    return "/" + "/".join("{id}" if i % 2 else s for i, s in enumerate(segments))
+
+
+def max_rss_kb() -> int | None:
+    """
+    Peak resident memory of this process, or None where unavailable.
+    """
+    try:
+        # On Linux ru_maxrss also counts the parent's memory from before exec
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def error_label(exc: BaseException) -> str:
+    if isinstance(exc, LemonSqueezyAPIError):
+        return str(exc.status_code)
+    return type(exc).__name__
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram; observe() is a bisect and an increment.
+    Quantiles are interpolated inside the bucket they fall in.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.bounds[-1]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.sum / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 2),
+            "p90_ms": round(self.quantile(0.9) * 1000, 2),
+            "p99_ms": round(self.quantile(0.99) * 1000, 2),
+        }
+
+
+class CallStats:
+    __slots__ = ("calls", "errors", "bytes_received", "latency", "wait")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors: Counter[str] = Counter()
+        self.bytes_received = 0
+        self.latency = Histogram()
+        self.wait = Histogram()
+
+    def to_dict(self, with_wait: bool = False) -> dict:
+        data = {
+            "calls": self.calls,
+            "errors": dict(self.errors),
+            "latency": self.latency.summary(),
+        }
+        if with_wait:
+            data["bytes_received"] = self.bytes_received
+            data["wait"] = self.wait.summary()
+        return data
+
+
+class Metrics:
+    """
+    Per-tool and per-endpoint call counts, errors, bytes and latency
+    histograms. Endpoint latency is upstream time only; `wait` is the time
+    a request spent queued in the scheduler or backing off between retries.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.tools: dict[str, CallStats] = {}
+        self.endpoints: dict[str, CallStats] = {}
+        # tool -> [projected calls, bytes before projection, bytes returned]
+        self.payloads: dict[str, list[int]] = {}
+        # Extra Prometheus lines from other components (circuit breakers, hedging)
+        self.collectors: list[Callable[[], list[str]]] = []
+
+    def instrument(self, fn: Callable) -> Callable:
+        """
+        Wrap an async tool so every call is timed and counted.
+        """
+        stats = self.tools.setdefault(fn.__name__, CallStats())
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs) -> Any:
+            start = time.perf_counter()
+            stats.calls += 1
+            try:
+                return await fn(*args, **kwargs)
+            except BaseException as e:
+                stats.errors[error_label(e)] += 1
+                raise
+            finally:
+                stats.latency.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    def observe_request(self, endpoint: str, seconds: float, status: int | str, size: int) -> None:
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = CallStats()
+        stats.calls += 1
+        stats.latency.observe(seconds)
+        stats.bytes_received += size
+        if not isinstance(status, int) or status >= 400:
+            stats.errors[str(status)] += 1
+
+    def observe_wait(self, endpoint: str, seconds: float) -> None:
+        stats = self.endpoints.get(endpoint)
+        if stats is not None:
+            stats.wait.observe(seconds)
+
+    def observe_payload(self, tool: str, before: int, after: int) -> None:
+        counters = self.payloads.setdefault(tool, [0, 0, 0])
+        counters[0] += 1
+        counters[1] += before
+        counters[2] += after
+
+    def snapshot(self) -> dict:
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "max_rss_kb": max_rss_kb(),
+            "tools": {name: s.to_dict() for name, s in sorted(self.tools.items()) if s.calls},
+            "endpoints": {name: s.to_dict(with_wait=True) for name, s in sorted(self.endpoints.items())},
+            "projection": {
+                tool: {
+                    "calls": calls,
+                    "bytes_before": before,
+                    "bytes_after": after,
+                    "saved_ratio": round(1 - after / before, 4) if before else 0.0,
+                }
+                for tool, (calls, before, after) in sorted(self.payloads.items())
+            },
+        }
+
+    def render_prometheus(self) -> str:
+        lines = []
+
+        def histogram(name: str, label: str, value: str, h: Histogram) -> None:
+            cumulative = 0
+            for bound, count in zip(h.bounds, h.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{label}="{value}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{label}="{value}",le="+Inf"}} {h.count}')
+            lines.append(f'{name}_sum{{{label}="{value}"}} {h.sum}')
+            lines.append(f'{name}_count{{{label}="{value}"}} {h.count}')
+
+        lines.append("# TYPE lemonsqueezy_tool_calls_total counter")
+        lines += [f'lemonsqueezy_tool_calls_total{{tool="{n}"}} {s.calls}' for n, s in sorted(self.tools.items())]
+        lines.append("# TYPE lemonsqueezy_tool_errors_total counter")
+        lines += [
+            f'lemonsqueezy_tool_errors_total{{tool="{n}",error="{e}"}} {c}'
+            for n, s in sorted(self.tools.items()) for e, c in sorted(s.errors.items())
+        ]
+        lines.append("# TYPE lemonsqueezy_tool_duration_seconds histogram")
+        for n, s in sorted(self.tools.items()):
+            histogram("lemonsqueezy_tool_duration_seconds", "tool", n, s.latency)
+        lines.append("# TYPE lemonsqueezy_api_requests_total counter")
+        lines += [f'lemonsqueezy_api_requests_total{{endpoint="{n}"}} {s.calls}' for n, s in sorted(self.endpoints.items())]
+        lines.append("# TYPE lemonsqueezy_api_errors_total counter")
+        lines += [
+            f'lemonsqueezy_api_errors_total{{endpoint="{n}",status="{e}"}} {c}'
+            for n, s in sorted(self.endpoints.items()) for e, c in sorted(s.errors.items())
+        ]
+        lines.append("# TYPE lemonsqueezy_api_received_bytes_total counter")
+        lines += [f'lemonsqueezy_api_received_bytes_total{{endpoint="{n}"}} {s.bytes_received}' for n, s in sorted(self.endpoints.items())]
+        lines.append("# TYPE lemonsqueezy_projection_bytes_total counter")
+        for tool, (_, before, after) in sorted(self.payloads.items()):
+            lines.append(f'lemonsqueezy_projection_bytes_total{{tool="{tool}",stage="before"}} {before}')
+            lines.append(f'lemonsqueezy_projection_bytes_total{{tool="{tool}",stage="after"}} {after}')
+        lines.append("# TYPE lemonsqueezy_api_duration_seconds histogram")
+        for n, s in sorted(self.endpoints.items()):
+            histogram("lemonsqueezy_api_duration_seconds", "endpoint", n, s.latency)
+        lines.append("# TYPE lemonsqueezy_api_wait_seconds histogram")
+        for n, s in sorted(self.endpoints.items()):
+            histogram("lemonsqueezy_api_wait_seconds", "endpoint", n, s.wait)
+        for collect in self.collectors:
+            lines += collect()
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Optional plain-HTTP endpoint serving Metrics in Prometheus text format,
+    started when LEMONSQUEEZY_METRICS_PORT is set.
+    """
+
+    def __init__(self, metrics: Metrics, host: str = None, port: int = None):
+        self.metrics = metrics
+        self.host = host or os.getenv("LEMONSQUEEZY_METRICS_HOST", "127.0.0.1")
+        self.port = port if port is not None else env_int("LEMONSQUEEZY_METRICS_PORT", 0)
+        self._runner: "web.AppRunner | None" = None
+        self._users = 0
+
+    async def _serve(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        return web.Response(text=self.metrics.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    @asynccontextmanager
+    async def lifespan(self) -> AsyncIterator[None]:
+        if not self.port:
+            yield
+            return
+        self._users += 1
+        try:
+            if self._users == 1:
+                # aiohttp is only imported when the endpoint is enabled
+                from aiohttp import web
+                app = web.Application()
+                app.router.add_get("/metrics", self._serve)
+                self._runner = web.AppRunner(app, access_log=None)
+                await self._runner.setup()
+                await web.TCPSite(self._runner, self.host, self.port).start()
+                logger.info("Prometheus metrics on http://%s:%s/metrics", self.host, self.port)
+            yield
+        finally:
+            self._users -= 1
+            if self._users == 0 and self._runner is not None:
+                await self._runner.cleanup()
+                self._runner = None
@@ -0,0 +1,296 @@
+# mirror.py
+
+import os
+import json
+import time
+import asyncio
+import threading
+import logging
+from contextlib import aclosing
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable
+
+if TYPE_CHECKING:
+    import sqlite3
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+DEFAULT_MIRROR_PATH = os.path.join(os.path.expanduser("~"), ".cache", "mcp-lemonsqueezy", "mirror.sqlite3")
+
+# resource -> (list endpoint, indexed columns copied out of the attributes)
+MIRRORED = {
+    "orders": ("/orders", ["store_id", "customer_id", "status", "user_email", "currency", "total", "product_id", "variant_id"]),
+    "customers": ("/customers", ["store_id", "email", "status"]),
+    "subscriptions": ("/subscriptions", ["store_id", "customer_id", "order_id", "product_id", "variant_id", "status", "user_email", "renews_at", "ends_at"]),
+    "license-keys": ("/license-keys", ["store_id", "customer_id", "order_id", "product_id", "status", "key_short"]),
+    "products": ("/products", ["store_id", "name", "status"]),
+    "variants": ("/variants", ["product_id", "name", "status"]),
+}
+
+# Columns indexed on top of created_at / updated_at
+INDEXED = ["store_id", "customer_id", "order_id", "product_id", "variant_id", "status", "email", "user_email"]
+
+Paginate = Callable[..., AsyncIterator[dict]]
+
+
+def table_name(resource: str) -> str:
+    return resource.replace("-", "_")
+
+
+def iso_cutoff(days: float) -> str:
+    """
+    Timestamp `days` ago in the format the API uses, so it compares as text.
+    """
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%S.000000Z")
+
+
+def flatten(record: dict, columns: list[str]) -> dict:
+    attributes = record.get("attributes") or {}
+    # Orders keep their product/variant under first_order_item
+    first_item = attributes.get("first_order_item") or {}
+    row = {"id": str(record["id"])}
+    for column in columns:
+        value = attributes.get(column, first_item.get(column))
+        row[column] = str(value) if column.endswith("_id") and value is not None else value
+    row["created_at"] = attributes.get("created_at")
+    row["updated_at"] = attributes.get("updated_at")
+    row["record"] = json.dumps(record, separators=(",", ":"))
+    return row
+
+
+class StoreMirror:
+    """
+    On-disk SQLite copy of store data, indexed on foreign keys and
+    timestamps so common questions are answered without any API traffic.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = os.path.expanduser(path or os.getenv("LEMONSQUEEZY_MIRROR_PATH", DEFAULT_MIRROR_PATH))
+        self._conn: "sqlite3.Connection | None" = None
+        self._lock = threading.Lock()
+
+    @property
+    def exists(self) -> bool:
+        return self._conn is not None or os.path.exists(self.path)
+
+    @property
+    def conn(self) -> "sqlite3.Connection":
+        if self._conn is None:
+            import sqlite3
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema(conn)
+            self._conn = conn
+        return self._conn
+
+    def _create_schema(self, conn: "sqlite3.Connection") -> None:
+        for resource, (_, columns) in MIRRORED.items():
+            table = table_name(resource)
+            column_sql = ", ".join(f"{c} TEXT" for c in columns)
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                f"(id TEXT PRIMARY KEY, {column_sql}, created_at TEXT, updated_at TEXT, record TEXT NOT NULL)"
+            )
+            for column in [c for c in columns if c in INDEXED] + ["created_at", "updated_at"]:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state "
+            "(resource TEXT PRIMARY KEY, last_synced_at REAL, last_updated_at TEXT, records INTEGER)"
+        )
+        conn.commit()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # Writes
+
+    def upsert(self, resource: str, records: list[dict]) -> int:
+        """
+        Insert or update records; returns how many were new or changed.
+        """
+        table = table_name(resource)
+        columns = ["id"] + MIRRORED[resource][1] + ["created_at", "updated_at", "record"]
+        rows = [flatten(r, MIRRORED[resource][1]) for r in records]
+        placeholders = ", ".join(f":{c}" for c in columns)
+        updates = ", ".join(f"{c}=excluded.{c}" for c in columns[1:])
+        with self._lock:
+            conn = self.conn
+            existing = {
+                row["id"]: row["updated_at"]
+                for row in conn.execute(
+                    f"SELECT id, updated_at FROM {table} WHERE id IN ({', '.join('?' for _ in rows)})",
+                    [r["id"] for r in rows],
+                )
+            } if rows else {}
+            changed = [r for r in rows if existing.get(r["id"], object()) != r["updated_at"]]
+            conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+                f"ON CONFLICT(id) DO UPDATE SET {updates}",
+                changed,
+            )
+            conn.commit()
+        return len(changed)
+
+    def delete(self, resource: str, record_id: str) -> None:
+        with self._lock:
+            self.conn.execute(f"DELETE FROM {table_name(resource)} WHERE id = ?", (str(record_id),))
+            self.conn.commit()
+
+    def _save_state(self, resource: str) -> None:
+        table = table_name(resource)
+        with self._lock:
+            conn = self.conn
+            count, last_updated = conn.execute(f"SELECT COUNT(*), MAX(updated_at) FROM {table}").fetchone()
+            conn.execute(
+                "INSERT INTO sync_state (resource, last_synced_at, last_updated_at, records) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(resource) DO UPDATE SET last_synced_at=excluded.last_synced_at, "
+                "last_updated_at=excluded.last_updated_at, records=excluded.records",
+                (resource, time.time(), last_updated, count),
+            )
+            conn.commit()
+
+    async def sync(self, paginate: Paginate, resource: str, full: bool = False) -> dict:
+        """
+        Pull a resource into the mirror. The API lists newest records first,
+        so an incremental sync stops at the first page in which nothing is
+        new or changed; older records that change later are kept current by
+        webhook events (apply_event) or a full sync.
+        """
+        endpoint = MIRRORED[resource][0]
+        first_sync = await asyncio.to_thread(self.state, resource) is None
+        full = full or first_sync
+        seen = changed = 0
+        page: list[dict] = []
+        async with aclosing(paginate(endpoint)) as stream:
+            async for record in stream:
+                page.append(record)
+                if len(page) < 100:
+                    continue
+                page_changed = await asyncio.to_thread(self.upsert, resource, page)
+                seen, changed, page = seen + len(page), changed + page_changed, []
+                if not full and page_changed == 0:
+                    break
+        if page:
+            changed += await asyncio.to_thread(self.upsert, resource, page)
+            seen += len(page)
+        await asyncio.to_thread(self._save_state, resource)
+        return {"resource": resource, "mode": "full" if full else "incremental", "seen": seen, "changed": changed}
+
+    def apply_event(self, event_name: str, data: dict) -> str | None:
+        """
+        Apply a webhook payload's `data` record to the mirror. Returns the
+        resource that was updated, if any.
+        """
+        resource = data.get("type")
+        if resource not in MIRRORED:
+            return None
+        if event_name.endswith("_deleted"):
+            self.delete(resource, data["id"])
+        else:
+            self.upsert(resource, [data])
+        return resource
+
+    # Reads
+
+    def state(self, resource: str = None) -> Any:
+        if not self.exists:
+            # Nothing synced yet; reading must not create an empty mirror
+            return [] if resource is None else None
+        with self._lock:
+            rows = [dict(r) for r in self.conn.execute("SELECT * FROM sync_state ORDER BY resource")]
+        if resource is None:
+            return rows
+        return next((r for r in rows if r["resource"] == resource), None)
+
+    def _where(self, resource: str, filters: dict = None, created_after: str = None, created_before: str = None) -> tuple[list[str], list]:
+        if resource not in MIRRORED:
+            raise ValueError(f"Unknown resource '{resource}'. Expected one of: {', '.join(MIRRORED)}")
+        if not self.exists:
+            raise ValueError(f"The local mirror is not synced yet ({self.path} does not exist); run mirror_sync first")
+        allowed = set(MIRRORED[resource][1])
+        clauses, args = [], []
+        for column, value in (filters or {}).items():
+            if value is None:
+                continue
+            if column not in allowed:
+                raise ValueError(f"Cannot filter {resource} on '{column}'. Expected one of: {', '.join(sorted(allowed))}")
+            if isinstance(value, (list, tuple, set)):
+                clauses.append(f"{column} IN ({', '.join('?' for _ in value)})")
+                args.extend(str(v) for v in value)
+            else:
+                clauses.append(f"{column} = ?")
+                args.append(str(value))
+        if created_after:
+            clauses.append("created_at >= ?")
+            args.append(created_after)
+        if created_before:
+            clauses.append("created_at < ?")
+            args.append(created_before)
+        return clauses, args
+
+    def query(
+        self,
+        resource: str,
+        filters: dict = None,
+        created_after: str = None,
+        created_before: str = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """
+        Return mirrored records matching equality filters on indexed columns
+        and an optional created_at window, newest first.
+        """
+        clauses, args = self._where(resource, filters, created_after, created_before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT record FROM {table_name(resource)} {where} ORDER BY created_at DESC LIMIT ?"
+        with self._lock:
+            rows = self.conn.execute(sql, [*args, limit]).fetchall()
+        return [json.loads(row["record"]) for row in rows]
+
+    def scan(
+        self,
+        resource: str,
+        filters: dict = None,
+        created_after: str = None,
+        created_before: str = None,
+        after_id: str = None,
+        limit: int = 500,
+    ) -> list[dict]:
+        """
+        One chunk of matching records in ID order, starting after `after_id`.
+        """
+        clauses, args = self._where(resource, filters, created_after, created_before)
+        if after_id is not None:
+            clauses.append("id > ?")
+            args.append(after_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT record FROM {table_name(resource)} {where} ORDER BY id LIMIT ?"
+        with self._lock:
+            rows = self.conn.execute(sql, [*args, limit]).fetchall()
+        return [json.loads(row["record"]) for row in rows]
+
+    async def iter_records(
+        self,
+        resource: str,
+        filters: dict = None,
+        created_after: str = None,
+        created_before: str = None,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[dict]:
+        """
+        Stream matching records chunk by chunk, so a full table is never
+        loaded at once and writers are not blocked for the whole scan.
+        """
+        after_id = None
+        while True:
+            chunk = await asyncio.to_thread(self.scan, resource, filters, created_after, created_before, after_id, chunk_size)
+            for record in chunk:
+                yield record
+            if len(chunk) < chunk_size:
+                return
+            after_id = str(chunk[-1]["id"])
@@ -0,0 +1,72 @@
+# notifications.py
+
+import weakref
+import logging
+from mcp.server.fastmcp import FastMCP
+from mcp.server.session import ServerSession
+from pydantic import AnyUrl
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+
+class ResourceSubscriptions:
+    """
+    Tracks which client sessions subscribed to which resource URIs and
+    pushes notifications/resources/updated to them.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, weakref.WeakSet[ServerSession]] = {}
+
+    def install(self, mcp: FastMCP) -> None:
+        """
+        Register subscribe/unsubscribe handlers and advertise the
+        `resources.subscribe` capability, which FastMCP leaves off.
+        """
+        server = mcp._mcp_server
+
+        @server.subscribe_resource()
+        async def subscribe(uri: AnyUrl) -> None:
+            self.subscribe(str(uri), mcp.get_context().session)
+
+        @server.unsubscribe_resource()
+        async def unsubscribe(uri: AnyUrl) -> None:
+            self.unsubscribe(str(uri), mcp.get_context().session)
+
+        get_capabilities = server.get_capabilities
+
+        def get_capabilities_with_subscribe(*args, **kwargs):
+            capabilities = get_capabilities(*args, **kwargs)
+            if capabilities.resources is not None:
+                capabilities.resources.subscribe = True
+            return capabilities
+
+        server.get_capabilities = get_capabilities_with_subscribe
+
+    def subscribe(self, uri: str, session: ServerSession) -> None:
+        self._subscribers.setdefault(uri, weakref.WeakSet()).add(session)
+
+    def unsubscribe(self, uri: str, session: ServerSession) -> None:
+        sessions = self._subscribers.get(uri)
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self._subscribers[uri]
+
+    async def notify(self, uri: str) -> int:
+        """
+        Send resources/updated for `uri` to every subscribed session; returns
+        how many sessions were notified.
+        """
+        notified = 0
+        for session in list(self._subscribers.get(uri, ())):
+            try:
+                await session.send_resource_updated(AnyUrl(uri))
+                notified += 1
+            except Exception as e:
+                logger.info("Dropping subscriber for %s: %s", uri, e)
+                self.unsubscribe(uri, session)
+        return notified
+
+    def stats(self) -> dict:
+        return {uri: len(sessions) for uri, sessions in self._subscribers.items()}
@@ -0,0 +1,86 @@
+# pagination.py
+
+import asyncio
+from contextlib import aclosing, suppress
+from typing import Any, AsyncIterator, Awaitable, Callable
+from urllib.parse import parse_qsl, urlsplit
+from .client import env_int
+
+# Largest page[size] the Lemon Squeezy API accepts
+MAX_PAGE_SIZE = 100
+# Cap on records collected by list tools when all_pages is requested
+DEFAULT_MAX_ITEMS = env_int("LEMONSQUEEZY_MAX_LIST_ITEMS", 1000)
+
+Fetch = Callable[..., Awaitable[Any]]
+
+
+def next_page_params(page: dict, params: dict) -> dict | None:
+    """
+    Work out the query params for the page after `page`, preferring
+    meta.page.currentPage/lastPage and falling back to links.next.
+    """
+    meta = (page.get("meta") or {}).get("page") or {}
+    current, last = meta.get("currentPage"), meta.get("lastPage")
+    if current is not None and last is not None:
+        return {**params, "page[number]": current + 1} if current < last else None
+    next_link = (page.get("links") or {}).get("next")
+    if not next_link:
+        return None
+    return {**params, **dict(parse_qsl(urlsplit(next_link).query))}
+
+
+async def iter_pages(
+    fetch: Fetch,
+    endpoint: str,
+    params: dict = None,
+    max_items: int = None,
+    page_size: int = MAX_PAGE_SIZE,
+) -> AsyncIterator[tuple[dict, dict, dict | None]]:
+    """
+    Yield (params, page, next params) for each page of a JSON:API list
+    endpoint. The next page is requested as soon as the current one arrives
+    so the round trip overlaps with the caller processing it; no page is
+    prefetched once `max_items` records have been seen.
+    """
+    params = {**(params or {}), "page[size]": page_size}
+    params.setdefault("page[number]", 1)
+    seen = 0
+    pending = asyncio.ensure_future(fetch("GET", endpoint, params=params))
+    try:
+        while pending is not None:
+            page = await pending
+            pending = None
+            records = page.get("data") or []
+            seen += len(records)
+            next_params = next_page_params(page, params)
+            if next_params is not None and records and (max_items is None or seen < max_items):
+                pending = asyncio.ensure_future(fetch("GET", endpoint, params=next_params))
+            yield params, page, next_params if records else None
+            params = next_params
+    finally:
+        if pending is not None:
+            # The consumer stopped early: nobody wants the prefetched page, or its error
+            pending.cancel()
+            with suppress(asyncio.CancelledError, Exception):
+                await pending
+
+
+async def paginate(
+    fetch: Fetch,
+    endpoint: str,
+    params: dict = None,
+    max_items: int = None,
+    page_size: int = MAX_PAGE_SIZE,
+) -> AsyncIterator[dict]:
+    """
+    Yield every record of a JSON:API list endpoint, one page in memory at a
+    time, with the next page prefetched (see iter_pages).
+    """
+    yielded = 0
+    async with aclosing(iter_pages(fetch, endpoint, params, max_items, page_size)) as pages:
+        async for _, page, _ in pages:
+            for record in page.get("data") or []:
+                if max_items is not None and yielded >= max_items:
+                    return
+                yield record
+                yielded += 1
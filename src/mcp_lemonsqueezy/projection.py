@@ -0,0 +1,65 @@
+# projection.py
+
+import json
+
+
+def split_fields(resource_type: str, fields: list[str] | None) -> dict[str, list[str]]:
+    """
+    Group requested fields by JSON:API type. Plain names belong to the
+    primary type; "type.field" names select fields of included resources,
+    e.g. ["status", "total", "customers.email"].
+    """
+    grouped: dict[str, list[str]] = {}
+    for name in fields or []:
+        owner, _, field = name.rpartition(".")
+        grouped.setdefault(owner or resource_type, []).append(field)
+    return grouped
+
+
+def fieldset_params(resource_type: str, fields: list[str] = None, include: list[str] = None) -> dict:
+    """
+    Query params for a JSON:API sparse fieldset, e.g.
+    {"fields[orders]": "status,total", "include": "customer"}.
+    """
+    params = {f"fields[{owner}]": ",".join(names) for owner, names in split_fields(resource_type, fields).items()}
+    if include:
+        params["include"] = ",".join(include)
+    return params
+
+
+def project_record(record: dict, wanted: list[str] | None, compact: bool) -> dict:
+    attributes = record.get("attributes") or {}
+    if wanted is not None:
+        attributes = {k: v for k, v in attributes.items() if k in wanted}
+    if compact:
+        return {"id": record.get("id"), "type": record.get("type"), **attributes}
+    return {**record, "attributes": attributes}
+
+
+def project(document: dict, resource_type: str, fields: list[str] = None, compact: bool = False) -> dict:
+    """
+    Apply the fieldset locally, for when the API ignores it, and with
+    compact=True flatten records to {"id", "type", **attributes}, dropping
+    links and relationship stubs.
+    """
+    grouped = split_fields(resource_type, fields) if fields else {}
+
+    def shape(record: dict) -> dict:
+        wanted = grouped.get(record.get("type")) if grouped else None
+        return project_record(record, wanted, compact)
+
+    data = document.get("data")
+    if isinstance(data, list):
+        data = [shape(r) for r in data]
+    elif isinstance(data, dict):
+        data = shape(data)
+    dropped = ("links", "jsonapi") if compact else ()
+    result = {k: v for k, v in document.items() if k not in dropped}
+    result["data"] = data
+    if document.get("included"):
+        result["included"] = [shape(r) for r in document["included"]]
+    return result
+
+
+def payload_size(document: dict) -> int:
+    return len(json.dumps(document, separators=(",", ":"), default=str))
@@ -0,0 +1,222 @@
+# ratelimit.py
+
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable
+import httpx
+from .client import env_float, env_int
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+# Lower value is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header given either as seconds or as an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def refund(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def time_until_token(self) -> float:
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def drain_to(self, remaining: float) -> None:
+        """
+        Never hold more tokens than the server says are left in its window.
+        """
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+
+
+class RequestScheduler:
+    """
+    Central gate for Lemon Squeezy API traffic: a token bucket sized to the
+    API quota, a priority queue so interactive calls overtake bulk crawls,
+    and retries with jittered exponential backoff on 429s and transient
+    failures.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = None,
+        burst: int = None,
+        max_retries: int = None,
+        backoff_base: float = None,
+        backoff_cap: float = None,
+    ):
+        self.requests_per_minute = requests_per_minute or env_int("LEMONSQUEEZY_RATE_LIMIT", 300)
+        burst = burst or env_int("LEMONSQUEEZY_RATE_BURST", 20)
+        self.max_retries = max_retries if max_retries is not None else env_int("LEMONSQUEEZY_MAX_RETRIES", 4)
+        self.backoff_base = backoff_base or env_float("LEMONSQUEEZY_BACKOFF_BASE", 0.5)
+        self.backoff_cap = backoff_cap or env_float("LEMONSQUEEZY_BACKOFF_CAP", 30.0)
+        self.bucket = TokenBucket(self.requests_per_minute / 60.0, burst)
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._dispatcher: asyncio.Task | None = None
+        self._paused_until = 0.0
+        # Metrics
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.rate_limit_remaining: int | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    def _record_wait(self, waited: float) -> None:
+        self.requests += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE) -> None:
+        """
+        Wait for a request slot. Higher-priority (lower value) callers are
+        granted tokens first.
+        """
+        start = time.monotonic()
+        if not self._waiters and start >= self._paused_until and self.bucket.try_take():
+            self._record_wait(0.0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.bucket.refund()
+            raise
+        self._record_wait(time.monotonic() - start)
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            _, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = max(self._paused_until - time.monotonic(), self.bucket.time_until_token())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if self.bucket.try_take():
+                heapq.heappop(self._waiters)
+                future.set_result(None)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every queued request, e.g. after a 429 with Retry-After.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def observe(self, resp: httpx.Response) -> None:
+        limit = resp.headers.get("X-RateLimit-Limit")
+        remaining = resp.headers.get("X-RateLimit-Remaining")
+        if limit and limit.isdigit() and int(limit) != self.requests_per_minute:
+            self.requests_per_minute = int(limit)
+            self.bucket.rate = self.requests_per_minute / 60.0
+        if remaining and remaining.isdigit():
+            self.rate_limit_remaining = int(remaining)
+            self.bucket.drain_to(int(remaining))
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def request(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        priority: int = PRIORITY_INTERACTIVE,
+        idempotent: bool = True,
+    ) -> httpx.Response:
+        """
+        Run `send` under the rate limit, retrying 429s always and transport
+        errors / 5xx only when the request is idempotent.
+        """
+        attempt = 0
+        while True:
+            await self.acquire(priority)
+            try:
+                resp = await send()
+            except httpx.TransportError:
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+            else:
+                self.observe(resp)
+                retryable = resp.status_code == 429 or (idempotent and resp.status_code in RETRYABLE_STATUS)
+                if not retryable or attempt >= self.max_retries:
+                    return resp
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                delay = retry_after if retry_after is not None else self.backoff(attempt)
+                if resp.status_code == 429:
+                    # The pause holds this retry in acquire() along with everything else queued
+                    self.throttled += 1
+                    self.pause(delay)
+                    delay = 0.0
+            attempt += 1
+            self.retries += 1
+            logger.info("Retrying Lemon Squeezy request (attempt %d)", attempt)
+            if delay:
+                await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_available": round(self.bucket.tokens, 2),
+            "rate_limit_remaining": self.rate_limit_remaining,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "total_wait_seconds": round(self.total_wait, 4),
+            "avg_wait_seconds": round(self.total_wait / self.requests, 4) if self.requests else 0.0,
+            "max_wait_seconds": round(self.max_wait, 4),
+        }
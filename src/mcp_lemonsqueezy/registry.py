@@ -0,0 +1,107 @@
+# registry.py
+
+import inspect
+import logging
+from typing import Any, Callable, Sequence
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.types import EmbeddedResource, ImageContent, TextContent, Tool
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+
+def signature_params(fn: Callable) -> tuple[set[str], set[str]]:
+    """
+    (all, required) argument names of a tool function, leaving out its Context.
+    """
+    names, required = set(), set()
+    for name, param in inspect.signature(fn).parameters.items():
+        if isinstance(param.annotation, type) and issubclass(param.annotation, Context):
+            continue
+        names.add(name)
+        if param.default is inspect.Parameter.empty:
+            required.add(name)
+    return names, required
+
+
+class ToolRegistry:
+    """
+    Answers tools/list from the precomputed schemas in tools.py and hands a
+    tool to FastMCP, which introspects its signature into a pydantic model,
+    only when it is first called. Startup then does no per-tool work; tools
+    without a precomputed schema are registered and listed as FastMCP
+    describes them.
+    """
+
+    def __init__(self, schemas: Callable[[], list[Tool]]):
+        self._schemas = schemas
+        self._listed: list[Tool] | None = None
+        self.functions: dict[str, Callable] = {}
+        self.pending: dict[str, Callable] = {}
+        self.mcp: FastMCP | None = None
+
+    def add(self, fn: Callable) -> Callable:
+        self.functions[fn.__name__] = fn
+        self.pending[fn.__name__] = fn
+        return fn
+
+    def install(self, mcp: FastMCP) -> None:
+        """
+        Replace FastMCP's tools/list and tools/call handlers with ours.
+        """
+        self.mcp = mcp
+        server = mcp._mcp_server
+        server.list_tools()(self.list_tools)
+        server.call_tool()(self.call_tool)
+
+    def _register(self, name: str) -> None:
+        fn = self.pending.pop(name, None)
+        if fn is not None:
+            self.mcp.add_tool(fn)
+
+    async def list_tools(self) -> list[Tool]:
+        if self._listed is None:
+            listed = [schema for schema in self._schemas() if schema.name in self.functions]
+            known = {schema.name for schema in listed}
+            for name in self.functions:
+                if name not in known:
+                    logger.warning("Tool %s has no precomputed schema in tools.py; introspecting it", name)
+                    self._register(name)
+            described = {t.name: t for t in self.mcp._tool_manager.list_tools()}
+            listed += [
+                Tool(name=name, description=described[name].description, inputSchema=described[name].parameters)
+                for name in self.functions if name not in known
+            ]
+            self._listed = listed
+        return self._listed
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
+        self._register(name)
+        return await self.mcp.call_tool(name, arguments)
+
+    def drift(self) -> dict[str, dict]:
+        """
+        Where the precomputed schemas and the tool functions disagree, by
+        tool name; empty when they match.
+        """
+        schemas = {schema.name: schema for schema in self._schemas()}
+        drift = {}
+        for name in sorted(self.functions.keys() | schemas.keys()):
+            if name not in schemas:
+                drift[name] = {"error": "no precomputed schema"}
+                continue
+            if name not in self.functions:
+                drift[name] = {"error": "no tool function"}
+                continue
+            names, required = signature_params(self.functions[name])
+            schema = schemas[name].inputSchema
+            properties = set(schema.get("properties", {}))
+            listed_required = set(schema.get("required", []))
+            issues = {
+                "missing_properties": sorted(names - properties),
+                "unknown_properties": sorted(properties - names),
+                "required_mismatch": sorted(required ^ listed_required),
+            }
+            issues = {k: v for k, v in issues.items() if v}
+            if issues:
+                drift[name] = issues
+        return drift
@@ -0,0 +1,264 @@
+# resilience.py
+
+import time
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, TypeVar
+from .client import env_bool, env_float, env_int
+
+if TYPE_CHECKING:
+    from .metrics import Histogram
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Prometheus gauge value per state
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an endpoint whose circuit breaker is open.
+    """
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Circuit open for {endpoint}: the API has been failing; retry in {retry_in:.0f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Closed while the endpoint works. After `failures` failed calls in a row
+    (transport errors, timeouts, 5xx) it opens and calls fail at once for
+    `reset_after` seconds; then it is half-open and lets one trial call
+    through, closing again if it succeeds and reopening if it fails.
+    """
+
+    def __init__(self, endpoint: str, failures: int, reset_after: float):
+        self.endpoint = endpoint
+        self.failures = failures
+        self.reset_after = reset_after
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial = False
+        self.opened = 0
+        self.rejected = 0
+
+    def check(self) -> None:
+        """
+        Raise CircuitOpenError while the breaker is open and cooling down.
+        """
+        if self.state == OPEN:
+            waited = time.monotonic() - self.opened_at
+            if waited < self.reset_after:
+                self.rejected += 1
+                raise CircuitOpenError(self.endpoint, self.reset_after - waited)
+
+    def allow(self) -> None:
+        """
+        Raise CircuitOpenError unless a call may go through now; after the
+        cool-down the first caller becomes the half-open trial.
+        """
+        self.check()
+        if self.state == OPEN:
+            self.state = HALF_OPEN
+            logger.info("Circuit half-open for %s", self.endpoint)
+        if self.state == HALF_OPEN:
+            if self._trial:
+                self.rejected += 1
+                raise CircuitOpenError(self.endpoint, 0.0)
+            self._trial = True
+
+    def record(self, ok: bool) -> None:
+        self._trial = False
+        if ok:
+            if self.state != CLOSED:
+                logger.info("Circuit closed for %s", self.endpoint)
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            return
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failures:
+            if self.state != OPEN:
+                self.opened += 1
+                logger.warning("Circuit open for %s after %d failures", self.endpoint, self.consecutive_failures)
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def abandon(self) -> None:
+        """
+        The call let through was cancelled before it had an outcome.
+        """
+        self._trial = False
+
+    def stats(self) -> dict:
+        data = {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+        if self.state == OPEN:
+            data["retry_in_seconds"] = round(max(0.0, self.reset_after - (time.monotonic() - self.opened_at)), 1)
+        return data
+
+
+class CircuitBreakers:
+    """
+    One CircuitBreaker per endpoint label (e.g. "GET /orders/{id}").
+    """
+
+    def __init__(self, failures: int = None, reset_after: float = None, enabled: bool = None):
+        self.failures = failures or env_int("LEMONSQUEEZY_BREAKER_FAILURES", 5)
+        self.reset_after = reset_after or env_float("LEMONSQUEEZY_BREAKER_RESET", 30.0)
+        self.enabled = enabled if enabled is not None else env_bool("LEMONSQUEEZY_BREAKER_ENABLED", True)
+        self.breakers: dict[str, CircuitBreaker] = {}
+        # GETs answered from an expired cache entry instead of failing
+        self.stale_served = 0
+
+    def get(self, endpoint: str) -> CircuitBreaker | None:
+        if not self.enabled:
+            return None
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = self.breakers[endpoint] = CircuitBreaker(endpoint, self.failures, self.reset_after)
+        return breaker
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "failures": self.failures,
+            "reset_after": self.reset_after,
+            "stale_served": self.stale_served,
+            "endpoints": {name: b.stats() for name, b in sorted(self.breakers.items())},
+        }
+
+
+class Hedger:
+    """
+    Sends a duplicate of a slow GET once it has taken longer than the
+    endpoint's recent `quantile` latency, and uses whichever usable answer
+    comes first; the other request is cancelled. Hedges are only sent when
+    `can_hedge()` allows (a rate-limit token is free), never queued.
+    """
+
+    def __init__(
+        self,
+        latency_for: Callable[[str], "Histogram | None"],
+        can_hedge: Callable[[], bool],
+        enabled: bool = None,
+        quantile: float = None,
+        min_delay: float = None,
+        min_samples: int = None,
+    ):
+        self.latency_for = latency_for
+        self.can_hedge = can_hedge
+        self.enabled = enabled if enabled is not None else env_bool("LEMONSQUEEZY_HEDGE", False)
+        self.quantile = quantile or env_float("LEMONSQUEEZY_HEDGE_QUANTILE", 0.95)
+        self.min_delay = min_delay if min_delay is not None else env_float("LEMONSQUEEZY_HEDGE_MIN_DELAY", 0.05)
+        # Below this many observed requests the endpoint's p95 means little
+        self.min_samples = min_samples or env_int("LEMONSQUEEZY_HEDGE_MIN_SAMPLES", 20)
+        self.requests = 0
+        self.hedged = 0
+        self.wins = 0
+        self.skipped = 0
+
+    def delay(self, endpoint: str) -> float | None:
+        """
+        Seconds to wait before hedging a request to `endpoint`, or None to never hedge it.
+        """
+        if not self.enabled:
+            return None
+        latency = self.latency_for(endpoint)
+        if latency is None or latency.count < self.min_samples:
+            return None
+        return max(latency.quantile(self.quantile), self.min_delay)
+
+    async def run(self, endpoint: str, send: Callable[[], Awaitable[T]], usable: Callable[[T], bool] = None) -> T:
+        """
+        Result of `send()`, hedged when it is slow. Once hedged, only a
+        result that passes `usable` (e.g. not a 429 or 5xx) wins; if neither
+        attempt gives one, the first request's answer is returned.
+        """
+        delay = self.delay(endpoint)
+        if delay is None:
+            return await send()
+        self.requests += 1
+        first = asyncio.ensure_future(send())
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return first.result()
+            if not self.can_hedge():
+                self.skipped += 1
+                return await first
+            self.hedged += 1
+            tasks.add(asyncio.ensure_future(send()))
+            error = None
+            unused: dict[bool, T] = {}
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    if usable is not None and not usable(task.result()):
+                        unused[task is first] = task.result()
+                        continue
+                    if task is not first:
+                        self.wins += 1
+                    return task.result()
+            if unused:
+                return unused.get(True, unused.get(False))
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "quantile": self.quantile,
+            "min_delay": self.min_delay,
+            "min_samples": self.min_samples,
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.wins,
+            "hedge_win_rate": round(self.wins / self.hedged, 4) if self.hedged else 0.0,
+            "skipped_no_token": self.skipped,
+        }
+
+
+def mark_stale(value: Any, expired_for: float) -> Any:
+    """
+    A copy of a cached JSON:API document with meta.stale set, so callers
+    can tell it was served from an expired entry while the API was failing.
+    """
+    if not isinstance(value, dict):
+        return value
+    meta = value.get("meta") if isinstance(value.get("meta"), dict) else {}
+    return {**value, "meta": {**meta, "stale": {"expired_seconds_ago": round(max(0.0, expired_for), 1)}}}
+
+
+def render_prometheus(breakers: CircuitBreakers, hedger: Hedger) -> list[str]:
+    lines = ["# TYPE lemonsqueezy_breaker_state gauge"]
+    lines += [f'lemonsqueezy_breaker_state{{endpoint="{n}"}} {STATE_VALUES[b.state]}' for n, b in sorted(breakers.breakers.items())]
+    lines.append("# TYPE lemonsqueezy_breaker_opened_total counter")
+    lines += [f'lemonsqueezy_breaker_opened_total{{endpoint="{n}"}} {b.opened}' for n, b in sorted(breakers.breakers.items())]
+    lines.append("# TYPE lemonsqueezy_breaker_rejected_total counter")
+    lines += [f'lemonsqueezy_breaker_rejected_total{{endpoint="{n}"}} {b.rejected}' for n, b in sorted(breakers.breakers.items())]
+    lines.append("# TYPE lemonsqueezy_stale_responses_total counter")
+    lines.append(f"lemonsqueezy_stale_responses_total {breakers.stale_served}")
+    lines.append("# TYPE lemonsqueezy_hedged_requests_total counter")
+    lines.append(f"lemonsqueezy_hedged_requests_total {hedger.hedged}")
+    lines.append("# TYPE lemonsqueezy_hedge_wins_total counter")
+    lines.append(f"lemonsqueezy_hedge_wins_total {hedger.wins}")
+    return lines
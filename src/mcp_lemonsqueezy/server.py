@@ -1,59 +1,434 @@
 import os
+import sys
+
+if not __package__:
+    # Run as a script (uv run src/mcp_lemonsqueezy/server.py): load the
+    # package instead of putting its directory on sys.path
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    import mcp_lemonsqueezy  # noqa: F401
+    __package__ = "mcp_lemonsqueezy"
+
 import json
-import logging
-from datetime import datetime
-from typing import Any
+import argparse
+import asyncio
+import time
 import httpx
+import logging
+from contextlib import aclosing, asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP, Context
 from pydantic import AnyUrl
-from utils import get_auth_headers
 
+# The package modules read their settings when imported, so .env has to be loaded first
 load_dotenv()
+
+from .utils import get_auth_headers
+from .client import HttpClientPool, LemonSqueezyAPIError, env_int
+from .pagination import DEFAULT_MAX_ITEMS, paginate
+from .cache import MISSING, ResponseCache, make_key, resource_of
+from .diskcache import DiskCache, cache_namespace
+from .ratelimit import PRIORITY_BULK, PRIORITY_INTERACTIVE, RequestScheduler
+from .singleflight import SingleFlight
+from .batch import batch_get
+from .fanout import StoreFanOut
+from .mirror import MIRRORED, StoreMirror, iso_cutoff
+from .notifications import ResourceSubscriptions
+from .webhooks import WebhookReceiver
+from .audit import AuditLog
+from .metrics import Metrics, MetricsServer, endpoint_label
+from .transport import CallGate, run_sse
+from .projection import fieldset_params, payload_size, project
+from .checkouts import CheckoutPipeline, load_template
+from .licenses import LicenseService, key_hash
+from .export import DEFAULT_EXPORT_DIR, ResourceExport, export_path
+from .resilience import CLOSED, OPEN, CircuitBreakers, CircuitOpenError, Hedger, mark_stale, render_prometheus
+from .registry import ToolRegistry
+from .validation import InputValidator
+from .tools import get_lemonsqueezy_tools
+from .aggregates import API_FILTERS, SOURCES, Scan, api_params, check_group_by, summarize_license_keys, summarize_orders, summarize_subscriptions, variant_prices
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("lemonsqueezy-fastmcp-server")
 
-LEM_SQ_API_BASE = "https://api.lemonsqueezy.com/v1"
+LEM_SQ_API_BASE = os.getenv("LEMONSQUEEZY_API_BASE", "https://api.lemonsqueezy.com/v1")
 
-# Audit log manager
-class AuditLog:
-    def __init__(self):
-        self.entries = []
+# Audit log: bounded in memory, appended to a rotating JSONL file in the background
+audit_log = AuditLog()
 
-    def log(self, operation: str, params: dict):
-        self.entries.append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "operation": operation,
-            "parameters": params
-        })
+# Shared connection pool, opened and closed with the server lifespan
+http_pool = HttpClientPool()
 
-    def synthesize(self) -> str:
-        if not self.entries:
-            return "No Lemon Squeezy operations logged."
-        return "\n\n".join([
-            f"[{entry['timestamp']}]\nOperation: {entry['operation']}\nParams: {json.dumps(entry['parameters'], indent=2)}"
-            for entry in self.entries
-        ])
+@asynccontextmanager
+async def server_lifespan(server: FastMCP) -> AsyncIterator[dict]:
+    async with http_pool.lifespan(), audit_log.lifespan(), webhook_receiver.lifespan(), metrics_server.lifespan():
+        yield {}
 
-audit_log = AuditLog()
+# In-process cache for GET responses
+response_cache = ResponseCache()
+
+# Catalog responses on disk, shared by every server process on the host using the same API key and base
+disk_cache = DiskCache(namespace=cache_namespace(os.getenv("LEMONSQUEEZY_API_KEY"), LEM_SQ_API_BASE))
+
+# Rate limiter and retry policy every API call goes through
+scheduler = RequestScheduler()
+
+# Coalesces identical GET requests that are in flight at the same time
+single_flight = SingleFlight()
+
+# Per-tool and per-endpoint latency, error and throughput metrics
+metrics = Metrics()
+metrics_server = MetricsServer(metrics)
+
+# Per-endpoint circuit breakers, and duplicate GETs for requests slower than the endpoint's p95
+breakers = CircuitBreakers()
+hedger = Hedger(lambda label: getattr(metrics.endpoints.get(label), "latency", None), scheduler.bucket.try_take)
+metrics.collectors.append(lambda: render_prometheus(breakers, hedger))
 
 # HTTP request helper
-async def lemonsqueezy_request(method: str, endpoint: str, params: dict = None, json_data: dict = None) -> Any:
+async def lemonsqueezy_request(
+    method: str,
+    endpoint: str,
+    params: dict = None,
+    json_data: dict = None,
+    use_cache: bool = True,
+    priority: int = PRIORITY_INTERACTIVE,
+    store: bool = True,
+) -> Any:
+    resource = resource_of(endpoint)
+    cache_key = make_key(method, endpoint, params)
+    if method == "GET" and use_cache:
+        cached = response_cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
     url = f"{LEM_SQ_API_BASE}{endpoint}"
     headers = get_auth_headers()
-    async with httpx.AsyncClient() as client:
-        resp = await client.request(method, url, headers=headers, params=params, json=json_data)
+    label = f"{method} {endpoint_label(endpoint)}"
+    upstream = 0.0
+
+    breaker = breakers.get(label)
+
+    async def attempt():
+        sent = time.perf_counter()
+        try:
+            resp = await http_pool.client.request(method, url, headers=headers, params=params, json=json_data)
+        except Exception as e:
+            metrics.observe_request(label, time.perf_counter() - sent, type(e).__name__, 0)
+            raise
+        elapsed = time.perf_counter() - sent
+        metrics.observe_request(label, elapsed, resp.status_code, len(resp.content))
+        return resp, elapsed
+
+    def answered(result) -> bool:
+        # A hedge that comes back throttled or failing does not beat a request still on its way
+        status = result[0].status_code
+        return status != 429 and status < 500
+
+    async def send():
+        nonlocal upstream
+        if breaker is not None:
+            try:
+                breaker.allow()
+            except CircuitOpenError:
+                # Opened while this request was queued or backing off: hand back its token
+                scheduler.bucket.refund()
+                raise
+        ok = None
+        try:
+            # Half-open trials go out alone
+            hedged = method == "GET" and (breaker is None or breaker.state == CLOSED)
+            resp, elapsed = await (hedger.run(label, attempt, usable=answered) if hedged else attempt())
+            # Only the attempt whose answer is used counts, not a hedge that ran alongside it
+            upstream += elapsed
+            ok = resp.status_code < 500
+            return resp
+        except httpx.TransportError:
+            ok = False
+            raise
+        finally:
+            if breaker is not None:
+                if ok is None:
+                    breaker.abandon()
+                else:
+                    breaker.record(ok)
+
+    # Disk entry read by call(), also the stale copy of last resort
+    stored = None
+
+    def tripped() -> bool:
+        return breaker is not None and breaker.state == OPEN
+
+    def stale():
+        """
+        An expired copy of this GET to answer with while the circuit is open, or MISSING.
+        """
+        if method != "GET" or not use_cache:
+            return MISSING
+        entry = response_cache.get_stale(cache_key)
+        if entry is MISSING and stored is not None:
+            entry = (stored.value, -stored.expires_in)
+        if entry is MISSING:
+            return MISSING
+        breakers.stale_served += 1
+        logger.warning("Serving stale %s: circuit open", label)
+        return mark_stale(*entry)
+
+    async def call():
+        nonlocal stored
+        if method == "GET" and disk_cache.caches(resource):
+            if use_cache:
+                stored = await disk_cache.get(cache_key)
+                if stored is not None and stored.fresh:
+                    if store:
+                        response_cache.set(cache_key, resource, stored.value, ttl=stored.expires_in)
+                    return stored.value
+                if stored is not None:
+                    # Stale but revalidatable: a 304 costs no body and refreshes the entry
+                    headers.update(stored.conditional_headers())
+        started = time.perf_counter()
+        try:
+            if breaker is not None:
+                # Fail fast instead of queueing for an endpoint that is down
+                breaker.check()
+            resp = await scheduler.request(send, priority=priority, idempotent=method == "GET")
+        except (CircuitOpenError, httpx.TransportError) as e:
+            fallback = stale() if isinstance(e, CircuitOpenError) or tripped() else MISSING
+            if fallback is MISSING:
+                raise
+            return fallback
+        metrics.observe_wait(label, max(0.0, time.perf_counter() - started - upstream))
+        if resp.status_code >= 500 and tripped() and (fallback := stale()) is not MISSING:
+            return fallback
+        if resp.status_code == 304 and stored is not None:
+            await disk_cache.revalidate(cache_key, resource)
+            if store:
+                response_cache.set(cache_key, resource, stored.value)
+            return stored.value
         if resp.status_code >= 400:
-            raise Exception(f"{resp.status_code}: {resp.text}")
+            raise LemonSqueezyAPIError(resp.status_code, resp.text, dict(resp.headers))
+        data = resp.json()
+        if method == "GET":
+            if not store:
+                # Large crawls (exports) would only push everything else out of the caches
+                return data
+            response_cache.set(cache_key, resource, data)
+            if disk_cache.caches(resource):
+                await disk_cache.set(cache_key, resource, data, resp.headers)
+        else:
+            response_cache.invalidate(resource)
+            await disk_cache.invalidate(resource)
+        return data
+
+    if method == "GET":
+        # Identical GETs already in flight share that request, if they use the caches the same way
+        return await single_flight.do((cache_key, use_cache, store), call)
+    return await call()
+
+def lemonsqueezy_paginate(
+    endpoint: str,
+    params: dict = None,
+    max_items: int = None,
+    use_cache: bool = True,
+    store: bool = True,
+) -> AsyncIterator[dict]:
+    """
+    Stream every record of a list endpoint, following pagination. With
+    store=False the pages are not added to the caches (for full scans).
+    """
+    fetch = partial(lemonsqueezy_request, priority=PRIORITY_BULK, use_cache=use_cache, store=store)
+    return paginate(fetch, endpoint, params=params, max_items=max_items)
+
+async def lemonsqueezy_batch_get(endpoint: str, ids: list[str]) -> dict:
+    """
+    Fetch many records of one resource concurrently, reporting errors per ID.
+    """
+    return await batch_get(lemonsqueezy_request, endpoint, ids, bulk_fetch=partial(lemonsqueezy_request, priority=PRIORITY_BULK))
+
+# Bulk checkout creation; shared so a retried call replays checkouts already created
+checkout_pipeline = CheckoutPipeline(partial(lemonsqueezy_request, priority=PRIORITY_BULK, use_cache=False))
+
+# The License API has its own, lower quota than the main API
+license_scheduler = RequestScheduler(
+    requests_per_minute=env_int("LEMONSQUEEZY_LICENSE_RATE_LIMIT", 60),
+    burst=env_int("LEMONSQUEEZY_LICENSE_RATE_BURST", 10),
+)
+
+async def license_request(action: str, form: dict) -> dict:
+    """
+    POST to the License API (validate, activate or deactivate). Answers
+    about the key itself, including 4xx ones like "license_key not found",
+    are returned; throttling and server errors raise.
+    """
+    url = f"{LEM_SQ_API_BASE}/licenses/{action}"
+    label = f"POST /licenses/{action}"
+
+    async def send():
+        sent = time.perf_counter()
+        try:
+            resp = await http_pool.client.post(url, data=form, headers={"Accept": "application/json"})
+        except Exception as e:
+            metrics.observe_request(label, time.perf_counter() - sent, type(e).__name__, 0)
+            raise
+        metrics.observe_request(label, time.perf_counter() - sent, resp.status_code, len(resp.content))
+        return resp
+
+    resp = await license_scheduler.request(send, idempotent=action == "validate")
+    if resp.status_code == 429 or resp.status_code >= 500:
+        raise LemonSqueezyAPIError(resp.status_code, resp.text, dict(resp.headers))
+    try:
         return resp.json()
+    except ValueError:
+        raise LemonSqueezyAPIError(resp.status_code, resp.text, dict(resp.headers))
+
+# License validation with a short-lived answer cache keyed on the key's hash
+license_service = LicenseService(license_request)
+
+async def invalidate_license_keys() -> None:
+    """
+    Drop cached license key responses after an activation changed their activation_usage.
+    """
+    response_cache.invalidate("license-keys", "license-key-instances")
+    await disk_cache.invalidate("license-keys", "license-key-instances")
+
+async def lemonsqueezy_fan_out(endpoint: str, store_ids: list[str], params: dict = None, all_pages: bool = False, max_items: int = None) -> dict:
+    """
+    Run a list query once per store concurrently and merge the results newest first.
+    """
+    fetch = partial(lemonsqueezy_request, priority=PRIORITY_BULK) if all_pages else lemonsqueezy_request
+    fan_out = StoreFanOut(fetch, endpoint, store_ids, params=params, all_pages=all_pages)
+    max_items = (max_items or DEFAULT_MAX_ITEMS) if all_pages else None
+    records = []
+    async with aclosing(fan_out.stream(max_items)) as stream:
+        async for record in stream:
+            records.append(record)
+    reached = max_items is not None and len(records) >= max_items
+    return {"data": records, "meta": {"count": len(records), "max_items_reached": reached, **fan_out.meta()}}
+
+async def resolve_store_ids(store_ids: list[str] = None, all_stores: bool = False) -> list[str] | None:
+    if not all_stores:
+        return store_ids
+    async with aclosing(lemonsqueezy_paginate("/stores")) as stream:
+        return [record["id"] async for record in stream]
+
+async def lemonsqueezy_list(
+    endpoint: str,
+    params: dict = None,
+    all_pages: bool = False,
+    max_items: int = None,
+    store_ids: list[str] = None,
+) -> dict:
+    """
+    Return the first page of a list endpoint, or every page up to max_items.
+    With store_ids, query each store concurrently and merge the results.
+    """
+    if store_ids:
+        return await lemonsqueezy_fan_out(endpoint, store_ids, params=params, all_pages=all_pages, max_items=max_items)
+    if not all_pages:
+        return await lemonsqueezy_request("GET", endpoint, params=params)
+    max_items = max_items or DEFAULT_MAX_ITEMS
+    records = []
+    async with aclosing(lemonsqueezy_paginate(endpoint, params=params, max_items=max_items)) as stream:
+        async for record in stream:
+            records.append(record)
+    return {"data": records, "meta": {"count": len(records), "max_items_reached": len(records) >= max_items}}
+
+def shape_response(tool_name: str, data: dict, resource_type: str, fields: list[str] = None, compact: bool = False) -> dict:
+    """
+    Apply the requested fieldset locally (the API may ignore it, and cached
+    or batched records carry every attribute) and count the bytes saved.
+    """
+    if not fields and not compact:
+        return data
+    before = payload_size(data)
+    shaped = project(data, resource_type, fields, compact)
+    metrics.observe_payload(tool_name, before, payload_size(shaped))
+    return shaped
+
+# Optional on-disk mirror of store data, created on first use
+store_mirror = StoreMirror()
+
+async def aggregate_records(resource: str, source: str, scan: Scan) -> AsyncIterator[dict]:
+    """
+    Stream the records of a resource from the cache/API or the mirror through `scan`.
+    """
+    if source not in SOURCES:
+        raise ValueError(f"Unknown source '{source}'. Expected one of: {', '.join(SOURCES)}")
+    if source == "mirror":
+        if not store_mirror.exists or await asyncio.to_thread(store_mirror.state, resource) is None:
+            raise ValueError(f"The local mirror has no {resource}; run mirror_sync first or use another source")
+        filters = {k: v for k, v in scan.filters.items() if k in MIRRORED[resource][1]}
+        records = store_mirror.iter_records(resource, filters, scan.since, scan.until)
+    else:
+        # List endpoints return newest records first
+        scan.newest_first = True
+        params = api_params(resource, scan.filters)
+        # Cached pages are used when present, but the scan itself leaves the caches as they were
+        records = lemonsqueezy_paginate(MIRRORED[resource][0], params=params, use_cache=source == "cache", store=False)
+    async with aclosing(records) as stream, aclosing(scan(stream)) as scanned:
+        async for record in scanned:
+            yield record
+
+# Clients subscribed to lemonsqueezy:// record resources
+resource_subscriptions = ResourceSubscriptions()
+
+async def handle_webhook_event(event: dict) -> None:
+    """
+    Refresh the cache and mirror from a verified webhook event and notify
+    clients subscribed to the affected record.
+    """
+    event_name = (event.get("meta") or {}).get("event_name", "")
+    data = event.get("data") or {}
+    resource, record_id = data.get("type"), data.get("id")
+    if not resource or not record_id:
+        return
+    # Lists may now be out of date; the record itself is replaced, and other records stay cached
+    response_cache.invalidate_record(resource, record_id)
+    response_cache.set(make_key("GET", f"/{resource}/{record_id}"), resource, {"data": data})
+    await disk_cache.invalidate_record(resource, record_id)
+    if resource == "license-keys" and (data.get("attributes") or {}).get("key"):
+        license_service.forget(data["attributes"]["key"])
+    if store_mirror.exists:
+        await asyncio.to_thread(store_mirror.apply_event, event_name, data)
+    await resource_subscriptions.notify(f"lemonsqueezy://{resource}/{record_id}")
+
+# Optional webhook receiver, started when LEMONSQUEEZY_WEBHOOK_SECRET and LEMONSQUEEZY_WEBHOOK_PORT are set
+webhook_receiver = WebhookReceiver(handle_webhook_event)
 
 # FastMCP server instance
 description = "LemonSqueezy MCP server exposing LemonSqueezy API as MCP tools and an audit log as a resource."
 mcp = FastMCP(
     "lemonsqueezy-mcp",
     version="0.2.0",
-    description=description
+    description=description,
+    lifespan=server_lifespan
 )
+resource_subscriptions.install(mcp)
+
+# tools/list is answered from the static schemas in tools.py; each tool is
+# handed to FastMCP on its first call
+tool_registry = ToolRegistry(get_lemonsqueezy_tools)
+tool_registry.install(mcp)
+
+# Bounds tool calls running at once across every connected client
+call_gate = CallGate()
+
+# Checks write tools' arguments against their tools.py schemas before anything is sent
+input_validator = InputValidator()
+
+def tool(validate: bool = False):
+    """
+    Registers a tool that also records per-tool call, error and latency
+    metrics and runs the call in one of the call gate's worker slots. With
+    validate=True the arguments are first checked against the tool's
+    schema in tools.py.
+    """
+    def decorator(fn):
+        wrapped = call_gate.wrap(fn)
+        if validate:
+            wrapped = input_validator.wrap(wrapped)
+        return tool_registry.add(metrics.instrument(wrapped))
+    return decorator
 
 # Resource: Audit log
 @mcp.resource("audit://lemonsqueezy-operations")
@@ -63,8 +438,90 @@ async def lemonsqueezy_audit_log() -> str:
     """
     return audit_log.synthesize()
 
+@mcp.resource("audit://lemonsqueezy-operations/tail/{count}")
+async def lemonsqueezy_audit_log_tail(count: str) -> str:
+    """
+    The last N logged operations as JSON lines.
+    """
+    return "\n".join(entry.to_json() for entry in audit_log.tail(int(count)))
+
+@mcp.resource("audit://lemonsqueezy-operations/{operation}/tail/{count}")
+async def lemonsqueezy_audit_log_operation_tail(operation: str, count: str) -> str:
+    """
+    The last N logged calls of one operation as JSON lines.
+    """
+    return "\n".join(entry.to_json() for entry in audit_log.tail(int(count), operation=operation))
+
+# Resource: Response cache statistics
+@mcp.resource("cache://lemonsqueezy-stats")
+async def lemonsqueezy_cache_stats() -> str:
+    """
+    Hit, miss and eviction counters of the in-process response cache and
+    the on-disk catalog cache, and how many GET requests were coalesced with
+    an identical one in flight.
+    """
+    return json.dumps({**response_cache.stats(), "disk": disk_cache.stats(), "single_flight": single_flight.stats()}, indent=2)
+
+# Resource: Request scheduler statistics
+@mcp.resource("scheduler://lemonsqueezy-stats")
+async def lemonsqueezy_scheduler_stats() -> str:
+    """
+    Queue depth, wait time and retry counters of the rate-limit scheduler,
+    and of the separate one for the License API.
+    """
+    return json.dumps({**scheduler.stats(), "license_api": license_scheduler.stats()}, indent=2)
+
+# Resource: Circuit breaker and hedging statistics
+@mcp.resource("resilience://lemonsqueezy-stats")
+async def lemonsqueezy_resilience_stats() -> str:
+    """
+    Circuit breaker state per endpoint, stale responses served while a
+    circuit was open, and how often hedged duplicate GETs won.
+    """
+    return json.dumps({"breakers": breakers.stats(), "hedging": hedger.stats()}, indent=2)
+
+# Resource: License validation statistics
+@mcp.resource("licenses://lemonsqueezy-stats")
+async def lemonsqueezy_license_stats() -> str:
+    """
+    Validations, upstream License API calls and verification cache counters.
+    """
+    return json.dumps(license_service.stats(), indent=2)
+
+# Resource: Tool and API metrics
+@mcp.resource("metrics://lemonsqueezy")
+async def lemonsqueezy_metrics() -> str:
+    """
+    Per-tool and per-endpoint call counts, errors, bytes received and p50/p90/p99
+    latency, plus how many write calls input validation checked and rejected.
+    """
+    return json.dumps({**metrics.snapshot(), "validation": input_validator.stats()}, indent=2)
+
+@mcp.resource("metrics://lemonsqueezy/prometheus")
+async def lemonsqueezy_metrics_prometheus() -> str:
+    """
+    The same metrics in Prometheus text exposition format.
+    """
+    return metrics.render_prometheus()
+
+# Resource: Webhook receiver statistics
+@mcp.resource("webhooks://lemonsqueezy-receiver")
+async def lemonsqueezy_webhook_stats() -> str:
+    """
+    Received, rejected and processed counters of the webhook receiver.
+    """
+    return json.dumps({**webhook_receiver.stats(), "subscriptions": resource_subscriptions.stats()}, indent=2)
+
+# Resource: Single records, kept current by webhook events for subscribed clients
+@mcp.resource("lemonsqueezy://{resource}/{record_id}")
+async def lemonsqueezy_record(resource: str, record_id: str) -> str:
+    """
+    A single Lemon Squeezy record, e.g. lemonsqueezy://orders/123.
+    """
+    return json.dumps(await lemonsqueezy_request("GET", f"/{resource}/{record_id}"))
+
 # Tool: get_user
-@mcp.tool()
+@tool()
 async def get_user(ctx: Context) -> dict:
     """
     Get the current authenticated Lemon Squeezy user.
@@ -73,138 +530,383 @@ async def get_user(ctx: Context) -> dict:
     audit_log.log("get_user", {})
     return data
 
-@mcp.tool()
-async def list_stores(ctx: Context) -> dict:
+@tool()
+async def list_stores(
+    ctx: Context,
+    all_pages: bool = False,
+    max_items: int = None,
+    fields: list[str] = None,
+    include: list[str] = None,
+    compact: bool = False,
+) -> dict:
     """
     List all Lemon Squeezy stores.
+    Args:
+        all_pages: Follow pagination and return every page instead of only the first
+        max_items: Maximum number of records to return when all_pages is set
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
     """
-    data = await lemonsqueezy_request("GET", "/stores")
-    audit_log.log("list_stores", {})
-    return data
+    params = fieldset_params("stores", fields, include)
+    data = await lemonsqueezy_list("/stores", params=params, all_pages=all_pages, max_items=max_items)
+    audit_log.log("list_stores", {"all_pages": all_pages, "max_items": max_items, "fields": fields, "include": include, "compact": compact})
+    return shape_response("list_stores", data, "stores", fields, compact)
 
-@mcp.tool()
-async def get_store(store_id: str, ctx: Context) -> dict:
+@tool()
+async def get_store(store_id: str, ctx: Context, fields: list[str] = None, include: list[str] = None, compact: bool = False) -> dict:
     """
     Get details of a specific store.
     Args:
         store_id: The ID of the store
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
     """
-    data = await lemonsqueezy_request("GET", f"/stores/{store_id}")
-    audit_log.log("get_store", {"store_id": store_id})
-    return data
+    data = await lemonsqueezy_request("GET", f"/stores/{store_id}", params=fieldset_params("stores", fields, include))
+    audit_log.log("get_store", {"store_id": store_id, "fields": fields, "include": include, "compact": compact})
+    return shape_response("get_store", data, "stores", fields, compact)
 
-@mcp.tool()
-async def list_products(ctx: Context) -> dict:
+@tool()
+async def list_products(
+    ctx: Context,
+    all_pages: bool = False,
+    max_items: int = None,
+    store_ids: list[str] = None,
+    all_stores: bool = False,
+    fields: list[str] = None,
+    include: list[str] = None,
+    compact: bool = False,
+) -> dict:
     """
     List all products.
+    Args:
+        all_pages: Follow pagination and return every page instead of only the first
+        max_items: Maximum number of records to return when all_pages is set
+        store_ids: Query these stores concurrently and merge the results, newest first
+        all_stores: Query every store the API key can access, as with store_ids
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
     """
-    data = await lemonsqueezy_request("GET", "/products")
-    audit_log.log("list_products", {})
-    return data
+    params = fieldset_params("products", fields, include)
+    stores = await resolve_store_ids(store_ids, all_stores)
+    data = await lemonsqueezy_list("/products", params=params, all_pages=all_pages, max_items=max_items, store_ids=stores)
+    audit_log.log("list_products", {"all_pages": all_pages, "max_items": max_items, "store_ids": store_ids, "all_stores": all_stores, "fields": fields, "include": include, "compact": compact})
+    return shape_response("list_products", data, "products", fields, compact)
 
-@mcp.tool()
-async def get_product(product_id: str, ctx: Context) -> dict:
+@tool()
+async def get_product(product_id: str, ctx: Context, fields: list[str] = None, include: list[str] = None, compact: bool = False) -> dict:
     """
     Get a specific product by ID.
     Args:
         product_id: The ID of the product
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
     """
-    data = await lemonsqueezy_request("GET", f"/products/{product_id}")
-    audit_log.log("get_product", {"product_id": product_id})
-    return data
+    data = await lemonsqueezy_request("GET", f"/products/{product_id}", params=fieldset_params("products", fields, include))
+    audit_log.log("get_product", {"product_id": product_id, "fields": fields, "include": include, "compact": compact})
+    return shape_response("get_product", data, "products", fields, compact)
 
-@mcp.tool()
-async def get_product_variants(product_id: str, ctx: Context) -> dict:
+@tool()
+async def get_product_variants(product_id: str, ctx: Context, fields: list[str] = None, include: list[str] = None, compact: bool = False) -> dict:
     """
     Get all variants for a given product ID.
     Args:
         product_id: The ID of the product to fetch variants for
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
     """
-    data = await lemonsqueezy_request("GET", f"/products/{product_id}/variants")
-    audit_log.log("get_product_variants", {"product_id": product_id})
-    return data
+    data = await lemonsqueezy_request("GET", f"/products/{product_id}/variants", params=fieldset_params("variants", fields, include))
+    audit_log.log("get_product_variants", {"product_id": product_id, "fields": fields, "include": include, "compact": compact})
+    return shape_response("get_product_variants", data, "variants", fields, compact)
 
-@mcp.tool()
-async def list_orders(ctx: Context) -> dict:
+@tool()
+async def list_orders(
+    ctx: Context,
+    all_pages: bool = False,
+    max_items: int = None,
+    store_ids: list[str] = None,
+    all_stores: bool = False,
+    fields: list[str] = None,
+    include: list[str] = None,
+    compact: bool = False,
+) -> dict:
     """
     List all orders.
+    Args:
+        all_pages: Follow pagination and return every page instead of only the first
+        max_items: Maximum number of records to return when all_pages is set
+        store_ids: Query these stores concurrently and merge the results, newest first
+        all_stores: Query every store the API key can access, as with store_ids
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
     """
-    data = await lemonsqueezy_request("GET", "/orders")
-    audit_log.log("list_orders", {})
-    return data
+    params = fieldset_params("orders", fields, include)
+    stores = await resolve_store_ids(store_ids, all_stores)
+    data = await lemonsqueezy_list("/orders", params=params, all_pages=all_pages, max_items=max_items, store_ids=stores)
+    audit_log.log("list_orders", {"all_pages": all_pages, "max_items": max_items, "store_ids": store_ids, "all_stores": all_stores, "fields": fields, "include": include, "compact": compact})
+    return shape_response("list_orders", data, "orders", fields, compact)
 
-@mcp.tool()
-async def get_order(order_id: str, ctx: Context) -> dict:
+@tool()
+async def get_order(order_id: str, ctx: Context, fields: list[str] = None, include: list[str] = None, compact: bool = False) -> dict:
     """
     Get an order by ID.
     Args:
         order_id: The ID of the order
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
     """
-    data = await lemonsqueezy_request("GET", f"/orders/{order_id}")
-    audit_log.log("get_order", {"order_id": order_id})
-    return data
+    data = await lemonsqueezy_request("GET", f"/orders/{order_id}", params=fieldset_params("orders", fields, include))
+    audit_log.log("get_order", {"order_id": order_id, "fields": fields, "include": include, "compact": compact})
+    return shape_response("get_order", data, "orders", fields, compact)
 
-@mcp.tool()
-async def list_customers(ctx: Context) -> dict:
+@tool()
+async def get_orders(order_ids: list[str], ctx: Context, fields: list[str] = None, compact: bool = False) -> dict:
+    """
+    Get many orders by ID in one call. Duplicate IDs are ignored and
+    per-ID failures are returned under "errors".
+    Args:
+        order_ids: The IDs of the orders
+        fields: Attributes to keep in each record, e.g. ["status", "total"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
+    """
+    data = await lemonsqueezy_batch_get("/orders", order_ids)
+    audit_log.log("get_orders", {"order_ids": order_ids, "fields": fields, "compact": compact})
+    return shape_response("get_orders", data, "orders", fields, compact)
+
+@tool()
+async def list_customers(
+    ctx: Context,
+    all_pages: bool = False,
+    max_items: int = None,
+    store_ids: list[str] = None,
+    all_stores: bool = False,
+    fields: list[str] = None,
+    include: list[str] = None,
+    compact: bool = False,
+) -> dict:
     """
     List all customers.
+    Args:
+        all_pages: Follow pagination and return every page instead of only the first
+        max_items: Maximum number of records to return when all_pages is set
+        store_ids: Query these stores concurrently and merge the results, newest first
+        all_stores: Query every store the API key can access, as with store_ids
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
     """
-    data = await lemonsqueezy_request("GET", "/customers")
-    audit_log.log("list_customers", {})
-    return data
+    params = fieldset_params("customers", fields, include)
+    stores = await resolve_store_ids(store_ids, all_stores)
+    data = await lemonsqueezy_list("/customers", params=params, all_pages=all_pages, max_items=max_items, store_ids=stores)
+    audit_log.log("list_customers", {"all_pages": all_pages, "max_items": max_items, "store_ids": store_ids, "all_stores": all_stores, "fields": fields, "include": include, "compact": compact})
+    return shape_response("list_customers", data, "customers", fields, compact)
 
-@mcp.tool()
-async def get_customer(customer_id: str, ctx: Context) -> dict:
+@tool()
+async def get_customer(customer_id: str, ctx: Context, fields: list[str] = None, include: list[str] = None, compact: bool = False) -> dict:
     """
     Get a customer by ID.
     Args:
         customer_id: The ID of the customer
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
     """
-    data = await lemonsqueezy_request("GET", f"/customers/{customer_id}")
-    audit_log.log("get_customer", {"customer_id": customer_id})
-    return data
+    data = await lemonsqueezy_request("GET", f"/customers/{customer_id}", params=fieldset_params("customers", fields, include))
+    audit_log.log("get_customer", {"customer_id": customer_id, "fields": fields, "include": include, "compact": compact})
+    return shape_response("get_customer", data, "customers", fields, compact)
+
+@tool()
+async def get_customers(customer_ids: list[str], ctx: Context, fields: list[str] = None, compact: bool = False) -> dict:
+    """
+    Get many customers by ID in one call. Duplicate IDs are ignored and
+    per-ID failures are returned under "errors".
+    Args:
+        customer_ids: The IDs of the customers
+        fields: Attributes to keep in each record, e.g. ["status", "total"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
+    """
+    data = await lemonsqueezy_batch_get("/customers", customer_ids)
+    audit_log.log("get_customers", {"customer_ids": customer_ids, "fields": fields, "compact": compact})
+    return shape_response("get_customers", data, "customers", fields, compact)
 
-@mcp.tool()
-async def list_subscriptions(ctx: Context) -> dict:
+@tool()
+async def list_subscriptions(
+    ctx: Context,
+    all_pages: bool = False,
+    max_items: int = None,
+    store_ids: list[str] = None,
+    all_stores: bool = False,
+    fields: list[str] = None,
+    include: list[str] = None,
+    compact: bool = False,
+) -> dict:
     """
     List all subscriptions.
+    Args:
+        all_pages: Follow pagination and return every page instead of only the first
+        max_items: Maximum number of records to return when all_pages is set
+        store_ids: Query these stores concurrently and merge the results, newest first
+        all_stores: Query every store the API key can access, as with store_ids
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
     """
-    data = await lemonsqueezy_request("GET", "/subscriptions")
-    audit_log.log("list_subscriptions", {})
-    return data
+    params = fieldset_params("subscriptions", fields, include)
+    stores = await resolve_store_ids(store_ids, all_stores)
+    data = await lemonsqueezy_list("/subscriptions", params=params, all_pages=all_pages, max_items=max_items, store_ids=stores)
+    audit_log.log("list_subscriptions", {"all_pages": all_pages, "max_items": max_items, "store_ids": store_ids, "all_stores": all_stores, "fields": fields, "include": include, "compact": compact})
+    return shape_response("list_subscriptions", data, "subscriptions", fields, compact)
 
-@mcp.tool()
-async def get_subscription(subscription_id: str, ctx: Context) -> dict:
+@tool()
+async def get_subscription(subscription_id: str, ctx: Context, fields: list[str] = None, include: list[str] = None, compact: bool = False) -> dict:
     """
     Get a subscription by ID.
     Args:
         subscription_id: The ID of the subscription
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
     """
-    data = await lemonsqueezy_request("GET", f"/subscriptions/{subscription_id}")
-    audit_log.log("get_subscription", {"subscription_id": subscription_id})
-    return data
+    data = await lemonsqueezy_request("GET", f"/subscriptions/{subscription_id}", params=fieldset_params("subscriptions", fields, include))
+    audit_log.log("get_subscription", {"subscription_id": subscription_id, "fields": fields, "include": include, "compact": compact})
+    return shape_response("get_subscription", data, "subscriptions", fields, compact)
+
+@tool()
+async def get_subscriptions(subscription_ids: list[str], ctx: Context, fields: list[str] = None, compact: bool = False) -> dict:
+    """
+    Get many subscriptions by ID in one call. Duplicate IDs are ignored and
+    per-ID failures are returned under "errors".
+    Args:
+        subscription_ids: The IDs of the subscriptions
+        fields: Attributes to keep in each record, e.g. ["status", "total"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
+    """
+    data = await lemonsqueezy_batch_get("/subscriptions", subscription_ids)
+    audit_log.log("get_subscriptions", {"subscription_ids": subscription_ids, "fields": fields, "compact": compact})
+    return shape_response("get_subscriptions", data, "subscriptions", fields, compact)
 
-@mcp.tool()
-async def list_license_keys(ctx: Context) -> dict:
+@tool()
+async def list_license_keys(
+    ctx: Context,
+    all_pages: bool = False,
+    max_items: int = None,
+    store_ids: list[str] = None,
+    all_stores: bool = False,
+    fields: list[str] = None,
+    include: list[str] = None,
+    compact: bool = False,
+) -> dict:
     """
     List all license keys.
+    Args:
+        all_pages: Follow pagination and return every page instead of only the first
+        max_items: Maximum number of records to return when all_pages is set
+        store_ids: Query these stores concurrently and merge the results, newest first
+        all_stores: Query every store the API key can access, as with store_ids
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
     """
-    data = await lemonsqueezy_request("GET", "/license-keys")
-    audit_log.log("list_license_keys", {})
-    return data
+    params = fieldset_params("license-keys", fields, include)
+    stores = await resolve_store_ids(store_ids, all_stores)
+    data = await lemonsqueezy_list("/license-keys", params=params, all_pages=all_pages, max_items=max_items, store_ids=stores)
+    audit_log.log("list_license_keys", {"all_pages": all_pages, "max_items": max_items, "store_ids": store_ids, "all_stores": all_stores, "fields": fields, "include": include, "compact": compact})
+    return shape_response("list_license_keys", data, "license-keys", fields, compact)
 
-@mcp.tool()
-async def get_license_key(license_key_id: str, ctx: Context) -> dict:
+@tool()
+async def get_license_key(license_key_id: str, ctx: Context, fields: list[str] = None, include: list[str] = None, compact: bool = False) -> dict:
     """
     Get a license key by ID.
     Args:
         license_key_id: The ID of the license key
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
+    """
+    data = await lemonsqueezy_request("GET", f"/license-keys/{license_key_id}", params=fieldset_params("license-keys", fields, include))
+    audit_log.log("get_license_key", {"license_key_id": license_key_id, "fields": fields, "include": include, "compact": compact})
+    return shape_response("get_license_key", data, "license-keys", fields, compact)
+
+@tool()
+async def get_license_keys(license_key_ids: list[str], ctx: Context, fields: list[str] = None, compact: bool = False) -> dict:
+    """
+    Get many license keys by ID in one call. Duplicate IDs are ignored and
+    per-ID failures are returned under "errors".
+    Args:
+        license_key_ids: The IDs of the license keys
+        fields: Attributes to keep in each record, e.g. ["status", "total"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
+    """
+    data = await lemonsqueezy_batch_get("/license-keys", license_key_ids)
+    audit_log.log("get_license_keys", {"license_key_ids": license_key_ids, "fields": fields, "compact": compact})
+    return shape_response("get_license_keys", data, "license-keys", fields, compact)
+
+@tool(validate=True)
+async def validate_license_key(license_key: str, ctx: Context, instance_id: str = None) -> dict:
+    """
+    Validate a license key through the License API. Recent answers are
+    served from a short-lived cache ("cached": true).
+    Args:
+        license_key: The license key
+        instance_id: Also check that this activation instance belongs to the key
+    """
+    license_key = license_key.strip()
+    answer, cached = await license_service.validate(license_key, instance_id)
+    audit_log.log("validate_license_key", {"license_key_sha256": key_hash(license_key)[:16], "instance_id": instance_id, "cached": cached})
+    return {**answer, "cached": cached}
+
+@tool(validate=True)
+async def validate_license_keys(licenses: list[dict], ctx: Context, concurrency: int = None) -> dict:
+    """
+    Validate many license keys in one call. Results are in input order;
+    repeated keys are validated once and cached answers are reused.
+    Args:
+        licenses: Keys to validate, each {"license_key": ..., "instance_id": ...} (instance_id optional)
+        concurrency: License API requests at once (defaults to LEMONSQUEEZY_LICENSE_CONCURRENCY)
+    """
+    # Stripped once here: the cache key and the request use the same key
+    licenses = [{**item, "license_key": item["license_key"].strip()} for item in licenses]
+    data = await license_service.validate_many(licenses, concurrency)
+    audit_log.log("validate_license_keys", {"count": len(licenses), **data["meta"]})
+    return data
+
+@tool(validate=True)
+async def activate_license_key(license_key: str, instance_name: str, ctx: Context) -> dict:
+    """
+    Activate a license key for a new instance (e.g. a device).
+    Args:
+        license_key: The license key
+        instance_name: A label for the new instance
+    """
+    license_key = license_key.strip()
+    data = await license_service.activate(license_key, instance_name)
+    if data.get("activated"):
+        await invalidate_license_keys()
+    audit_log.log("activate_license_key", {"license_key_sha256": key_hash(license_key)[:16], "instance_name": instance_name, "activated": data.get("activated")})
+    return data
+
+@tool(validate=True)
+async def deactivate_license_key(license_key: str, instance_id: str, ctx: Context) -> dict:
+    """
+    Deactivate one activation instance of a license key.
+    Args:
+        license_key: The license key
+        instance_id: The instance ID returned when the key was activated
     """
-    data = await lemonsqueezy_request("GET", f"/license-keys/{license_key_id}")
-    audit_log.log("get_license_key", {"license_key_id": license_key_id})
+    license_key = license_key.strip()
+    data = await license_service.deactivate(license_key, instance_id)
+    if data.get("deactivated"):
+        await invalidate_license_keys()
+    audit_log.log("deactivate_license_key", {"license_key_sha256": key_hash(license_key)[:16], "instance_id": instance_id, "deactivated": data.get("deactivated")})
     return data
 
-@mcp.tool()
+@tool(validate=True)
 async def create_checkout(data: dict, ctx: Context) -> dict:
     """
     Create a Lemon Squeezy checkout session with full custom configuration.
@@ -215,7 +917,40 @@ async def create_checkout(data: dict, ctx: Context) -> dict:
     audit_log.log("create_checkout", {"data": data})
     return result
 
-@mcp.tool()
+@tool(validate=True)
+async def create_checkouts_bulk(template: dict, overrides: list[dict], ctx: Context, concurrency: int = None) -> dict:
+    """
+    Create many personalized checkouts from one template, concurrently and
+    under the rate limit. Every checkout gets an idempotency key, so calling
+    again with the same overrides returns the checkouts already created
+    instead of duplicating them. Each result is also sent as a log message
+    as soon as it completes.
+    Args:
+        template: Checkout data shared by every checkout, as for create_checkout
+        overrides: One object per checkout merged into the template, e.g. {"attributes": {"checkout_data": {"email": "...", "name": "..."}}}; may set "idempotency_key"
+        concurrency: Checkouts created at once (default LEMONSQUEEZY_CHECKOUT_CONCURRENCY)
+    """
+    checkout_template = load_template(template)
+    started = time.perf_counter()
+    results: list[dict] = [None] * len(overrides)
+    counts: dict[str, int] = {}
+    async with aclosing(checkout_pipeline.run(checkout_template, overrides, concurrency)) as stream:
+        async for result in stream:
+            checkout = result.pop("data", None)
+            if checkout is not None:
+                result["id"] = checkout.get("id")
+                result["url"] = (checkout.get("attributes") or {}).get("url")
+            results[result["index"]] = result
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+            await ctx.report_progress(sum(counts.values()), len(overrides))
+            await ctx.info(json.dumps(result))
+    audit_log.log("create_checkouts_bulk", {"template": template, "overrides": len(overrides), "results": counts})
+    return {
+        "data": results,
+        "meta": {"requested": len(overrides), **counts, "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)},
+    }
+
+@tool(validate=True)
 async def create_webhook(webhook_data: dict, ctx: Context) -> dict:
     """
     Register a webhook URL for a specific store and events.
@@ -226,17 +961,277 @@ async def create_webhook(webhook_data: dict, ctx: Context) -> dict:
     audit_log.log("create_webhook", {"webhook_data": webhook_data})
     return result
 
-@mcp.tool()
-async def list_webhooks(store_id: str = None, ctx: Context = None) -> dict:
+@tool()
+async def list_webhooks(
+    store_id: str = None,
+    ctx: Context = None,
+    all_pages: bool = False,
+    max_items: int = None,
+    fields: list[str] = None,
+    include: list[str] = None,
+    compact: bool = False,
+) -> dict:
     """
     List all webhooks. Optionally filter by store ID.
     Args:
         store_id: If provided, only webhooks for this store will be returned
+        all_pages: Follow pagination and return every page instead of only the first
+        max_items: Maximum number of records to return when all_pages is set
+        fields: Attributes to return, e.g. ["status", "total"]; "type.field" selects fields of included resources
+        include: Related resources to include, e.g. ["customer"]
+        compact: Flatten records to {id, type, **attributes}, dropping links and relationship stubs
     """
-    params = {"filter[store_id]": store_id} if store_id else None
-    data = await lemonsqueezy_request("GET", "/webhooks", params=params)
-    audit_log.log("list_webhooks", {"store_id": store_id})
-    return data
+    params = fieldset_params("webhooks", fields, include)
+    if store_id:
+        params["filter[store_id]"] = store_id
+    data = await lemonsqueezy_list("/webhooks", params=params, all_pages=all_pages, max_items=max_items)
+    audit_log.log("list_webhooks", {"store_id": store_id, "all_pages": all_pages, "max_items": max_items, "fields": fields, "include": include, "compact": compact})
+    return shape_response("list_webhooks", data, "webhooks", fields, compact)
+
+@tool()
+async def query_audit_log(
+    ctx: Context,
+    operation: str = None,
+    since: str = None,
+    until: str = None,
+    offset: int = 0,
+    limit: int = 50,
+    include_history: bool = False,
+) -> dict:
+    """
+    Page through logged operations, newest page first.
+    Args:
+        operation: Only entries for this operation (tool name)
+        since: Only entries at or after this ISO 8601 time
+        until: Only entries before this ISO 8601 time
+        offset: Number of newer matching entries to skip
+        limit: Maximum number of entries to return
+        include_history: Read the on-disk log (including rotated files) instead of the in-memory ring
+    """
+    if include_history:
+        await audit_log.flush()
+        entries = await asyncio.to_thread(audit_log.read_file, limit, operation, since, until, offset)
+    else:
+        entries = [entry.to_dict() for entry in audit_log.tail(limit, operation, since, until, offset)]
+    return {"data": entries, "meta": {"count": len(entries), **audit_log.stats()}}
+
+@tool()
+async def mirror_sync(ctx: Context, resources: list[str] = None, full: bool = False) -> dict:
+    """
+    Sync store data into the local SQLite mirror. The first sync of a
+    resource is full; later ones only pull new and changed records.
+    Args:
+        resources: Resources to sync (orders, customers, subscriptions, license-keys, products, variants). Defaults to all
+        full: Re-read every page instead of stopping at the first unchanged page
+    """
+    results = []
+    for resource in resources or list(MIRRORED):
+        if resource not in MIRRORED:
+            raise ValueError(f"Unknown resource '{resource}'. Expected one of: {', '.join(MIRRORED)}")
+        # Every page goes into the mirror; copying them into the caches would only evict hot entries
+        fetch_all = partial(lemonsqueezy_paginate, use_cache=False, store=False)
+        results.append(await store_mirror.sync(fetch_all, resource, full=full))
+    audit_log.log("mirror_sync", {"resources": resources, "full": full})
+    return {"results": results}
+
+@tool()
+async def mirror_status(ctx: Context) -> dict:
+    """
+    Show when each resource was last synced into the local mirror and how many records it holds.
+    """
+    return {"path": store_mirror.path, "resources": await asyncio.to_thread(store_mirror.state)}
+
+@tool()
+async def mirror_query(resource: str, ctx: Context, filters: dict = None, days: float = None, limit: int = 100) -> dict:
+    """
+    Query the local mirror without calling the API.
+    Args:
+        resource: orders, customers, subscriptions, license-keys, products or variants
+        filters: Exact matches on indexed fields, e.g. {"customer_id": "123", "status": "paid"}. Lists match any value
+        days: Only return records created in the last N days
+        limit: Maximum number of records to return
+    """
+    created_after = iso_cutoff(days) if days else None
+    records = await asyncio.to_thread(store_mirror.query, resource, filters, created_after, None, limit)
+    audit_log.log("mirror_query", {"resource": resource, "filters": filters, "days": days, "limit": limit})
+    return {"data": records, "meta": {"count": len(records)}}
+
+@tool()
+async def mirror_orders_for_customer(customer_id: str, ctx: Context, days: float = 30, limit: int = 100) -> dict:
+    """
+    Orders placed by a customer in the last N days, answered from the local mirror.
+    Args:
+        customer_id: The ID of the customer
+        days: Look-back window in days
+        limit: Maximum number of orders to return
+    """
+    records = await asyncio.to_thread(
+        store_mirror.query, "orders", {"customer_id": customer_id}, iso_cutoff(days), None, limit
+    )
+    audit_log.log("mirror_orders_for_customer", {"customer_id": customer_id, "days": days})
+    return {"data": records, "meta": {"count": len(records)}}
+
+@tool()
+async def mirror_active_subscriptions(ctx: Context, variant_id: str = None, product_id: str = None, store_id: str = None, limit: int = 100) -> dict:
+    """
+    Active subscriptions, optionally for one variant, product or store, answered from the local mirror.
+    Args:
+        variant_id: Only subscriptions on this variant
+        product_id: Only subscriptions on this product
+        store_id: Only subscriptions in this store
+        limit: Maximum number of subscriptions to return
+    """
+    filters = {"status": ["active", "on_trial"], "variant_id": variant_id, "product_id": product_id, "store_id": store_id}
+    records = await asyncio.to_thread(store_mirror.query, "subscriptions", filters, None, None, limit)
+    audit_log.log("mirror_active_subscriptions", {"variant_id": variant_id, "product_id": product_id, "store_id": store_id})
+    return {"data": records, "meta": {"count": len(records)}}
+
+@tool()
+async def order_revenue_summary(
+    ctx: Context,
+    store_id: str = None,
+    product_id: str = None,
+    variant_id: str = None,
+    status: str = None,
+    days: float = None,
+    since: str = None,
+    until: str = None,
+    group_by: str = None,
+    source: str = "cache",
+) -> dict:
+    """
+    Order count, revenue and refunds, summed in one streaming pass over the
+    orders instead of returning them. Amounts are in cents.
+    Args:
+        store_id: Only orders from this store
+        product_id: Only orders for this product
+        variant_id: Only orders for this variant
+        status: Only orders with this status, e.g. "paid" or "refunded"
+        days: Only orders created in the last N days
+        since: Only orders created at or after this ISO 8601 time (UTC)
+        until: Only orders created before this ISO 8601 time (UTC)
+        group_by: store_id, customer_id, product_id, variant_id, status, currency, day, month or year
+        source: "cache" (cached pages, else the API), "api" (always fresh) or "mirror" (local mirror only)
+    """
+    check_group_by("orders", group_by)
+    filters = {"store_id": store_id, "product_id": product_id, "variant_id": variant_id, "status": status}
+    scan = Scan(filters, since or (iso_cutoff(days) if days else None), until)
+    summary = await summarize_orders(aggregate_records("orders", source, scan), group_by)
+    audit_log.log("order_revenue_summary", {**filters, "days": days, "since": since, "until": until, "group_by": group_by, "source": source})
+    return {"data": summary, "meta": {**scan.meta(source), "group_by": group_by}}
+
+@tool()
+async def subscription_mrr(
+    ctx: Context,
+    store_id: str = None,
+    product_id: str = None,
+    variant_id: str = None,
+    days: float = None,
+    group_by: str = None,
+    source: str = "cache",
+) -> dict:
+    """
+    Monthly recurring revenue, subscription counts by status and churn,
+    summed in one streaming pass. MRR counts active and past-due
+    subscriptions at their variant's price normalised to one month, in cents.
+    Args:
+        store_id: Only subscriptions in this store
+        product_id: Only subscriptions on this product
+        variant_id: Only subscriptions on this variant
+        days: Count as churned only subscriptions cancelled or expired in the last N days
+        group_by: store_id, product_id, variant_id, status, day, month or year (of creation)
+        source: "cache" (cached pages, else the API), "api" (always fresh) or "mirror" (local mirror only)
+    """
+    check_group_by("subscriptions", group_by)
+    prices = await variant_prices(aggregate_records("variants", source, Scan({"product_id": product_id})))
+    filters = {"store_id": store_id, "product_id": product_id, "variant_id": variant_id}
+    scan = Scan(filters)
+    summary = await summarize_subscriptions(aggregate_records("subscriptions", source, scan), prices, group_by, iso_cutoff(days) if days else None)
+    audit_log.log("subscription_mrr", {**filters, "days": days, "group_by": group_by, "source": source})
+    return {"data": summary, "meta": {**scan.meta(source), "group_by": group_by, "variants_priced": len(prices)}}
+
+@tool()
+async def license_key_usage_stats(
+    ctx: Context,
+    store_id: str = None,
+    product_id: str = None,
+    status: str = None,
+    days: float = None,
+    group_by: str = None,
+    source: str = "cache",
+) -> dict:
+    """
+    License key counts by status and activation usage against limits,
+    summed in one streaming pass over the keys.
+    Args:
+        store_id: Only keys from this store
+        product_id: Only keys for this product
+        status: Only keys with this status, e.g. "active" or "disabled"
+        days: Only keys created in the last N days
+        group_by: store_id, product_id, status, day, month or year
+        source: "cache" (cached pages, else the API), "api" (always fresh) or "mirror" (local mirror only)
+    """
+    check_group_by("license-keys", group_by)
+    filters = {"store_id": store_id, "product_id": product_id, "status": status}
+    scan = Scan(filters, iso_cutoff(days) if days else None)
+    summary = await summarize_license_keys(aggregate_records("license-keys", source, scan), group_by)
+    audit_log.log("license_key_usage_stats", {**filters, "days": days, "group_by": group_by, "source": source})
+    return {"data": summary, "meta": {**scan.meta(source), "group_by": group_by}}
+
+# Where export_resource writes its files
+EXPORT_DIR = os.getenv("LEMONSQUEEZY_EXPORT_DIR", DEFAULT_EXPORT_DIR)
+
+@tool()
+async def export_resource(
+    resource: str,
+    ctx: Context,
+    format: str = "ndjson",
+    file_name: str = None,
+    filters: dict = None,
+    resume: bool = True,
+) -> dict:
+    """
+    Stream every record of a resource into a local file (NDJSON, CSV, or
+    Parquet when pyarrow is installed) and return only the path and row
+    counts. An interrupted export to the same file resumes where it stopped.
+    Args:
+        resource: orders, customers, subscriptions, license-keys, products or variants
+        format: "ndjson", "csv" or "parquet"
+        file_name: File name inside LEMONSQUEEZY_EXPORT_DIR. Defaults to <resource>.<format>
+        filters: API filters, e.g. {"store_id": "1"} or {"status": "active"}
+        resume: Continue an interrupted export of the same query instead of starting over
+    """
+    if resource not in MIRRORED:
+        raise ValueError(f"Unknown resource '{resource}'. Expected one of: {', '.join(MIRRORED)}")
+    unsupported = sorted(
+        name for name, value in (filters or {}).items()
+        if name not in API_FILTERS.get(resource, ()) or isinstance(value, (list, tuple, set))
+    )
+    if unsupported:
+        raise ValueError(f"The {resource} endpoint cannot filter by {', '.join(unsupported)} (one value per filter)")
+    path = export_path(EXPORT_DIR, file_name, resource, format)
+    fetch = partial(lemonsqueezy_request, priority=PRIORITY_BULK, use_cache=False, store=False)
+    export = ResourceExport(fetch, MIRRORED[resource][0], path, format, api_params(resource, filters or {}))
+    result = await export.run(resume=resume, progress=ctx.report_progress)
+    audit_log.log("export_resource", {"resource": resource, "format": format, "filters": filters, **result})
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Lemon Squeezy MCP server")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "sse"],
+        default=os.getenv("LEMONSQUEEZY_TRANSPORT", "stdio"),
+        help="stdio for a single client, sse to serve many clients from one process",
+    )
+    parser.add_argument("--host", help="Address to listen on with --transport sse (default 0.0.0.0)")
+    parser.add_argument("--port", type=int, help="Port to listen on with --transport sse (default 8000)")
+    args = parser.parse_args()
+    if args.transport == "sse":
+        # One connection pool, cache and rate limiter for every client, kept open between sessions
+        run_sse(mcp, call_gate, partial(server_lifespan, mcp), host=args.host, port=args.port)
+    else:
+        mcp.run()
 
 if __name__ == "__main__":
-    mcp.run()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,73 @@
+# singleflight.py
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+from .client import env_bool
+
+
+class Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Share one in-flight call between concurrent callers asking for the same
+    key. Every caller gets the same result or the same exception. A caller
+    that is cancelled stops waiting without disturbing the others; the call
+    itself is cancelled only when its last waiter goes away.
+    """
+
+    def __init__(self, enabled: bool = None):
+        self.enabled = enabled if enabled is not None else env_bool("LEMONSQUEEZY_SINGLE_FLIGHT", True)
+        self._flights: dict[Hashable, Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.abandoned = 0
+
+    def _done(self, key: Hashable, flight: Flight, task: asyncio.Task) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Retrieving the exception also keeps asyncio from logging it when nobody waited
+        if not task.cancelled() and task.exception() is not None:
+            self.failed += 1
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await fn()
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = Flight(asyncio.ensure_future(fn()))
+            flight.task.add_done_callback(lambda task: self._done(key, flight, task))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Nobody may join a flight that is being cancelled
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+                self.abandoned += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def stats(self) -> dict:
+        requested = self.calls + self.coalesced
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._flights),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / requested, 4) if requested else 0.0,
+            "failed": self.failed,
+            "abandoned": self.abandoned,
+        }
@@ -1,5 +1,57 @@
 from mcp.types import Tool
 
+# Shared by every list_* tool
+PAGINATION_PROPERTIES = {
+    "all_pages": {
+        "type": "boolean",
+        "description": "Follow pagination and return every page instead of only the first"
+    },
+    "max_items": {
+        "type": "integer",
+        "description": "Maximum number of records to return when all_pages is set"
+    }
+}
+
+# Shared by the list_* tools of resources that belong to a store
+STORE_FANOUT_PROPERTIES = {
+    "store_ids": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Query these stores concurrently and merge the results, newest first"
+    },
+    "all_stores": {
+        "type": "boolean",
+        "description": "Query every store the API key can access, as with store_ids"
+    }
+}
+
+# Shared by the get_*/list_* tools
+PROJECTION_PROPERTIES = {
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Attributes to return, e.g. [\"status\", \"total\"]; \"type.field\" selects fields of included resources"
+    },
+    "include": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Related resources to include, e.g. [\"customer\"]"
+    },
+    "compact": {
+        "type": "boolean",
+        "description": "Flatten records to {id, type, **attributes}, dropping links and relationship stubs"
+    }
+}
+
+# Shared by the aggregation tools
+AGGREGATE_SOURCE_PROPERTIES = {
+    "source": {
+        "type": "string",
+        "enum": ["cache", "api", "mirror"],
+        "description": "Read cached pages (else the API), always the API, or only the local mirror"
+    }
+}
+
 def get_lemonsqueezy_tools() -> list[Tool]:
     return [
         Tool(
@@ -10,7 +62,7 @@ def get_lemonsqueezy_tools() -> list[Tool]:
         Tool(
             name="list_stores",
             description="List all Lemon Squeezy stores",
-            inputSchema={"type": "object", "properties": {}}
+            inputSchema={"type": "object", "properties": {**PAGINATION_PROPERTIES, **PROJECTION_PROPERTIES}}
         ),
         Tool(
             name="get_store",
@@ -18,7 +70,8 @@ def get_lemonsqueezy_tools() -> list[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "store_id": {"type": "string", "description": "The ID of the store"}
+                    "store_id": {"type": "string", "description": "The ID of the store"},
+                    **PROJECTION_PROPERTIES
                 },
                 "required": ["store_id"]
             }
@@ -26,7 +79,7 @@ def get_lemonsqueezy_tools() -> list[Tool]:
         Tool(
             name="list_products",
             description="List all products",
-            inputSchema={"type": "object", "properties": {}}
+            inputSchema={"type": "object", "properties": {**PAGINATION_PROPERTIES, **STORE_FANOUT_PROPERTIES, **PROJECTION_PROPERTIES}}
         ),
         Tool(
             name="get_product_variants",
@@ -37,7 +90,8 @@ def get_lemonsqueezy_tools() -> list[Tool]:
                     "product_id": {
                         "type": "string",
                         "description": "The ID of the product to fetch variants for"
-                    }
+                    },
+                    **PROJECTION_PROPERTIES
                 },
                 "required": ["product_id"]
             }
@@ -48,7 +102,8 @@ def get_lemonsqueezy_tools() -> list[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "product_id": {"type": "string", "description": "The ID of the product"}
+                    "product_id": {"type": "string", "description": "The ID of the product"},
+                    **PROJECTION_PROPERTIES
                 },
                 "required": ["product_id"]
             }
@@ -56,7 +111,7 @@ def get_lemonsqueezy_tools() -> list[Tool]:
         Tool(
             name="list_orders",
             description="List all orders",
-            inputSchema={"type": "object", "properties": {}}
+            inputSchema={"type": "object", "properties": {**PAGINATION_PROPERTIES, **STORE_FANOUT_PROPERTIES, **PROJECTION_PROPERTIES}}
         ),
         Tool(
             name="get_order",
@@ -64,15 +119,33 @@ def get_lemonsqueezy_tools() -> list[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "order_id": {"type": "string", "description": "The ID of the order"}
+                    "order_id": {"type": "string", "description": "The ID of the order"},
+                    **PROJECTION_PROPERTIES
                 },
                 "required": ["order_id"]
             }
         ),
+        Tool(
+            name="get_orders",
+            description="Get many orders by ID in one call, with per-ID errors",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "order_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "The IDs of the orders"
+                    },
+                    "fields": PROJECTION_PROPERTIES["fields"],
+                    "compact": PROJECTION_PROPERTIES["compact"]
+                },
+                "required": ["order_ids"]
+            }
+        ),
         Tool(
             name="list_customers",
             description="List all customers",
-            inputSchema={"type": "object", "properties": {}}
+            inputSchema={"type": "object", "properties": {**PAGINATION_PROPERTIES, **STORE_FANOUT_PROPERTIES, **PROJECTION_PROPERTIES}}
         ),
         Tool(
             name="get_customer",
@@ -80,15 +153,33 @@ def get_lemonsqueezy_tools() -> list[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "customer_id": {"type": "string", "description": "The ID of the customer"}
+                    "customer_id": {"type": "string", "description": "The ID of the customer"},
+                    **PROJECTION_PROPERTIES
                 },
                 "required": ["customer_id"]
             }
         ),
+        Tool(
+            name="get_customers",
+            description="Get many customers by ID in one call, with per-ID errors",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "customer_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "The IDs of the customers"
+                    },
+                    "fields": PROJECTION_PROPERTIES["fields"],
+                    "compact": PROJECTION_PROPERTIES["compact"]
+                },
+                "required": ["customer_ids"]
+            }
+        ),
         Tool(
             name="list_subscriptions",
             description="List all subscriptions",
-            inputSchema={"type": "object", "properties": {}}
+            inputSchema={"type": "object", "properties": {**PAGINATION_PROPERTIES, **STORE_FANOUT_PROPERTIES, **PROJECTION_PROPERTIES}}
         ),
         Tool(
             name="get_subscription",
@@ -96,15 +187,33 @@ def get_lemonsqueezy_tools() -> list[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "subscription_id": {"type": "string", "description": "The ID of the subscription"}
+                    "subscription_id": {"type": "string", "description": "The ID of the subscription"},
+                    **PROJECTION_PROPERTIES
                 },
                 "required": ["subscription_id"]
             }
         ),
+        Tool(
+            name="get_subscriptions",
+            description="Get many subscriptions by ID in one call, with per-ID errors",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "subscription_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "The IDs of the subscriptions"
+                    },
+                    "fields": PROJECTION_PROPERTIES["fields"],
+                    "compact": PROJECTION_PROPERTIES["compact"]
+                },
+                "required": ["subscription_ids"]
+            }
+        ),
         Tool(
             name="list_license_keys",
             description="List all license keys",
-            inputSchema={"type": "object", "properties": {}}
+            inputSchema={"type": "object", "properties": {**PAGINATION_PROPERTIES, **STORE_FANOUT_PROPERTIES, **PROJECTION_PROPERTIES}}
         ),
         Tool(
             name="get_license_key",
@@ -112,11 +221,91 @@ def get_lemonsqueezy_tools() -> list[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "license_key_id": {"type": "string", "description": "The ID of the license key"}
+                    "license_key_id": {"type": "string", "description": "The ID of the license key"},
+                    **PROJECTION_PROPERTIES
                 },
                 "required": ["license_key_id"]
             }
         ),
+        Tool(
+            name="get_license_keys",
+            description="Get many license keys by ID in one call, with per-ID errors",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "license_key_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "The IDs of the license keys"
+                    },
+                    "fields": PROJECTION_PROPERTIES["fields"],
+                    "compact": PROJECTION_PROPERTIES["compact"]
+                },
+                "required": ["license_key_ids"]
+            }
+        ),
+        Tool(
+            name="validate_license_key",
+            description="Validate a license key through the License API, answered from a short-lived cache when recently checked",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "license_key": {"type": "string", "description": "The license key"},
+                    "instance_id": {"type": "string", "description": "Also check that this activation instance belongs to the key"}
+                },
+                "required": ["license_key"]
+            }
+        ),
+        Tool(
+            name="validate_license_keys",
+            description="Validate many license keys in one call, in input order, reusing cached answers",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "licenses": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "license_key": {"type": "string", "description": "The license key"},
+                                "instance_id": {"type": "string", "description": "Optional activation instance ID"}
+                            },
+                            "required": ["license_key"]
+                        },
+                        "description": "Keys to validate"
+                    },
+                    "concurrency": {
+                        "type": "integer",
+                        "description": "License API requests at once"
+                    }
+                },
+                "required": ["licenses"]
+            }
+        ),
+        Tool(
+            name="activate_license_key",
+            description="Activate a license key for a new instance (e.g. a device)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "license_key": {"type": "string", "description": "The license key"},
+                    "instance_name": {"type": "string", "description": "A label for the new instance"}
+                },
+                "required": ["license_key", "instance_name"]
+            }
+        ),
+        Tool(
+            name="deactivate_license_key",
+            description="Deactivate one activation instance of a license key",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "license_key": {"type": "string", "description": "The license key"},
+                    "instance_id": {"type": "string", "description": "The instance ID returned when the key was activated"}
+                },
+                "required": ["license_key", "instance_id"]
+            }
+        ),
         Tool(
             name="create_checkout",
             description="Create a Lemon Squeezy checkout session with full custom configuration",
@@ -229,6 +418,29 @@ def get_lemonsqueezy_tools() -> list[Tool]:
                 "required": ["data"]
             }
         ),
+        Tool(
+            name="create_checkouts_bulk",
+            description="Create many personalized checkouts from one template concurrently, with idempotency keys so retries never create duplicates",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "template": {
+                        "type": "object",
+                        "description": "Checkout data shared by every checkout, shaped like the create_checkout data argument; per-customer fields may be left to the overrides"
+                    },
+                    "overrides": {
+                        "type": "array",
+                        "items": {"type": "object"},
+                        "description": "One object per checkout, deep-merged into the template, e.g. {\"attributes\": {\"checkout_data\": {\"email\": \"...\", \"name\": \"...\"}}}; may set idempotency_key"
+                    },
+                    "concurrency": {
+                        "type": "integer",
+                        "description": "Checkouts created at once"
+                    }
+                },
+                "required": ["template", "overrides"]
+            }
+        ),
         Tool(
             name="create_webhook",
             description="Register a webhook URL for a specific store and events",
@@ -302,8 +514,179 @@ def get_lemonsqueezy_tools() -> list[Tool]:
                     "store_id": {
                         "type": "string",
                         "description": "If provided, only webhooks for this store will be returned"
+                    },
+                    **PAGINATION_PROPERTIES,
+                    **PROJECTION_PROPERTIES
+                }
+            }
+        ),
+        Tool(
+            name="query_audit_log",
+            description="Page through logged operations, filtered by operation and time range",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "operation": {"type": "string", "description": "Only entries for this operation (tool name)"},
+                    "since": {"type": "string", "format": "date-time", "description": "Only entries at or after this time"},
+                    "until": {"type": "string", "format": "date-time", "description": "Only entries before this time"},
+                    "offset": {"type": "integer", "description": "Number of newer matching entries to skip"},
+                    "limit": {"type": "integer", "description": "Maximum number of entries to return"},
+                    "include_history": {
+                        "type": "boolean",
+                        "description": "Read the on-disk log (including rotated files) instead of the in-memory ring"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="mirror_sync",
+            description="Sync store data into the local SQLite mirror (full on first run, incremental afterwards)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "resources": {
+                        "type": "array",
+                        "items": {
+                            "type": "string",
+                            "enum": ["orders", "customers", "subscriptions", "license-keys", "products", "variants"]
+                        },
+                        "description": "Resources to sync. Defaults to all"
+                    },
+                    "full": {
+                        "type": "boolean",
+                        "description": "Re-read every page instead of stopping at the first unchanged page"
                     }
                 }
             }
+        ),
+        Tool(
+            name="mirror_status",
+            description="Show when each resource was last synced into the local mirror",
+            inputSchema={"type": "object", "properties": {}}
+        ),
+        Tool(
+            name="mirror_query",
+            description="Query the local mirror without calling the API",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "resource": {
+                        "type": "string",
+                        "enum": ["orders", "customers", "subscriptions", "license-keys", "products", "variants"]
+                    },
+                    "filters": {
+                        "type": "object",
+                        "description": "Exact matches on indexed fields, e.g. {\"customer_id\": \"123\"}. Lists match any value"
+                    },
+                    "days": {"type": "number", "description": "Only return records created in the last N days"},
+                    "limit": {"type": "integer", "description": "Maximum number of records to return"}
+                },
+                "required": ["resource"]
+            }
+        ),
+        Tool(
+            name="mirror_orders_for_customer",
+            description="Orders placed by a customer in the last N days, answered from the local mirror",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "customer_id": {"type": "string", "description": "The ID of the customer"},
+                    "days": {"type": "number", "description": "Look-back window in days"},
+                    "limit": {"type": "integer", "description": "Maximum number of orders to return"}
+                },
+                "required": ["customer_id"]
+            }
+        ),
+        Tool(
+            name="mirror_active_subscriptions",
+            description="Active subscriptions, optionally for one variant, product or store, answered from the local mirror",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "variant_id": {"type": "string", "description": "Only subscriptions on this variant"},
+                    "product_id": {"type": "string", "description": "Only subscriptions on this product"},
+                    "store_id": {"type": "string", "description": "Only subscriptions in this store"},
+                    "limit": {"type": "integer", "description": "Maximum number of subscriptions to return"}
+                }
+            }
+        ),
+        Tool(
+            name="order_revenue_summary",
+            description="Order count, revenue and refunds summed in one streaming pass, optionally grouped",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "store_id": {"type": "string", "description": "Only orders from this store"},
+                    "product_id": {"type": "string", "description": "Only orders for this product"},
+                    "variant_id": {"type": "string", "description": "Only orders for this variant"},
+                    "status": {"type": "string", "description": "Only orders with this status, e.g. \"paid\" or \"refunded\""},
+                    "days": {"type": "number", "description": "Only orders created in the last N days"},
+                    "since": {"type": "string", "format": "date-time", "description": "Only orders created at or after this time (UTC)"},
+                    "until": {"type": "string", "format": "date-time", "description": "Only orders created before this time (UTC)"},
+                    "group_by": {
+                        "type": "string",
+                        "enum": ["store_id", "customer_id", "product_id", "variant_id", "status", "currency", "day", "month", "year"]
+                    },
+                    **AGGREGATE_SOURCE_PROPERTIES
+                }
+            }
+        ),
+        Tool(
+            name="subscription_mrr",
+            description="Monthly recurring revenue, subscription counts by status and churn, optionally grouped",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "store_id": {"type": "string", "description": "Only subscriptions in this store"},
+                    "product_id": {"type": "string", "description": "Only subscriptions on this product"},
+                    "variant_id": {"type": "string", "description": "Only subscriptions on this variant"},
+                    "days": {"type": "number", "description": "Count as churned only subscriptions cancelled or expired in the last N days"},
+                    "group_by": {
+                        "type": "string",
+                        "enum": ["store_id", "product_id", "variant_id", "status", "day", "month", "year"]
+                    },
+                    **AGGREGATE_SOURCE_PROPERTIES
+                }
+            }
+        ),
+        Tool(
+            name="license_key_usage_stats",
+            description="License key counts by status and activation usage against limits, optionally grouped",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "store_id": {"type": "string", "description": "Only keys from this store"},
+                    "product_id": {"type": "string", "description": "Only keys for this product"},
+                    "status": {"type": "string", "description": "Only keys with this status, e.g. \"active\" or \"disabled\""},
+                    "days": {"type": "number", "description": "Only keys created in the last N days"},
+                    "group_by": {
+                        "type": "string",
+                        "enum": ["store_id", "product_id", "status", "day", "month", "year"]
+                    },
+                    **AGGREGATE_SOURCE_PROPERTIES
+                }
+            }
+        ),
+        Tool(
+            name="export_resource",
+            description="Stream every record of a resource into a local NDJSON, CSV or Parquet file, returning only the path and row counts; interrupted exports resume",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "resource": {
+                        "type": "string",
+                        "enum": ["orders", "customers", "subscriptions", "license-keys", "products", "variants"]
+                    },
+                    "format": {
+                        "type": "string",
+                        "enum": ["ndjson", "csv", "parquet"],
+                        "description": "Parquet needs pyarrow"
+                    },
+                    "file_name": {"type": "string", "description": "File name inside LEMONSQUEEZY_EXPORT_DIR. Defaults to <resource>.<format>"},
+                    "filters": {"type": "object", "description": "API filters, e.g. {\"store_id\": \"1\"} or {\"status\": \"active\"}"},
+                    "resume": {"type": "boolean", "description": "Continue an interrupted export of the same query instead of starting over"}
+                },
+                "required": ["resource"]
+            }
         )
 ]
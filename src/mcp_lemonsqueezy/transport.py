@@ -0,0 +1,187 @@
+# transport.py
+
+import asyncio
+import logging
+import functools
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from sse_starlette.sse import AppStatus
+from .client import env_float, env_int
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+# Seconds between the last tool call finishing and SSE streams being closed
+FLUSH_DELAY = 0.5
+
+
+class ServerDraining(RuntimeError):
+    pass
+
+
+class CallGate:
+    """
+    Bounds how many tool calls run at once across every client of the
+    process (further calls wait for a free worker slot) and tracks calls
+    in flight so shutdown can wait for them.
+    """
+
+    def __init__(self, workers: int = None):
+        self.workers = workers or env_int("LEMONSQUEEZY_WORKERS", 32)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.in_flight = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.draining = False
+
+    def wrap(self, fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs) -> Any:
+            if self.draining:
+                self.rejected += 1
+                raise ServerDraining("The server is shutting down; retry on another instance")
+            self.in_flight += 1
+            self._idle.clear()
+            try:
+                async with self._slots:
+                    self.running += 1
+                    try:
+                        return await fn(*args, **kwargs)
+                    finally:
+                        self.running -= 1
+            finally:
+                self.in_flight -= 1
+                self.completed += 1
+                if self.in_flight == 0:
+                    self._idle.set()
+
+        return wrapper
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Stop accepting calls and wait for those in flight; False on timeout.
+        """
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "running": self.running,
+            "queued": self.in_flight - self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "draining": self.draining,
+        }
+
+
+class SessionTracker:
+    """
+    ASGI wrapper around the SSE endpoint: counts connected clients and
+    turns new connections away with 503 once the server is draining.
+    """
+
+    def __init__(self, app: Callable, gate: CallGate):
+        self.app = app
+        self.gate = gate
+        self.active = 0
+        self.total = 0
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self.gate.draining:
+            await JSONResponse({"error": "draining"}, status_code=503)(scope, receive, send)
+            return
+        self.active += 1
+        self.total += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.active -= 1
+
+
+class DrainingServer(uvicorn.Server):
+    """
+    On SIGINT/SIGTERM, first let tool calls in flight finish (up to
+    drain_timeout) while refusing new sessions and calls, then close the
+    remaining SSE streams after a short grace period.
+    """
+
+    def __init__(self, config: uvicorn.Config, gate: CallGate, drain_timeout: float):
+        super().__init__(config)
+        self.gate = gate
+        self.drain_timeout = drain_timeout
+
+    def handle_exit(self, sig: int, frame: Any) -> None:
+        # sse-starlette patches uvicorn to end every SSE stream as soon as a
+        # signal arrives, which would drop responses still being computed;
+        # only flag the exit here and end the streams after the drain.
+        (AppStatus.original_handler or uvicorn.Server.handle_exit)(self, sig, frame)
+
+    async def shutdown(self, sockets: list | None = None) -> None:
+        logger.info("Draining %d tool call(s) in flight", self.gate.in_flight)
+        if not await self.gate.drain(self.drain_timeout):
+            logger.warning("Drain timeout exceeded with %d tool call(s) in flight", self.gate.in_flight)
+        # Let the last results get written to their SSE streams before ending them
+        await asyncio.sleep(FLUSH_DELAY)
+        AppStatus.should_exit = True
+        if AppStatus.should_exit_event is not None:
+            AppStatus.should_exit_event.set()
+        await super().shutdown(sockets)
+
+
+def create_sse_app(mcp: FastMCP, gate: CallGate, lifespan: Callable[[], Any]) -> Starlette:
+    """
+    The FastMCP SSE app plus /healthz, with the shared components opened
+    once for the whole process rather than per client session.
+    """
+    sse = mcp.sse_app()
+    sessions = SessionTracker(sse.router.routes[0].app, gate)
+    routes = [Route(mcp.settings.sse_path, endpoint=sessions), *sse.router.routes[1:]]
+
+    async def health(request) -> JSONResponse:
+        status = 503 if gate.draining else 200
+        return JSONResponse({
+            "status": "draining" if gate.draining else "ok",
+            "sessions": {"active": sessions.active, "total": sessions.total},
+            "calls": gate.stats(),
+        }, status_code=status)
+
+    @asynccontextmanager
+    async def app_lifespan(app: Starlette) -> AsyncIterator[None]:
+        async with lifespan():
+            yield
+
+    return Starlette(routes=[Route("/healthz", endpoint=health), *routes], lifespan=app_lifespan)
+
+
+def run_sse(mcp: FastMCP, gate: CallGate, lifespan: Callable[[], Any], host: str = None, port: int = None, drain_timeout: float = None) -> None:
+    """
+    Serve every MCP client from this process over SSE.
+    """
+    app = create_sse_app(mcp, gate, lifespan)
+    drain_timeout = drain_timeout if drain_timeout is not None else env_float("LEMONSQUEEZY_DRAIN_TIMEOUT", 30.0)
+    config = uvicorn.Config(
+        app,
+        host=host or mcp.settings.host,
+        port=port or mcp.settings.port,
+        log_level=mcp.settings.log_level.lower(),
+        # SSE streams never finish on their own; close them shortly after the drain
+        timeout_graceful_shutdown=env_float("LEMONSQUEEZY_SHUTDOWN_GRACE", 2.0),
+    )
+    logger.info("Serving MCP over SSE on http://%s:%s%s", config.host, config.port, mcp.settings.sse_path)
+    asyncio.run(DrainingServer(config, gate, drain_timeout).serve())
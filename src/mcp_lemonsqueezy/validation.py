@@ -0,0 +1,172 @@
+# validation.py
+
+import json
+import functools
+from datetime import datetime
+from typing import Any, Callable
+from .tools import get_lemonsqueezy_tools
+
+# JSON Schema type -> Python types
+TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+}
+
+# check(value, prefix, errors): appends {"path", "message"} dicts for each problem
+Check = Callable[[Any, str, list], None]
+Validator = Callable[..., list[dict]]
+
+
+class SchemaError(ValueError):
+    """
+    Input that does not match a tool schema; `errors` lists each problem
+    as {"path", "message"}. The message is the same list as JSON.
+    """
+
+    def __init__(self, errors: list[dict]):
+        self.errors = errors
+        super().__init__(json.dumps({"error": "invalid_input", "errors": errors}))
+
+
+@functools.cache
+def tool_schema(name: str) -> dict:
+    """
+    Input schema of a tool as defined in tools.py.
+    """
+    for tool in get_lemonsqueezy_tools():
+        if tool.name == name:
+            return tool.inputSchema
+    raise KeyError(name)
+
+
+def _is_date_time(value: str) -> bool:
+    try:
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return True
+    except ValueError:
+        return False
+
+
+def _compile(schema: dict, rel: str, types: bool, required: bool) -> Check:
+    """
+    One check for `schema` and everything below it. Paths are fixed at
+    compile time relative to the nearest array; only array items add a
+    runtime prefix, so valid input costs no string building.
+    """
+    checks: list[Check] = []
+
+    def path(prefix: str) -> str:
+        return (prefix + rel).lstrip(".")
+
+    expected = schema.get("type")
+    python_type = TYPES.get(expected)
+    # bool is an int subclass, but JSON booleans are not numbers
+    reject_bool = expected in ("integer", "number")
+
+    if types and "enum" in schema:
+        allowed = schema["enum"]
+
+        def check_enum(value, prefix, errors):
+            if value not in allowed:
+                errors.append({"path": path(prefix), "message": f"must be one of {allowed}"})
+        checks.append(check_enum)
+
+    if types and schema.get("format") == "date-time":
+        def check_date_time(value, prefix, errors):
+            if isinstance(value, str) and not _is_date_time(value):
+                errors.append({"path": path(prefix), "message": "expected an ISO 8601 date-time"})
+        checks.append(check_date_time)
+
+    properties = [(name, _compile(sub, f"{rel}.{name}", types, required)) for name, sub in schema.get("properties", {}).items()]
+    wanted = schema.get("required", ()) if required else ()
+    if properties or wanted:
+        missing_paths = {name: f"{rel}.{name}" for name in wanted}
+
+        def check_object(value, prefix, errors):
+            if not isinstance(value, dict):
+                return
+            for name, missing_path in missing_paths.items():
+                if name not in value:
+                    errors.append({"path": (prefix + missing_path).lstrip("."), "message": "is required"})
+            for name, check in properties:
+                if name in value:
+                    check(value[name], prefix, errors)
+        checks.append(check_object)
+
+    if "items" in schema:
+        item_check = _compile(schema["items"], "", types, required)
+
+        def check_items(value, prefix, errors):
+            if isinstance(value, list):
+                base = prefix + rel
+                for i, item in enumerate(value):
+                    item_check(item, f"{base}[{i}]", errors)
+        checks.append(check_items)
+
+    def check(value, prefix, errors):
+        if python_type is not None and (not isinstance(value, python_type) or (reject_bool and isinstance(value, bool))):
+            if types:
+                errors.append({"path": path(prefix), "message": f"expected {expected}, got {type(value).__name__}"})
+            return
+        for c in checks:
+            c(value, prefix, errors)
+
+    return check
+
+
+def compile_schema(schema: dict, types: bool = True, required: bool = True) -> Validator:
+    """
+    Compile the subset of JSON Schema used in tools.py (type, enum, format
+    date-time, properties, required, items) into a validator returning the
+    list of errors for a value. With types=False only missing required
+    properties are reported; with required=False only the values present
+    are checked, as for a partial document.
+    """
+    check = _compile(schema, "", types, required)
+
+    def validate(value, path: str = "") -> list[dict]:
+        errors: list[dict] = []
+        check(value, "." + path if path else "", errors)
+        return errors
+
+    return validate
+
+
+class InputValidator:
+    """
+    Validates a tool's arguments against its schema in tools.py before the
+    tool runs, so malformed write requests fail locally instead of costing
+    an API round trip and rate-limit budget. Schemas are compiled when the
+    tool is registered.
+    """
+
+    def __init__(self):
+        self.validators: dict[str, Validator] = {}
+        self.checked = 0
+        self.rejected = 0
+
+    def check(self, name: str, arguments: dict) -> None:
+        # Arguments left at their default arrive as None; the schema only describes values sent
+        errors = self.validators[name]({k: v for k, v in arguments.items() if v is not None})
+        self.checked += 1
+        if errors:
+            self.rejected += 1
+            raise SchemaError(errors)
+
+    def wrap(self, fn: Callable) -> Callable:
+        name = fn.__name__
+        self.validators[name] = compile_schema(tool_schema(name))
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs) -> Any:
+            self.check(name, kwargs)
+            return await fn(*args, **kwargs)
+
+        return wrapper
+
+    def stats(self) -> dict:
+        return {"tools": sorted(self.validators), "checked": self.checked, "rejected": self.rejected}
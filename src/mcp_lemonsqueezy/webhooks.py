@@ -0,0 +1,174 @@
+# webhooks.py
+
+import os
+import hmac
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable
+from .client import env_int
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+logger = logging.getLogger("lemonsqueezy-fastmcp-server")
+
+EventHandler = Callable[[dict], Awaitable[None]]
+
+
+def sign(secret: str, body: bytes) -> str:
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret: str, body: bytes, signature: str | None) -> bool:
+    """
+    Check the X-Signature header: a hex HMAC-SHA256 of the raw body keyed
+    with the webhook's signing secret.
+    """
+    if not signature:
+        return False
+    return hmac.compare_digest(sign(secret, body), signature)
+
+
+def event_name(event) -> str | None:
+    meta = event.get("meta") if isinstance(event, dict) else None
+    return meta.get("event_name") if isinstance(meta, dict) else None
+
+
+class WebhookReceiver:
+    """
+    Small aiohttp server that accepts Lemon Squeezy webhooks, verifies their
+    signature and hands them to worker tasks through a bounded queue, so a
+    burst of events never blocks the HTTP response.
+    """
+
+    def __init__(
+        self,
+        handler: EventHandler,
+        secret: str = None,
+        host: str = None,
+        port: int = None,
+        path: str = None,
+        queue_size: int = None,
+        workers: int = None,
+    ):
+        self.handler = handler
+        self.secret = secret or os.getenv("LEMONSQUEEZY_WEBHOOK_SECRET", "")
+        self.host = host or os.getenv("LEMONSQUEEZY_WEBHOOK_HOST", "0.0.0.0")
+        self.port = port if port is not None else env_int("LEMONSQUEEZY_WEBHOOK_PORT", 0)
+        self.path = path or os.getenv("LEMONSQUEEZY_WEBHOOK_PATH", "/webhooks/lemonsqueezy")
+        self.queue_size = queue_size or env_int("LEMONSQUEEZY_WEBHOOK_QUEUE_SIZE", 10000)
+        self.worker_count = workers or env_int("LEMONSQUEEZY_WEBHOOK_WORKERS", 4)
+        self.queue: asyncio.Queue | None = None
+        self._runner: "web.AppRunner | None" = None
+        self._workers: list[asyncio.Task] = []
+        self._users = 0
+        self.bound_port: int | None = None
+        # Counters
+        self.received = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.processed = 0
+        self.failed = 0
+        self.last_event_at: float | None = None
+
+    async def _receive(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        body = await request.read()
+        if not verify_signature(self.secret, body, request.headers.get("X-Signature")):
+            self.rejected += 1
+            return web.json_response({"error": "invalid signature"}, status=401)
+        try:
+            event = json.loads(body)
+        except ValueError:
+            self.rejected += 1
+            return web.json_response({"error": "invalid JSON"}, status=400)
+        if not isinstance(event, dict):
+            self.rejected += 1
+            return web.json_response({"error": "expected a JSON object"}, status=400)
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Lemon Squeezy retries failed deliveries, so shed load instead of buffering without bound
+            self.dropped += 1
+            return web.json_response({"error": "queue full"}, status=503)
+        self.received += 1
+        self.last_event_at = time.time()
+        return web.json_response({"received": True})
+
+    async def _work(self) -> None:
+        while True:
+            event = await self.queue.get()
+            try:
+                await self.handler(event)
+                self.processed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("Failed to process webhook event %s", event_name(event))
+            finally:
+                self.queue.task_done()
+
+    async def start(self) -> None:
+        # aiohttp is only imported when the receiver is enabled
+        from aiohttp import web
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        app = web.Application()
+        app.router.add_post(self.path, self._receive)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.bound_port = site._server.sockets[0].getsockname()[1]
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.worker_count)]
+        logger.info("Webhook receiver listening on %s:%s%s", self.host, self.bound_port, self.path)
+
+    async def stop(self, drain_timeout: float = 5.0) -> None:
+        if self._runner is None:
+            return
+        await self._runner.cleanup()
+        self._runner = None
+        try:
+            await asyncio.wait_for(self.queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Dropping %d unprocessed webhook events on shutdown", self.queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    @asynccontextmanager
+    async def lifespan(self) -> AsyncIterator[None]:
+        """
+        Run the receiver while at least one server session is active. Does
+        nothing unless both a signing secret and a port are configured.
+        """
+        if not (self.secret and self.port):
+            yield
+            return
+        self._users += 1
+        try:
+            if self._users == 1:
+                await self.start()
+            yield
+        finally:
+            self._users -= 1
+            if self._users == 0:
+                await self.stop()
+
+    def stats(self) -> dict:
+        return {
+            "listening": self._runner is not None,
+            "port": self.bound_port,
+            "path": self.path,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "queue_size": self.queue_size,
+            "received": self.received,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "processed": self.processed,
+            "failed": self.failed,
+            "last_event_at": self.last_event_at,
+        }
@@ -0,0 +1,50 @@
+import os
+import tempfile
+
+# The server reads its configuration when imported: keep its files out of
+# the user's home and its requests away from the real API.
+_tmp = tempfile.mkdtemp(prefix="mcp-lemonsqueezy-tests-")
+os.environ.update({
+    "LEMONSQUEEZY_API_KEY": "test",
+    "LEMONSQUEEZY_API_BASE": "https://api.lemonsqueezy.test/v1",
+    "LEMONSQUEEZY_AUDIT_LOG_PATH": "",
+    "LEMONSQUEEZY_MIRROR_PATH": os.path.join(_tmp, "mirror.sqlite3"),
+    "LEMONSQUEEZY_DISK_CACHE_PATH": "",
+    "LEMONSQUEEZY_EXPORT_DIR": os.path.join(_tmp, "exports"),
+})
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from mcp_lemonsqueezy import server  # noqa: E402
+from mcp_lemonsqueezy.cache import ResponseCache  # noqa: E402
+from mcp_lemonsqueezy.diskcache import DiskCache  # noqa: E402
+from mcp_lemonsqueezy.metrics import Metrics  # noqa: E402
+from mcp_lemonsqueezy.ratelimit import RequestScheduler  # noqa: E402
+from mcp_lemonsqueezy.resilience import CircuitBreakers, Hedger  # noqa: E402
+from mcp_lemonsqueezy.singleflight import SingleFlight  # noqa: E402
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """
+    Point the server at a fresh set of caches, breakers and metrics, and
+    at `api.handler` instead of the network.
+    """
+
+    class Api:
+        handler = None
+        requests = 0
+
+    async def dispatch(request: httpx.Request) -> httpx.Response:
+        Api.requests += 1
+        return await Api.handler(request)
+
+    monkeypatch.setattr(server, "response_cache", ResponseCache(max_entries=100, ttls={"orders": 60.0}, enabled=True, stale_ttl=3600.0))
+    monkeypatch.setattr(server, "disk_cache", DiskCache(path=""))
+    monkeypatch.setattr(server, "single_flight", SingleFlight(enabled=True))
+    monkeypatch.setattr(server, "scheduler", RequestScheduler(requests_per_minute=60000, burst=100, max_retries=0))
+    monkeypatch.setattr(server, "metrics", Metrics())
+    monkeypatch.setattr(server, "breakers", CircuitBreakers(failures=1, reset_after=30, enabled=True))
+    monkeypatch.setattr(server, "hedger", Hedger(lambda endpoint: None, lambda: True, enabled=False))
+    monkeypatch.setattr(server.http_pool, "_client", httpx.AsyncClient(transport=httpx.MockTransport(dispatch)))
+    return Api
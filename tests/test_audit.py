@@ -0,0 +1,99 @@
+import time
+import asyncio
+from mcp_lemonsqueezy.audit import REDACTED, AuditLog
+
+
+def test_secrets_and_customer_details_are_redacted():
+    audit_log = AuditLog(path="")
+    audit_log.log("create_webhook", {"webhook_data": {"data": {"attributes": {"url": "https://example.com/hook", "secret": "signing-secret"}}}})
+    audit_log.log("create_checkout", {"data": {"attributes": {"checkout_data": {
+        "email": "jane@example.com",
+        "name": "Jane Doe",
+        "billing_address": {"country": "US", "zip": "10001"},
+        "custom": {"idempotency_key": "abc"},
+    }}}})
+    webhook, checkout = (entry.to_json() for entry in audit_log.tail())
+    assert "signing-secret" not in webhook
+    assert "https://example.com/hook" in webhook
+    checkout_data = audit_log.tail()[1].parameters["data"]["attributes"]["checkout_data"]
+    assert checkout_data == {"email": REDACTED, "name": REDACTED, "billing_address": REDACTED, "custom": {"idempotency_key": "abc"}}
+    assert "jane@example.com" not in checkout and "10001" not in checkout
+
+
+def file_log(tmp_path, **kwargs) -> AuditLog:
+    return AuditLog(capacity=100, path=str(tmp_path / "audit.jsonl"), **kwargs)
+
+
+def test_flush_appends_pending_entries(tmp_path):
+    audit_log = file_log(tmp_path)
+    for i in range(3):
+        audit_log.log("get_order", {"order_id": str(i)})
+    asyncio.run(audit_log.flush())
+    assert audit_log.stats()["pending"] == 0
+    assert audit_log.written == 3
+    assert [r["parameters"]["order_id"] for r in audit_log.read_file()] == ["0", "1", "2"]
+
+
+def test_concurrent_flushes_write_one_at_a_time(tmp_path):
+    audit_log = file_log(tmp_path)
+    write = audit_log._write
+    writing, overlapped = [], []
+
+    def slow_write(entries):
+        overlapped.append(bool(writing))
+        writing.append(True)
+        time.sleep(0.02)
+        write(entries)
+        writing.pop()
+
+    audit_log._write = slow_write
+
+    async def run():
+        for batch in range(5):
+            audit_log.log("get_order", {"order_id": f"{batch}-a"})
+            first = asyncio.ensure_future(audit_log.flush())
+            await asyncio.sleep(0.005)
+            audit_log.log("get_order", {"order_id": f"{batch}-b"})
+            await asyncio.gather(first, audit_log.flush())
+
+    asyncio.run(run())
+    assert overlapped == [False] * 10
+    assert [r["parameters"]["order_id"] for r in audit_log.read_file()] == [f"{b}-{s}" for b in range(5) for s in "ab"]
+
+
+def test_rotation_keeps_the_configured_number_of_backups(tmp_path):
+    audit_log = file_log(tmp_path, max_bytes=500, backups=2)
+
+    async def run():
+        for i in range(30):
+            audit_log.log("get_order", {"order_id": str(i)})
+            await audit_log.flush()
+
+    asyncio.run(run())
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names == ["audit.jsonl", "audit.jsonl.1", "audit.jsonl.2"]
+    assert all(p.stat().st_size <= 500 for p in tmp_path.iterdir())
+    # The oldest entries were dropped with the oldest file; the rest read in order
+    ids = [int(r["parameters"]["order_id"]) for r in audit_log.read_file(count=100)]
+    assert ids == list(range(ids[0], 30))
+    assert ids[0] > 0
+
+
+def test_read_file_pages_and_filters(tmp_path):
+    audit_log = file_log(tmp_path)
+    for i in range(10):
+        audit_log.log("get_order" if i % 2 else "list_orders", {"i": i})
+    asyncio.run(audit_log.flush())
+    assert [r["parameters"]["i"] for r in audit_log.read_file(count=2, operation="get_order")] == [7, 9]
+    assert [r["parameters"]["i"] for r in audit_log.read_file(count=2, operation="get_order", offset=2)] == [3, 5]
+
+
+def test_read_file_skips_truncated_lines(tmp_path):
+    audit_log = file_log(tmp_path)
+    audit_log.log("get_order", {"order_id": "1"})
+    asyncio.run(audit_log.flush())
+    with open(audit_log.path, "a", encoding="utf-8") as f:
+        f.write('{"timestamp": "2024-01-01T00:00:00", "operation": "get_or\n[1, 2]\n')
+    audit_log.log("get_order", {"order_id": "2"})
+    asyncio.run(audit_log.flush())
+    assert [r["parameters"]["order_id"] for r in audit_log.read_file()] == ["1", "2"]
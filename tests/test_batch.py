@@ -0,0 +1,53 @@
+import asyncio
+import httpx
+import pytest
+from mcp_lemonsqueezy.batch import batch_get
+from mcp_lemonsqueezy.client import LemonSqueezyAPIError
+from mcp_lemonsqueezy.resilience import CircuitOpenError
+
+IDS = [str(i) for i in range(1, 13)]
+
+
+def record(record_id: str) -> dict:
+    return {"type": "orders", "id": record_id, "attributes": {}}
+
+
+def fetcher(list_error: Exception = None, missing: set[str] = frozenset()):
+    calls = []
+
+    async def fetch(method, endpoint, params=None):
+        calls.append(endpoint)
+        if endpoint == "/orders":
+            if list_error is not None:
+                raise list_error
+            return {"data": [record(i) for i in IDS[:6]], "meta": {"page": {"lastPage": 1}}}
+        record_id = endpoint.rsplit("/", 1)[1]
+        if record_id in missing:
+            raise LemonSqueezyAPIError(404, {"errors": [{"status": "404"}]})
+        return {"data": record(record_id)}
+
+    return fetch, calls
+
+
+def test_list_page_covers_part_of_the_batch():
+    fetch, calls = fetcher(missing={"12"})
+    result = asyncio.run(batch_get(fetch, "/orders", IDS + ["1"], list_threshold=10))
+    assert [r["id"] for r in result["data"]] == IDS[:11]
+    assert result["errors"] == {"12": {"status": 404, "detail": {"errors": [{"status": "404"}]}}}
+    assert result["meta"] == {"requested": 13, "unique": 12, "found": 11, "failed": 1, "from_list": 6}
+    assert calls.count("/orders") == 1
+    assert len(calls) == 7
+
+
+@pytest.mark.parametrize("error", [
+    httpx.ConnectError("refused"),
+    CircuitOpenError("GET /orders", 30),
+    LemonSqueezyAPIError(500, {"errors": []}),
+])
+def test_failed_list_lookup_falls_back_to_single_gets(error):
+    fetch, calls = fetcher(list_error=error, missing={"3"})
+    result = asyncio.run(batch_get(fetch, "/orders", IDS, list_threshold=10))
+    assert result["meta"]["from_list"] == 0
+    assert result["meta"]["found"] == 11
+    assert list(result["errors"]) == ["3"]
+    assert len(calls) == 13
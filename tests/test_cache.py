@@ -0,0 +1,22 @@
+from mcp_lemonsqueezy.cache import MISSING, ResponseCache, make_key
+
+
+def test_invalidate_record_keeps_other_records():
+    cache = ResponseCache(max_entries=100, enabled=True)
+    keys = {
+        "list": make_key("GET", "/orders", {"page[number]": 1}),
+        "filtered": make_key("GET", "/orders", {"filter[store_id]": 1}),
+        "changed": make_key("GET", "/orders/8"),
+        "changed_projected": make_key("GET", "/orders/8", {"fields[orders]": "total"}),
+        "other": make_key("GET", "/orders/7"),
+        "other_resource": make_key("GET", "/subscriptions"),
+    }
+    for name, key in keys.items():
+        cache.set(key, "subscriptions" if name == "other_resource" else "orders", {"name": name})
+
+    assert cache.invalidate_record("orders", "8") == 4
+
+    assert cache.get(keys["other"]) == {"name": "other"}
+    assert cache.get(keys["other_resource"]) == {"name": "other_resource"}
+    for name in ("list", "filtered", "changed", "changed_projected"):
+        assert cache.get(keys[name]) is MISSING
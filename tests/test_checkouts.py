@@ -0,0 +1,124 @@
+import asyncio
+import httpx
+from mcp_lemonsqueezy.checkouts import CheckoutPipeline, IdempotencyLedger, KEY_PATH, dig, load_template
+from mcp_lemonsqueezy.client import LemonSqueezyAPIError
+
+TEMPLATE = {
+    "type": "checkouts",
+    "attributes": {"product_options": {"redirect_url": "https://example.com/thanks"}},
+    "relationships": {
+        "store": {"data": {"type": "stores", "id": "1"}},
+        "variant": {"data": {"type": "variants", "id": "2"}},
+    },
+}
+
+
+def override(i: int, **extra) -> dict:
+    return {"attributes": {"checkout_data": {"email": f"user{i}@example.com", "name": f"User {i}"}}, **extra}
+
+
+class CheckoutApi:
+    """
+    POST /checkouts stand-in. `lose` answers that many POSTs with a 502
+    after creating the checkout anyway, as when a response is lost.
+    """
+
+    def __init__(self, lose: int = 0):
+        self.lose = lose
+        self.checkouts: list[dict] = []
+        self.posts = 0
+
+    async def fetch(self, method, endpoint, params=None, json_data=None):
+        if method == "GET":
+            return {"data": list(reversed(self.checkouts)), "meta": {"page": {"currentPage": 1, "lastPage": 1}}}
+        self.posts += 1
+        await asyncio.sleep(0.01)
+        checkout = {"type": "checkouts", "id": str(len(self.checkouts) + 1), "attributes": json_data["data"]["attributes"]}
+        self.checkouts.append(checkout)
+        if self.lose:
+            self.lose -= 1
+            raise LemonSqueezyAPIError(502, "Bad Gateway")
+        return {"data": checkout}
+
+
+def run(pipeline: CheckoutPipeline, overrides: list[dict]) -> list[dict]:
+    async def collect():
+        return [result async for result in pipeline.run(load_template(TEMPLATE), overrides)]
+
+    return sorted(asyncio.run(collect()), key=lambda r: r["index"])
+
+
+def test_same_checkout_is_created_once():
+    api = CheckoutApi()
+    pipeline = CheckoutPipeline(api.fetch, IdempotencyLedger(capacity=100, ttl=60))
+    first = run(pipeline, [override(1), override(2), override(1)])
+    again = run(pipeline, [override(1), override(2)])
+    assert api.posts == 2
+    # The repeated checkout shared the first one's POST
+    assert [r["status"] for r in first] == ["created"] * 3
+    assert first[0]["idempotency_key"] == first[2]["idempotency_key"] != first[1]["idempotency_key"]
+    assert [r["status"] for r in again] == ["replayed", "replayed"]
+    assert [r["data"]["id"] for r in again] == [first[0]["data"]["id"], first[1]["data"]["id"]]
+    # The key travels with the checkout, where a later reconciliation can find it
+    assert dig(first[0]["data"], KEY_PATH) == first[0]["idempotency_key"]
+
+
+def test_explicit_idempotency_key():
+    api = CheckoutApi()
+    pipeline = CheckoutPipeline(api.fetch, IdempotencyLedger(capacity=100, ttl=60))
+    results = run(pipeline, [override(1, idempotency_key="order-1"), override(2, idempotency_key="order-1")])
+    assert api.posts == 1
+    assert {r["idempotency_key"] for r in results} == {"order-1"}
+
+
+def test_lost_response_is_reconciled_instead_of_posting_again():
+    api = CheckoutApi(lose=1)
+    pipeline = CheckoutPipeline(api.fetch, IdempotencyLedger(capacity=100, ttl=60), attempts=3)
+    [result] = run(pipeline, [override(1)])
+    assert result["status"] == "reconciled"
+    assert api.posts == 1
+    assert len(api.checkouts) == 1
+    assert pipeline.stats()["ledger"]["unknown"] == 0
+
+
+def test_definite_failures_are_not_retried():
+    posts = 0
+
+    async def fetch(method, endpoint, params=None, json_data=None):
+        nonlocal posts
+        posts += 1
+        raise LemonSqueezyAPIError(422, {"errors": [{"detail": "The variant is not available."}]})
+
+    [result] = run(CheckoutPipeline(fetch, IdempotencyLedger(capacity=100, ttl=60), attempts=3), [override(1)])
+    assert result["status"] == "failed"
+    assert result["error"]["status"] == 422
+    assert posts == 1
+
+
+def test_unknown_outcome_is_retried_when_nothing_was_created():
+    calls = []
+
+    async def fetch(method, endpoint, params=None, json_data=None):
+        calls.append(method)
+        if method == "GET":
+            return {"data": [], "meta": {"page": {"currentPage": 1, "lastPage": 1}}}
+        if calls.count("POST") == 1:
+            raise httpx.ReadTimeout("timed out")
+        return {"data": {"type": "checkouts", "id": "9", "attributes": json_data["data"]["attributes"]}}
+
+    [result] = run(CheckoutPipeline(fetch, IdempotencyLedger(capacity=100, ttl=60), attempts=3), [override(1)])
+    assert result["status"] == "created"
+    assert calls == ["POST", "GET", "POST"]
+
+
+def test_invalid_overrides_are_reported_per_item():
+    api = CheckoutApi()
+    results = run(CheckoutPipeline(api.fetch, IdempotencyLedger(capacity=100, ttl=60)), [
+        override(1),
+        {"attributes": {"checkout_data": {"email": "user2@example.com"}}},
+        {"attributes": {"custom_price": "free", "checkout_data": {"email": "a@example.com", "name": "A"}}},
+    ])
+    assert [r["status"] for r in results] == ["created", "invalid", "invalid"]
+    assert results[1]["errors"] == [{"path": "overrides[1].attributes.checkout_data.name", "message": "is required"}]
+    assert results[2]["errors"][0]["path"] == "overrides[2].attributes.custom_price"
+    assert api.posts == 1
@@ -0,0 +1,80 @@
+import asyncio
+from mcp_lemonsqueezy.cache import make_key
+from mcp_lemonsqueezy.diskcache import DiskCache, cache_namespace
+
+API_BASE = "https://api.lemonsqueezy.com/v1"
+KEY = make_key("GET", "/stores/1")
+STORE = {"data": {"type": "stores", "id": "1", "attributes": {"name": "Live store"}}}
+
+
+def disk_cache(path: str, api_key: str, api_base: str = API_BASE) -> DiskCache:
+    return DiskCache(path=path, resources={"stores"}, namespace=cache_namespace(api_key, api_base))
+
+
+def test_accounts_do_not_share_responses(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    live, other = disk_cache(path, "live-key"), disk_cache(path, "other-key")
+
+    async def run():
+        await live.set(KEY, "stores", STORE, {})
+        return await live.get(KEY), await other.get(KEY)
+
+    try:
+        own, foreign = asyncio.run(run())
+    finally:
+        live.close()
+        other.close()
+    assert own.value == STORE
+    assert foreign is None
+    assert live.path != other.path
+
+
+def test_api_bases_do_not_share_responses(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    live, stub = disk_cache(path, "key"), disk_cache(path, "key", "http://127.0.0.1:8787/v1")
+
+    async def run():
+        await live.set(KEY, "stores", STORE, {})
+        return await stub.get(KEY)
+
+    try:
+        assert asyncio.run(run()) is None
+    finally:
+        live.close()
+        stub.close()
+
+
+def test_same_account_shares_responses_across_instances(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    first, second = disk_cache(path, "key"), disk_cache(path, "key")
+
+    async def run():
+        await first.set(KEY, "stores", STORE, {})
+        return await second.get(KEY)
+
+    try:
+        assert asyncio.run(run()).value == STORE
+    finally:
+        first.close()
+        second.close()
+
+
+def test_eviction_keeps_stored_responses_under_max_bytes(tmp_path):
+    cache = DiskCache(path=str(tmp_path / "responses.sqlite3"), resources={"stores"}, max_bytes=20_000)
+    body = {"data": {"type": "stores", "id": "1", "attributes": {"name": "x" * 900}}}
+
+    async def run():
+        for i in range(100):
+            await cache.set(make_key("GET", f"/stores/{i}"), "stores", body, {})
+        return await cache.get(make_key("GET", "/stores/0")), await cache.get(make_key("GET", "/stores/99"))
+
+    try:
+        oldest, newest = asyncio.run(run())
+        entries, used = cache._size()
+    finally:
+        cache.close()
+    assert oldest is None and newest.value == body
+    assert used <= 20_000
+    # About one entry dropped per store once full, not a fresh round of evictions every time
+    assert cache.evictions == 100 - entries
+    assert entries >= 19
@@ -0,0 +1,100 @@
+import csv
+import json
+import asyncio
+import pytest
+from mcp_lemonsqueezy import export
+from mcp_lemonsqueezy.export import ResourceExport, export_path
+
+PAGES = 4
+PAGE_SIZE = 3
+
+
+def record(i: int) -> dict:
+    return {"type": "orders", "id": str(i), "attributes": {"total": i * 100, "status": "paid"}}
+
+
+class Api:
+    """
+    An orders list endpoint with PAGES pages; `fail_on` makes one page fail once.
+    """
+
+    def __init__(self, fail_on: int = None):
+        self.fail_on = fail_on
+        self.requested: list[int] = []
+
+    async def fetch(self, method, endpoint, params=None):
+        number = int(params["page[number]"])
+        self.requested.append(number)
+        if number == self.fail_on:
+            self.fail_on = None
+            raise ConnectionError("connection reset")
+        first = (number - 1) * PAGE_SIZE + 1
+        return {
+            "data": [record(i) for i in range(first, first + PAGE_SIZE)],
+            "meta": {"page": {"currentPage": number, "lastPage": PAGES, "total": PAGES * PAGE_SIZE}},
+        }
+
+
+def run_export(api: Api, path: str, fmt: str = "ndjson", resume: bool = True) -> dict:
+    async def run():
+        return await ResourceExport(api.fetch, "/orders", path, fmt, {"filter[store_id]": "1"}).run(resume=resume)
+
+    return asyncio.run(run())
+
+
+def test_interrupted_export_resumes_from_the_checkpoint(tmp_path):
+    path = str(tmp_path / "orders.ndjson")
+    api = Api(fail_on=3)
+    with pytest.raises(ConnectionError):
+        run_export(api, path)
+    assert json.loads((tmp_path / "orders.ndjson.checkpoint.json").read_text())["rows"] == 2 * PAGE_SIZE
+
+    resumed = Api()
+    result = run_export(resumed, path)
+    assert resumed.requested == [3, 4]
+    assert result["rows"] == PAGES * PAGE_SIZE
+    assert result["resumed_from_row"] == 2 * PAGE_SIZE
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line)["id"] for line in f] == [str(i) for i in range(1, PAGES * PAGE_SIZE + 1)]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["orders.ndjson"]
+
+
+def test_resume_false_starts_over(tmp_path):
+    path = str(tmp_path / "orders.csv")
+    with pytest.raises(ConnectionError):
+        run_export(Api(fail_on=2), path, "csv")
+    api = Api()
+    result = run_export(api, path, "csv", resume=False)
+    assert api.requested == [1, 2, 3, 4]
+    assert result["resumed_from_row"] is None
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == PAGES * PAGE_SIZE
+    assert rows[0] == {"id": "1", "total": "100", "status": "paid"}
+
+
+def test_checkpoint_of_another_query_is_ignored(tmp_path):
+    path = str(tmp_path / "orders.ndjson")
+    with pytest.raises(ConnectionError):
+        run_export(Api(fail_on=3), path)
+
+    async def run():
+        return await ResourceExport(Api().fetch, "/orders", path, "ndjson", {"filter[store_id]": "2"}).run()
+
+    result = asyncio.run(run())
+    assert result["resumed_from_row"] is None
+    assert result["rows"] == PAGES * PAGE_SIZE
+
+
+def test_parquet_without_pyarrow_fails_before_fetching(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "find_spec", lambda name: None)
+    with pytest.raises(ValueError, match="pyarrow"):
+        export_path(str(tmp_path), None, "orders", "parquet")
+    assert export_path(str(tmp_path), None, "orders", "csv") == str(tmp_path / "orders.csv")
+
+
+def test_export_path_stays_inside_the_directory(tmp_path):
+    with pytest.raises(ValueError, match="inside the export directory"):
+        export_path(str(tmp_path), "../orders.ndjson", "orders", "ndjson")
+    with pytest.raises(ValueError, match="Unknown format"):
+        export_path(str(tmp_path), None, "orders", "xlsx")
@@ -0,0 +1,80 @@
+import asyncio
+from mcp_lemonsqueezy import server
+from mcp_lemonsqueezy.licenses import LicenseCache, LicenseService
+
+KEY = "38b1460a-5104-4067-a91d-77b872934d51"
+
+
+class LicenseApi:
+    """
+    License API stand-in: KEY is valid, every other key is not found.
+    """
+
+    def __init__(self):
+        self.sent: list[tuple[str, dict]] = []
+
+    async def send(self, action: str, form: dict) -> dict:
+        self.sent.append((action, form))
+        await asyncio.sleep(0.01)
+        if form["license_key"] != KEY:
+            return {"valid": False, "error": "license_key not found."}
+        if action == "activate":
+            return {"activated": True, "instance": {"id": "inst-1"}, "license_key": {"status": "active"}}
+        return {"valid": True, "error": None}
+
+
+def service(api: LicenseApi) -> LicenseService:
+    return LicenseService(api.send, LicenseCache(ttl=60, negative_ttl=60, capacity=100))
+
+
+def test_validations_share_one_request_and_are_cached():
+    api = LicenseApi()
+    licenses = service(api)
+
+    async def run():
+        first = await asyncio.gather(*(licenses.validate(KEY) for _ in range(5)))
+        return first, await licenses.validate(KEY)
+
+    first, again = asyncio.run(run())
+    assert len(api.sent) == 1
+    assert all(answer["valid"] for answer, _ in first)
+    assert again == ({"valid": True, "error": None}, True)
+
+
+def test_activation_resets_and_seeds_answers():
+    api = LicenseApi()
+    licenses = service(api)
+
+    async def run():
+        await licenses.validate(KEY)
+        await licenses.activate(KEY, "laptop")
+        return await licenses.validate(KEY, "inst-1"), await licenses.validate(KEY)
+
+    seeded, reset = asyncio.run(run())
+    assert seeded[1] is True and seeded[0]["instance"] == {"id": "inst-1"}
+    assert reset[1] is False
+    assert [action for action, _ in api.sent] == ["validate", "activate", "validate"]
+
+
+def test_batch_validates_each_key_once():
+    api = LicenseApi()
+    result = asyncio.run(service(api).validate_many([{"license_key": KEY}, {"license_key": "nope"}, {"license_key": KEY}]))
+    assert [r["valid"] for r in result["data"]] == [True, False, True]
+    assert result["meta"]["unique"] == 2
+    assert len(api.sent) == 2
+
+
+def test_tools_send_the_key_they_cache(api, monkeypatch):
+    license_api = LicenseApi()
+    monkeypatch.setattr(server, "license_service", service(license_api))
+
+    async def run():
+        padded = await server.validate_license_key(license_key=f"  {KEY}\n", ctx=None)
+        exact = await server.validate_license_key(license_key=KEY, ctx=None)
+        batch = await server.validate_license_keys(licenses=[{"license_key": f" {KEY} "}, {"license_key": KEY}], ctx=None)
+        return padded, exact, batch
+
+    padded, exact, batch = asyncio.run(run())
+    assert padded["valid"] and exact["cached"]
+    assert [r["cached"] for r in batch["data"]] == [True, True]
+    assert license_api.sent == [("validate", {"license_key": KEY})]
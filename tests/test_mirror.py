@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+from mcp_lemonsqueezy.mirror import StoreMirror
+
+
+def order(i: int, customer_id: str) -> dict:
+    return {"type": "orders", "id": str(i), "attributes": {
+        "customer_id": int(customer_id), "status": "paid", "total": i * 100,
+        "created_at": f"2024-01-{i:02d}T00:00:00.000000Z", "updated_at": f"2024-01-{i:02d}T00:00:00.000000Z",
+    }}
+
+
+def paginate_of(records: list[dict]):
+    def paginate(endpoint):
+        async def stream():
+            for record in records:
+                yield record
+        return stream()
+    return paginate
+
+
+def test_queries_before_the_first_sync_fail_without_creating_the_mirror(tmp_path):
+    mirror = StoreMirror(str(tmp_path / "mirror.sqlite3"))
+    with pytest.raises(ValueError, match="not synced"):
+        mirror.query("orders")
+    with pytest.raises(ValueError, match="not synced"):
+        mirror.scan("orders")
+    assert mirror.state() == [] and mirror.state("orders") is None
+    assert not (tmp_path / "mirror.sqlite3").exists()
+
+
+def test_sync_then_query(tmp_path):
+    mirror = StoreMirror(str(tmp_path / "mirror.sqlite3"))
+    records = [order(i, "7" if i % 2 else "8") for i in range(1, 6)]
+    try:
+        result = asyncio.run(mirror.sync(paginate_of(records), "orders"))
+        assert result == {"resource": "orders", "mode": "full", "seen": 5, "changed": 5}
+        assert [r["id"] for r in mirror.query("orders", {"customer_id": "7"})] == ["5", "3", "1"]
+        assert mirror.state("orders")["records"] == 5
+        with pytest.raises(ValueError, match="Cannot filter"):
+            mirror.query("orders", {"email": "jane@example.com"})
+    finally:
+        mirror.close()
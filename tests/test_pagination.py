@@ -0,0 +1,107 @@
+import asyncio
+from contextlib import aclosing
+from mcp_lemonsqueezy.pagination import iter_pages, next_page_params, paginate
+
+PAGES = 5
+
+
+class Api:
+    """
+    A list endpoint with PAGES pages of two records; logs when each page is
+    requested, finished or cancelled.
+    """
+
+    def __init__(self, fail_on: int = None):
+        self.fail_on = fail_on
+        self.events: list[str] = []
+
+    async def fetch(self, method, endpoint, params=None):
+        number = params["page[number]"]
+        self.events.append(f"request {number}")
+        try:
+            await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            self.events.append(f"cancelled {number}")
+            raise
+        if number == self.fail_on:
+            raise ConnectionError(f"page {number}")
+        self.events.append(f"done {number}")
+        return {
+            "data": [{"id": f"{number}-{i}"} for i in range(2)],
+            "meta": {"page": {"currentPage": number, "lastPage": PAGES}},
+        }
+
+
+def collect(api: Api, max_items: int = None, stop_after: int = None) -> list[str]:
+    async def run():
+        ids = []
+        async with aclosing(paginate(api.fetch, "/orders", max_items=max_items)) as stream:
+            async for record in stream:
+                ids.append(record["id"])
+                if len(ids) == stop_after:
+                    break
+        return ids
+
+    return asyncio.run(run())
+
+
+def test_next_page_params():
+    assert next_page_params({"meta": {"page": {"currentPage": 1, "lastPage": 3}}}, {"page[number]": 1}) == {"page[number]": 2}
+    assert next_page_params({"meta": {"page": {"currentPage": 3, "lastPage": 3}}}, {"page[number]": 3}) is None
+    page = {"links": {"next": "https://api.lemonsqueezy.com/v1/orders?page%5Bnumber%5D=4&page%5Bsize%5D=10"}}
+    assert next_page_params(page, {"filter[store_id]": "1"}) == {"filter[store_id]": "1", "page[number]": "4", "page[size]": "10"}
+    assert next_page_params({"links": {"next": None}}, {}) is None
+
+
+def test_next_page_is_requested_before_the_current_one_is_consumed():
+    api = Api()
+
+    async def run():
+        async with aclosing(iter_pages(api.fetch, "/orders")) as pages:
+            async for params, page, next_params in pages:
+                # The following page is already on its way while this one is processed
+                await asyncio.sleep(0)
+                if next_params is not None:
+                    assert f"request {next_params['page[number]']}" in api.events
+
+    asyncio.run(run())
+    assert api.events.count("request 1") == 1
+    assert [e for e in api.events if e.startswith("done")] == [f"done {n}" for n in range(1, PAGES + 1)]
+
+
+def test_every_record_in_order():
+    assert collect(Api()) == [f"{n}-{i}" for n in range(1, PAGES + 1) for i in range(2)]
+
+
+def test_max_items_stops_prefetching():
+    api = Api()
+    assert collect(api, max_items=4) == ["1-0", "1-1", "2-0", "2-1"]
+    assert "request 3" not in api.events
+
+
+def test_stopping_early_cancels_and_awaits_the_prefetch():
+    api = Api()
+
+    async def run():
+        async with aclosing(iter_pages(api.fetch, "/orders")) as pages:
+            async for _ in pages:
+                await asyncio.sleep(0)
+                break
+        # Closing the stream waited for the cancelled prefetch to finish
+        return list(api.events)
+
+    assert asyncio.run(run()) == ["request 1", "done 1", "request 2", "cancelled 2"]
+
+
+def test_failed_prefetch_is_not_raised_after_stopping():
+    api = Api(fail_on=2)
+
+    async def run():
+        async with aclosing(iter_pages(api.fetch, "/orders")) as pages:
+            async for _ in pages:
+                # Let the prefetch of page 2 fail before stopping
+                await asyncio.sleep(0.05)
+                break
+
+    asyncio.run(run())
+    assert api.events == ["request 1", "done 1", "request 2"]
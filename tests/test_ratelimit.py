@@ -0,0 +1,99 @@
+import asyncio
+import httpx
+from mcp_lemonsqueezy.ratelimit import PRIORITY_BULK, PRIORITY_INTERACTIVE, RequestScheduler, TokenBucket, parse_retry_after
+
+
+def response(status: int, headers: dict = None) -> httpx.Response:
+    return httpx.Response(status, headers=headers)
+
+
+def scheduler(**kwargs) -> RequestScheduler:
+    options = {"requests_per_minute": 60000, "burst": 100, "max_retries": 2, "backoff_base": 0.001, "backoff_cap": 0.001}
+    return RequestScheduler(**{**options, **kwargs})
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_token_bucket_takes_and_refunds():
+    bucket = TokenBucket(rate=0.0001, capacity=1)
+    assert bucket.try_take()
+    assert not bucket.try_take()
+    bucket.refund()
+    assert bucket.try_take()
+
+
+def test_interactive_requests_overtake_bulk():
+    async def run():
+        # One token per 10 ms and none to start with: every request queues
+        gate = scheduler(requests_per_minute=6000, burst=1)
+        gate.bucket.tokens = 0
+        order = []
+
+        async def acquire(name: str, priority: int) -> None:
+            await gate.acquire(priority)
+            order.append(name)
+
+        bulk = [asyncio.ensure_future(acquire(f"bulk{i}", PRIORITY_BULK)) for i in range(3)]
+        await asyncio.sleep(0)
+        interactive = asyncio.ensure_future(acquire("interactive", PRIORITY_INTERACTIVE))
+        await asyncio.gather(*bulk, interactive)
+        return order
+
+    assert asyncio.run(run())[0] == "interactive"
+
+
+def test_server_errors_are_retried_only_when_idempotent():
+    async def run(idempotent: bool) -> tuple[int, int]:
+        gate = scheduler()
+        sent = 0
+
+        async def send():
+            nonlocal sent
+            sent += 1
+            return response(503 if sent == 1 else 200)
+
+        resp = await gate.request(send, idempotent=idempotent)
+        return resp.status_code, sent
+
+    assert asyncio.run(run(True)) == (200, 2)
+    assert asyncio.run(run(False)) == (503, 1)
+
+
+def test_throttled_requests_are_retried_after_retry_after():
+    async def run():
+        gate = scheduler()
+        statuses = iter([response(429, {"Retry-After": "0.01"}), response(200)])
+
+        async def send():
+            return next(statuses)
+
+        resp = await gate.request(send, idempotent=False)
+        return resp.status_code, gate.stats()
+
+    status, stats = asyncio.run(run())
+    assert status == 200
+    assert stats["throttled"] == 1
+    assert stats["retries"] == 1
+
+
+def test_retries_stop_at_max_retries():
+    async def run():
+        gate = scheduler(max_retries=2)
+        sent = 0
+
+        async def send():
+            nonlocal sent
+            sent += 1
+            raise httpx.ConnectError("refused")
+
+        try:
+            await gate.request(send)
+        except httpx.ConnectError:
+            return sent
+
+    assert asyncio.run(run()) == 3
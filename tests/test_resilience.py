@@ -0,0 +1,308 @@
+import asyncio
+import httpx
+import pytest
+from mcp_lemonsqueezy import resilience, server
+from mcp_lemonsqueezy.metrics import Histogram
+from mcp_lemonsqueezy.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, Hedger
+
+ORDER = {"data": {"type": "orders", "id": "1", "attributes": {"total": 1000}}}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def latency(seconds: float, samples: int = 50) -> Histogram:
+    histogram = Histogram()
+    for _ in range(samples):
+        histogram.observe(seconds)
+    return histogram
+
+
+# Circuit breaker
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("GET /orders", failures=3, reset_after=30)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record(False)
+    breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CLOSED
+    for _ in range(3):
+        breaker.allow()
+        breaker.record(False)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.allow()
+    assert error.value.retry_in == pytest.approx(30)
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_breaker_half_open_trial_closes_it(clock):
+    breaker = CircuitBreaker("GET /orders", failures=1, reset_after=30)
+    breaker.allow()
+    breaker.record(False)
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    clock.now += 1
+    breaker.check()
+    breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one trial at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["opened"] == 1
+
+
+def test_breaker_failed_trial_reopens_it(clock):
+    breaker = CircuitBreaker("GET /orders", failures=1, reset_after=30)
+    breaker.allow()
+    breaker.record(False)
+    clock.now += 30
+    breaker.allow()
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert breaker.stats()["retry_in_seconds"] == 30
+    assert breaker.stats()["opened"] == 2
+
+
+def test_breaker_abandoned_trial_frees_the_slot(clock):
+    breaker = CircuitBreaker("GET /orders", failures=1, reset_after=30)
+    breaker.allow()
+    breaker.record(False)
+    clock.now += 30
+    breaker.allow()
+    breaker.abandon()
+    breaker.allow()
+    assert breaker.state == HALF_OPEN
+
+
+# Hedging
+
+def test_hedge_wins_and_slow_request_is_cancelled():
+    hedger = Hedger(lambda endpoint: latency(0.01), lambda: True, enabled=True, min_delay=0.0, min_samples=1)
+    cancelled = []
+    calls = 0
+
+    async def send():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        return "hedge"
+
+    async def run():
+        result = await hedger.run("GET /orders/{id}", send)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == "hedge"
+    assert cancelled == [True]
+    assert hedger.stats()["hedged"] == 1
+    assert hedger.stats()["hedge_win_rate"] == 1.0
+
+
+def test_failed_hedge_falls_back_to_the_first_request():
+    hedger = Hedger(lambda endpoint: latency(0.01), lambda: True, enabled=True, min_delay=0.0, min_samples=1)
+    calls = 0
+
+    async def send():
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise httpx.ConnectError("refused")
+        await asyncio.sleep(0.05)
+        return "first"
+
+    assert asyncio.run(hedger.run("GET /orders/{id}", send)) == "first"
+    assert hedger.stats()["hedge_wins"] == 0
+
+
+def test_unusable_hedge_answer_waits_for_the_first_request():
+    hedger = Hedger(lambda endpoint: latency(0.01), lambda: True, enabled=True, min_delay=0.0, min_samples=1)
+    calls = 0
+
+    async def send():
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            return 429
+        await asyncio.sleep(0.05)
+        return 200
+
+    assert asyncio.run(hedger.run("GET /orders/{id}", send, usable=lambda status: status < 400)) == 200
+    assert hedger.stats()["hedge_wins"] == 0
+
+
+def test_first_request_answer_is_kept_when_neither_is_usable():
+    hedger = Hedger(lambda endpoint: latency(0.01), lambda: True, enabled=True, min_delay=0.0, min_samples=1)
+    calls = 0
+
+    async def send():
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            return 429
+        await asyncio.sleep(0.05)
+        return 503
+
+    assert asyncio.run(hedger.run("GET /orders/{id}", send, usable=lambda status: status < 400)) == 503
+
+
+def test_cancelling_the_caller_cancels_both_requests():
+    hedger = Hedger(lambda endpoint: latency(0.01), lambda: True, enabled=True, min_delay=0.0, min_samples=1)
+    cancelled = 0
+
+    async def send():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+
+    async def run():
+        task = asyncio.ensure_future(hedger.run("GET /orders/{id}", send))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert cancelled == 2
+
+
+def test_no_hedge_without_history_or_token():
+    calls = 0
+
+    async def send():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.03)
+        return calls
+
+    few = Hedger(lambda endpoint: latency(0.001, samples=5), lambda: True, enabled=True, min_delay=0.0, min_samples=20)
+    assert asyncio.run(few.run("GET /orders", send)) == 1
+    no_token = Hedger(lambda endpoint: latency(0.001), lambda: False, enabled=True, min_delay=0.0, min_samples=1)
+    assert asyncio.run(no_token.run("GET /orders", send)) == 2
+    assert no_token.stats()["skipped_no_token"] == 1
+    assert few.stats()["hedged"] == no_token.stats()["hedged"] == 0
+
+
+# lemonsqueezy_request
+
+def test_stale_copy_is_served_while_the_circuit_is_open(api):
+    async def ok(request):
+        return httpx.Response(200, json=ORDER)
+
+    async def down(request):
+        return httpx.Response(503, json={"errors": [{"status": "503"}]})
+
+    async def run():
+        api.handler = ok
+        await server.lemonsqueezy_request("GET", "/orders/1")
+        # Let the cached copy expire
+        entry = server.response_cache._entries[next(iter(server.response_cache._entries))]
+        server.response_cache._entries[next(iter(server.response_cache._entries))] = (entry[0] - 120, *entry[1:])
+        api.handler = down
+        tripping = await server.lemonsqueezy_request("GET", "/orders/1")
+        sent = api.requests
+        rejected = await server.lemonsqueezy_request("GET", "/orders/1")
+        return tripping, rejected, sent
+
+    tripping, rejected, sent = asyncio.run(run())
+    assert tripping["data"] == ORDER["data"]
+    assert tripping["meta"]["stale"]["expired_seconds_ago"] >= 60
+    # The circuit is open: answered without another request
+    assert rejected["meta"]["stale"]
+    assert api.requests == sent == 2
+    assert server.breakers.stale_served == 2
+    assert server.breakers.breakers["GET /orders/{id}"].state == OPEN
+
+
+def test_open_circuit_without_a_stale_copy_fails_fast(api):
+    async def down(request):
+        return httpx.Response(503, json={"errors": [{"status": "503"}]})
+
+    async def run():
+        api.handler = down
+        with pytest.raises(server.LemonSqueezyAPIError):
+            await server.lemonsqueezy_request("GET", "/orders/2")
+        with pytest.raises(CircuitOpenError):
+            await server.lemonsqueezy_request("GET", "/orders/2")
+
+    asyncio.run(run())
+    assert api.requests == 1
+
+
+def test_client_errors_do_not_open_the_circuit(api):
+    async def missing(request):
+        return httpx.Response(404, json={"errors": [{"status": "404"}]})
+
+    async def run():
+        api.handler = missing
+        for _ in range(3):
+            with pytest.raises(server.LemonSqueezyAPIError):
+                await server.lemonsqueezy_request("GET", "/orders/404")
+
+    asyncio.run(run())
+    assert server.breakers.breakers["GET /orders/{id}"].state == CLOSED
+    assert api.requests == 3
+
+
+def test_hedged_request_wait_is_not_negative(api, monkeypatch):
+    monkeypatch.setattr(server, "hedger", Hedger(lambda endpoint: latency(0.01), lambda: True, enabled=True, min_delay=0.0, min_samples=1))
+
+    async def run():
+        # Both attempts answer at the same moment, so both finish before either is cancelled
+        deadline = asyncio.get_running_loop().time() + 0.1
+
+        async def slow(request):
+            await asyncio.sleep(deadline - asyncio.get_running_loop().time())
+            return httpx.Response(200, json=ORDER)
+
+        api.handler = slow
+        await server.lemonsqueezy_request("GET", "/orders/3")
+
+    asyncio.run(run())
+    stats = server.metrics.endpoints["GET /orders/{id}"]
+    assert server.hedger.stats()["hedged"] == 1
+    assert stats.wait.count == 1
+    assert 0.0 <= stats.wait.sum < 0.05
+
+
+def test_failing_hedge_does_not_replace_a_good_answer(api, monkeypatch):
+    monkeypatch.setattr(server, "hedger", Hedger(lambda endpoint: latency(0.01), lambda: True, enabled=True, min_delay=0.0, min_samples=1))
+
+    async def run():
+        async def flaky(request):
+            if api.requests == 1:
+                await asyncio.sleep(0.05)
+                return httpx.Response(200, json=ORDER)
+            return httpx.Response(503, json={"errors": [{"status": "503"}]})
+
+        api.handler = flaky
+        return await server.lemonsqueezy_request("GET", "/orders/4")
+
+    assert asyncio.run(run()) == ORDER
+    assert api.requests == 2
+    assert server.breakers.breakers["GET /orders/{id}"].state == CLOSED
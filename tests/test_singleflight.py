@@ -0,0 +1,100 @@
+import asyncio
+import httpx
+import pytest
+from mcp_lemonsqueezy import server
+from mcp_lemonsqueezy.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight(enabled=True)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"id": "1"}
+
+    async def run():
+        return await asyncio.gather(*(flights.do("key", fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == [{"id": "1"}] * 5
+    assert calls == 1
+    assert flights.stats()["coalesced"] == 4
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_every_caller_gets_the_error():
+    flights = SingleFlight(enabled=True)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(*(flights.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flights.stats()["failed"] == 1
+
+
+def test_cancelled_waiter_leaves_the_call_running():
+    flights = SingleFlight(enabled=True)
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flights.do("key", fetch))
+        second = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
+    assert flights.stats()["abandoned"] == 0
+
+
+def test_last_waiter_cancelling_cancels_the_call():
+    flights = SingleFlight(enabled=True)
+
+    async def run():
+        stopped = asyncio.Event()
+
+        async def fetch():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                stopped.set()
+                raise
+
+        waiter = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.wait_for(stopped.wait(), 1)
+
+    asyncio.run(run())
+    assert flights.stats()["abandoned"] == 1
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_requests_share_a_flight_only_with_the_same_cache_use(api):
+    async def slow(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"data": {"type": "orders", "id": "1", "attributes": {}}})
+
+    async def run():
+        api.handler = slow
+        await asyncio.gather(
+            server.lemonsqueezy_request("GET", "/orders/1"),
+            server.lemonsqueezy_request("GET", "/orders/1"),
+            server.lemonsqueezy_request("GET", "/orders/1", use_cache=False, store=False),
+        )
+
+    asyncio.run(run())
+    assert api.requests == 2
+    assert server.single_flight.stats()["coalesced"] == 1
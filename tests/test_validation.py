@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from mcp_lemonsqueezy.validation import InputValidator, SchemaError, compile_schema, tool_schema
+
+CHECKOUT = {
+    "type": "checkouts",
+    "attributes": {
+        "product_options": {"enabled_variants": [1, 2]},
+        "checkout_data": {"email": "jane@example.com", "name": "Jane"},
+        "expires_at": "2030-01-01T00:00:00Z",
+    },
+    "relationships": {
+        "store": {"data": {"type": "stores", "id": "1"}},
+        "variant": {"data": {"type": "variants", "id": "2"}},
+    },
+}
+
+
+def checkout(**attributes) -> dict:
+    return {**CHECKOUT, "attributes": {**CHECKOUT["attributes"], **attributes}}
+
+
+def validate(data) -> list[dict]:
+    return compile_schema(tool_schema("create_checkout"))({"data": data})
+
+
+def test_valid_checkout():
+    assert validate(CHECKOUT) == []
+
+
+def test_errors_name_the_path_and_problem():
+    errors = validate({
+        **checkout(custom_price="99", preview=1, expires_at="next week"),
+        "type": "orders",
+        "relationships": {"store": {"data": {"type": "stores"}}},
+    })
+    assert sorted(errors, key=lambda e: e["path"]) == [
+        {"path": "data.attributes.custom_price", "message": "expected integer, got str"},
+        {"path": "data.attributes.expires_at", "message": "expected an ISO 8601 date-time"},
+        {"path": "data.attributes.preview", "message": "expected boolean, got int"},
+        {"path": "data.relationships.store.data.id", "message": "is required"},
+        {"path": "data.relationships.variant", "message": "is required"},
+        {"path": "data.type", "message": "must be one of ['checkouts']"},
+    ]
+
+
+def test_array_items_carry_their_index():
+    errors = validate(checkout(product_options={"enabled_variants": [1, "2", True]}))
+    assert errors == [
+        {"path": "data.attributes.product_options.enabled_variants[1]", "message": "expected integer, got str"},
+        {"path": "data.attributes.product_options.enabled_variants[2]", "message": "expected integer, got bool"},
+    ]
+
+
+def test_partial_and_required_only_modes():
+    schema = tool_schema("create_checkout")["properties"]["data"]
+    partial = compile_schema(schema, required=False)
+    assert partial({"attributes": {"checkout_data": {"email": "jane@example.com"}}}) == []
+    assert partial({"attributes": {"custom_price": "free"}})[0]["path"] == "attributes.custom_price"
+    required_only = compile_schema(schema, types=False)
+    assert required_only({**CHECKOUT, "type": "orders", "attributes": {**CHECKOUT["attributes"], "custom_price": "free"}}) == []
+    assert required_only({"type": "checkouts"}) == [
+        {"path": "attributes", "message": "is required"},
+        {"path": "relationships", "message": "is required"},
+    ]
+
+
+def test_wrapped_tool_is_not_called_with_invalid_input():
+    validator = InputValidator()
+    calls = []
+
+    async def create_checkout(data: dict, ctx=None) -> dict:
+        calls.append(data)
+        return {"data": data}
+
+    wrapped = validator.wrap(create_checkout)
+    assert asyncio.run(wrapped(data=CHECKOUT, ctx=None)) == {"data": CHECKOUT}
+    with pytest.raises(SchemaError) as error:
+        asyncio.run(wrapped(data=checkout(custom_price=9.5), ctx=None))
+    assert error.value.errors == [{"path": "data.attributes.custom_price", "message": "expected integer, got float"}]
+    assert '"invalid_input"' in str(error.value)
+    assert calls == [CHECKOUT]
+    assert validator.stats()["checked"] == 2 and validator.stats()["rejected"] == 1
@@ -0,0 +1,80 @@
+import json
+import asyncio
+import httpx
+from mcp_lemonsqueezy.webhooks import WebhookReceiver, sign, verify_signature
+
+SECRET = "signing-secret"
+EVENT = {"meta": {"event_name": "order_created"}, "data": {"type": "orders", "id": "1", "attributes": {}}}
+
+
+def test_verify_signature():
+    body = json.dumps(EVENT).encode()
+    assert verify_signature(SECRET, body, sign(SECRET, body))
+    assert not verify_signature(SECRET, body, sign("other-secret", body))
+    assert not verify_signature(SECRET, body + b" ", sign(SECRET, body))
+    assert not verify_signature(SECRET, body, None)
+    assert not verify_signature(SECRET, body, "")
+
+
+def deliver(handler, bodies: list[tuple[bytes, str | None]]) -> tuple[list[int], WebhookReceiver]:
+    """
+    Post each (body, signature) to a receiver on a free port and wait until
+    every accepted event has been handled.
+    """
+    receiver = WebhookReceiver(handler, secret=SECRET, host="127.0.0.1", port=0, workers=2)
+
+    async def run():
+        await receiver.start()
+        url = f"http://127.0.0.1:{receiver.bound_port}{receiver.path}"
+        try:
+            async with httpx.AsyncClient() as client:
+                statuses = []
+                for body, signature in bodies:
+                    headers = {"X-Signature": signature} if signature is not None else {}
+                    statuses.append((await client.post(url, content=body, headers=headers)).status_code)
+            await asyncio.wait_for(receiver.queue.join(), 5)
+            return statuses
+        finally:
+            await receiver.stop()
+
+    return asyncio.run(run()), receiver
+
+
+def test_only_signed_json_objects_are_queued():
+    handled = []
+
+    async def handler(event):
+        handled.append(event)
+
+    body = json.dumps(EVENT).encode()
+    unsigned = json.dumps({**EVENT, "data": {**EVENT["data"], "id": "2"}}).encode()
+    statuses, receiver = deliver(handler, [
+        (body, sign(SECRET, body)),
+        (unsigned, None),
+        (unsigned, sign("other-secret", unsigned)),
+        (b"{not json", sign(SECRET, b"{not json")),
+        (b"[1, 2]", sign(SECRET, b"[1, 2]")),
+        (b'"order_created"', sign(SECRET, b'"order_created"')),
+    ])
+    assert statuses == [200, 401, 401, 400, 400, 400]
+    assert handled == [EVENT]
+    assert receiver.stats()["received"] == 1
+    assert receiver.stats()["rejected"] == 5
+
+
+def test_workers_survive_failing_events():
+    handled = []
+
+    async def handler(event):
+        if event["data"] is None:
+            raise ValueError("no data")
+        handled.append(event)
+
+    broken = json.dumps({"meta": "order_created", "data": None}).encode()
+    body = json.dumps(EVENT).encode()
+    # More failures than workers: every worker has to keep going
+    statuses, receiver = deliver(handler, [(broken, sign(SECRET, broken))] * 3 + [(body, sign(SECRET, body))])
+    assert statuses == [200] * 4
+    assert handled == [EVENT]
+    assert receiver.stats()["failed"] == 3
+    assert receiver.stats()["processed"] == 1